@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""Benchmark Markdown heading extraction on large documents.
+
+Compares the single-pass block scanner used by LLMStructureExtractor with
+the previous implementation, which matched a regex against every line and
+split the content into lines a second time to build the hierarchy, on
+synthetic documentation of increasing size. Also compares the peak memory
+of building, filtering and serializing the heading tree.
+
+Usage:
+    python benchmarks/bench_structure_extraction.py [--sizes 1 2 4 8] [--skip-legacy] [--memory-size 50]
+"""
+
+import argparse
+import gc
+import random
+import re
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from yaml_context_engineering.config import Config
+from yaml_context_engineering.tools import LLMStructureExtractor
+from yaml_context_engineering.tools.llm_structure_extractor import HeadingNode
+
+
+LEGACY_HEADING = re.compile(r"^(#{1,6})\s+(.+)$", re.MULTILINE)
+
+PARAGRAPH = (
+    "Each request is retried with exponential backoff when the server is busy,\n"
+    "and the delay never exceeds the limit configured for the crawl. Responses\n"
+    "are cached on disk so that repeated runs only fetch pages that changed.\n"
+    "Install the package with pip and edit settings.yaml before running main.py."
+)
+
+BLOCKS = [
+    "## Section {n}",
+    "### Details {n}",
+    *[PARAGRAPH] * 8,
+    "```bash\n# install dependencies\npip install -r requirements.txt\n# start the server\npython -m server\n```",
+    "- first item\n- second item\n- third item",
+]
+
+
+def legacy_sections(content: str) -> list:
+    """Heading extraction and hierarchy as implemented before the scanner."""
+    headings = []
+    for i, line in enumerate(content.split("\n")):
+        match = LEGACY_HEADING.match(line)
+        if match:
+            headings.append((len(match.group(1)), match.group(2).strip(), i + 1))
+    
+    content_lines = content.split("\n")
+    root_nodes = []
+    stack = []
+    for i, (level, text, line_num) in enumerate(headings):
+        end_line = headings[i + 1][2] - 1 if i + 1 < len(headings) else len(content_lines)
+        section = "\n".join(content_lines[line_num:end_line]).strip()
+        node = HeadingNode(level=level, text=text, content=section, line_number=line_num)
+        while stack and stack[-1][0] >= level:
+            stack.pop()
+        (stack[-1][1].children if stack else root_nodes).append(node)
+        stack.append((level, node))
+    return root_nodes
+
+
+def legacy_filter(nodes: list, max_level: int) -> list:
+    """Granularity filter as implemented before views: rebuilds every node."""
+    def filter_node(node):
+        if node.level > max_level:
+            return None
+        children = [child for child in map(filter_node, node.children) if child]
+        return HeadingNode(level=node.level, text=node.text, content=node.content,
+                           children=children, line_number=node.line_number)
+    
+    return [filter_node(node) for node in nodes if filter_node(node)]
+
+
+def scanner_sections(extractor: LLMStructureExtractor, content: str) -> list:
+    """Heading extraction and hierarchy with the block scanner."""
+    headings = extractor._extract_markdown_headings(content)
+    return extractor._build_hierarchy(headings, content)
+
+
+def flatten(nodes: list) -> list:
+    """Flatten a heading tree into comparable tuples."""
+    flat = []
+    for node in nodes:
+        flat.append((node.level, node.text, node.line_number, node.content))
+        flat.extend(flatten(node.children))
+    return flat
+
+
+def make_document(size_mb: float, seed: int = 0, fences: bool = True) -> str:
+    """Generate synthetic documentation Markdown of roughly the given size."""
+    rng = random.Random(seed)
+    blocks = BLOCKS if fences else [block for block in BLOCKS if "```" not in block]
+    target = int(size_mb * 1024 * 1024)
+    parts = ["# Manual"]
+    length = 0
+    while length < target:
+        block = rng.choice(blocks).format(n=rng.randrange(500))
+        parts.append(block)
+        length += len(block) + 2
+    return "\n\n".join(parts)
+
+
+def peak_memory(func, *args) -> int:
+    """Return the peak traced allocation while running a function."""
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def timed(func, *args, repeat: int = 5):
+    """Run a function several times and return its result and best duration.
+    
+    Garbage collection is paused while timing, as timeit does, so that
+    collections triggered by earlier runs do not skew the comparison.
+    """
+    best = float("inf")
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = func(*args)
+            best = min(best, time.perf_counter() - started)
+    finally:
+        gc.enable()
+    return result, best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 2, 4, 8],
+                        help="Document sizes in MB")
+    parser.add_argument("--skip-legacy", action="store_true",
+                        help="Only time the single-pass scanner")
+    parser.add_argument("--memory-size", type=float, default=50,
+                        help="Document size in MB for the memory comparison (0 to skip)")
+    args = parser.parse_args()
+    
+    extractor = LLMStructureExtractor(Config())
+    
+    # Without fences both implementations must agree exactly
+    sample = make_document(0.25, fences=False)
+    if flatten(scanner_sections(extractor, sample)) != flatten(legacy_sections(sample)):
+        sys.exit("Scanner and legacy results differ on a fence-free document")
+    
+    print(f"{'size':>8} {'headings':>9} {'scanner':>10} {'MB/s':>8} {'legacy':>10} {'speedup':>8}")
+    for size in args.sizes:
+        document = make_document(size)
+        _, scanner_time = timed(scanner_sections, extractor, document)
+        headings = len(extractor._extract_markdown_headings(document))
+        line = f"{size:>6.1f}MB {headings:>9} {scanner_time:>9.3f}s {size / scanner_time:>8.1f}"
+        
+        if not args.skip_legacy:
+            _, legacy_time = timed(legacy_sections, document)
+            line += f" {legacy_time:>9.3f}s {legacy_time / scanner_time:>7.1f}x"
+        print(line)
+    
+    # The old HTML path counted newlines from the start for every heading
+    html = "\n".join(f"<h2>Section {n}</h2>\n<p>Body text for section {n}.</p>" for n in range(20000))
+    _, html_time = timed(extractor._extract_html_headings, html)
+    print(f"\nHTML, 20000 headings: {html_time:.3f}s")
+    
+    if args.memory_size:
+        # Peak memory of building, filtering and serializing the tree,
+        # on top of the document itself
+        document = make_document(args.memory_size)
+        size = len(document)
+        
+        def scanner_tree():
+            views = extractor._filter_by_granularity(scanner_sections(extractor, document), "L1_L2")
+            return [view.to_dict() for view in views]
+        
+        def scanner_offsets():
+            views = extractor._filter_by_granularity(scanner_sections(extractor, document), "L1_L2")
+            return [view.to_dict(include_content=False) for view in views]
+        
+        def legacy_tree():
+            return [node.to_dict(2) for node in legacy_filter(legacy_sections(document), 2)]
+        
+        print(f"\nPeak memory over a {size / 1024 / 1024:.0f}MB document (build, L1_L2 filter, to_dict):")
+        print(f"  scanner: {peak_memory(scanner_tree) / size:.2f}x document size")
+        print(f"  scanner, offsets only: {peak_memory(scanner_offsets) / size:.2f}x document size")
+        if not args.skip_legacy:
+            print(f"  legacy:  {peak_memory(legacy_tree) / size:.2f}x document size")
+
+
+if __name__ == "__main__":
+    main()
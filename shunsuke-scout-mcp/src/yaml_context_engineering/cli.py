@@ -1,10 +1,12 @@
 """CLI interface for YAML Context Engineering."""
 
 import asyncio
+import re
 import sys
 import click
 from pathlib import Path
 from typing import Optional
+from urllib.parse import urlparse
 
 from .server import YamlContextServer
 from .config import Config
@@ -38,40 +40,54 @@ async def extract(url: str, output_dir: Optional[Path], depth: int) -> None:
     server = YamlContextServer(config)
     
     try:
-        # Use the web content fetcher
-        console.info(f"Fetching content from {url}...")
-        results = await server.web_fetcher.fetch([url])
+        # Crawl from the seed URL, writing each page as soon as it arrives
+        console.info(f"Crawling {url} (depth {config.crawling.max_crawl_depth})...")
+        saved = 0
+        async for page in server.crawler.iter_crawl([url]):
+            if not page.get("success"):
+                continue
+            if "duplicate_of" in page:
+                console.info(f"Skipped {page['url']} (duplicate of {page['duplicate_of']})")
+                continue
+            
+            # Extract structure
+            structure = await server.structure_extractor.extract(page["content"])
+            
+            # Save to file
+            filename = output_filename(page["url"])
+            await server.file_manager.execute(
+                "write_file",
+                f"{filename}.md",
+                {
+                    "title": page.get("title") or "Extracted Content",
+                    "source_url": page["url"],
+                    "language": page.get("language", "unknown"),
+                    "body": page["content"],
+                    "hierarchy_levels": structure.get("hierarchy_levels", [])
+                }
+            )
+            saved += 1
+            console.info(f"Saved {page['url']} -> {filename}.md")
         
-        if not results or not results[0]["success"]:
+        if not saved:
             console.error(f"Failed to fetch {url}")
             sys.exit(1)
         
-        # Extract structure
-        console.info("Extracting hierarchical structure...")
-        structure = await server.structure_extractor.extract(results[0]["content"])
-        
-        # Save to file
-        console.info("Generating YAML documentation...")
-        filename = Path(url).name or "extracted"
-        await server.file_manager.execute(
-            "write_file",
-            f"{filename}.md",
-            {
-                "title": results[0].get("title", "Extracted Content"),
-                "source_url": url,
-                "language": results[0].get("language", "unknown"),
-                "body": results[0]["content"],
-                "hierarchy_levels": structure.get("hierarchy_levels", [])
-            }
-        )
-        
-        console.success(f"✅ Context extracted to: {config.output.output_base_directory}/{filename}.md")
+        console.success(f"✅ {saved} context files extracted to: {config.output.output_base_directory}")
         
     except Exception as e:
         console.error(f"Error: {e}")
         sys.exit(1)
     finally:
-        await server.web_fetcher.close()
+        await server.close()
+
+
+def output_filename(url: str) -> str:
+    """Build a flat output file name from a page URL."""
+    parsed = urlparse(url)
+    parts = [parsed.netloc] + [part for part in parsed.path.split("/") if part]
+    name = "_".join(parts) or "extracted"
+    return re.sub(r'[<>:"|?*\\\x00-\x1f]', '_', name)
 
 
 @cli.command()
@@ -1,8 +1,9 @@
 """Configuration management for YAML Context Engineering MCP Server."""
 
+import json
 import os
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pathlib import Path
 
 
@@ -16,6 +17,24 @@ class CrawlingConfig:
     max_pages_per_domain: int = 100
     timeout_seconds: int = 30
     user_agent: str = "YAML-Context-Engineering-Agent/1.0"
+    max_concurrent_requests: int = 10
+    max_concurrent_per_host: int = 4
+    respect_robots_txt: bool = True
+    robots_cache_ttl_seconds: int = 86400
+    http_cache_enabled: bool = True
+    dns_cache_ttl_seconds: int = 300
+    keepalive_timeout_seconds: float = 30.0
+    persist_seen_urls: bool = True
+    seen_urls_ttl_seconds: int = 86400
+    use_sitemaps: bool = False  # Seed crawls with the pages listed in sitemap.xml
+    max_sitemaps: int = 50  # Sitemap documents read per site, including indexes
+    url_score_weights: Dict[str, float] = field(default_factory=dict)  # Overrides of ranking feature weights
+    compressed_transfer: bool = True  # Ask for zstd/br/gzip/deflate responses
+    max_retries: int = 2  # Retries after a transient failure (5xx, 429, timeout, connection error)
+    max_retry_after_seconds: float = 60.0  # Longer Retry-After delays fail instead of waiting
+    circuit_failure_threshold: int = 5  # Consecutive failures before a host's circuit opens
+    circuit_reset_seconds: float = 30.0  # How long an open circuit fails requests fast
+    checkpoint_interval_seconds: float = 30.0  # How often crawl progress is saved (0 = never)
 
 
 @dataclass
@@ -26,7 +45,10 @@ class ExtractionConfig:
     content_summarization: str = "detailed"  # none, brief, detailed, full
     language_detection: bool = True
     extract_metadata: bool = True
-    max_content_length: int = 100000
+    max_content_length: int = 100000  # Bytes read per response body
+    parser_workers: Optional[int] = None  # None = one per CPU, 0 = parse on the event loop
+    deduplicate_content: bool = True
+    near_duplicate_threshold: int = 3  # Max differing SimHash bits
 
 
 @dataclass
@@ -34,6 +56,7 @@ class OutputConfig:
     """Configuration for output generation."""
     
     output_base_directory: Path = field(default_factory=lambda: Path("generated_contexts"))
+    cache_directory: Optional[Path] = None  # Defaults to <output_base_directory>/.cache
     yaml_template_path: Optional[Path] = None
     create_index_files: bool = True
     prettify_output: bool = True
@@ -67,19 +90,71 @@ class Config:
             config.crawling.crawl_delay_seconds = float(delay)
         if max_pages := os.getenv("MCP_MAX_PAGES_PER_DOMAIN"):
             config.crawling.max_pages_per_domain = int(max_pages)
+        if timeout := os.getenv("MCP_TIMEOUT_SECONDS"):
+            config.crawling.timeout_seconds = int(timeout)
+        if max_concurrent := os.getenv("MCP_MAX_CONCURRENT_REQUESTS"):
+            config.crawling.max_concurrent_requests = int(max_concurrent)
+        if max_per_host := os.getenv("MCP_MAX_CONCURRENT_PER_HOST"):
+            config.crawling.max_concurrent_per_host = int(max_per_host)
+        if respect_robots := os.getenv("MCP_RESPECT_ROBOTS_TXT"):
+            config.crawling.respect_robots_txt = respect_robots.lower() in ("1", "true", "yes")
+        if http_cache := os.getenv("MCP_HTTP_CACHE"):
+            config.crawling.http_cache_enabled = http_cache.lower() in ("1", "true", "yes")
+        if dns_ttl := os.getenv("MCP_DNS_CACHE_TTL"):
+            config.crawling.dns_cache_ttl_seconds = int(dns_ttl)
+        if keepalive := os.getenv("MCP_KEEPALIVE_TIMEOUT"):
+            config.crawling.keepalive_timeout_seconds = float(keepalive)
+        if persist_seen := os.getenv("MCP_PERSIST_SEEN_URLS"):
+            config.crawling.persist_seen_urls = persist_seen.lower() in ("1", "true", "yes")
+        if seen_ttl := os.getenv("MCP_SEEN_URLS_TTL"):
+            config.crawling.seen_urls_ttl_seconds = int(seen_ttl)
+        if use_sitemaps := os.getenv("MCP_USE_SITEMAPS"):
+            config.crawling.use_sitemaps = use_sitemaps.lower() in ("1", "true", "yes")
+        if max_sitemaps := os.getenv("MCP_MAX_SITEMAPS"):
+            config.crawling.max_sitemaps = int(max_sitemaps)
+        if score_weights := os.getenv("MCP_URL_SCORE_WEIGHTS"):
+            config.crawling.url_score_weights = json.loads(score_weights)
+        if compressed := os.getenv("MCP_COMPRESSED_TRANSFER"):
+            config.crawling.compressed_transfer = compressed.lower() in ("1", "true", "yes")
+        if max_retries := os.getenv("MCP_MAX_RETRIES"):
+            config.crawling.max_retries = int(max_retries)
+        if max_retry_after := os.getenv("MCP_MAX_RETRY_AFTER"):
+            config.crawling.max_retry_after_seconds = float(max_retry_after)
+        if failure_threshold := os.getenv("MCP_CIRCUIT_FAILURE_THRESHOLD"):
+            config.crawling.circuit_failure_threshold = int(failure_threshold)
+        if reset_seconds := os.getenv("MCP_CIRCUIT_RESET_SECONDS"):
+            config.crawling.circuit_reset_seconds = float(reset_seconds)
+        if checkpoint_interval := os.getenv("MCP_CHECKPOINT_INTERVAL"):
+            config.crawling.checkpoint_interval_seconds = float(checkpoint_interval)
         
         # Extraction settings
         if granularity := os.getenv("MCP_CONTEXT_GRANULARITY"):
             config.extraction.context_granularity = granularity
         if summarization := os.getenv("MCP_CONTENT_SUMMARIZATION"):
             config.extraction.content_summarization = summarization
+        if max_length := os.getenv("MCP_MAX_CONTENT_LENGTH"):
+            config.extraction.max_content_length = int(max_length)
+        if parser_workers := os.getenv("MCP_PARSER_WORKERS"):
+            config.extraction.parser_workers = int(parser_workers)
+        if deduplicate := os.getenv("MCP_DEDUPLICATE_CONTENT"):
+            config.extraction.deduplicate_content = deduplicate.lower() in ("1", "true", "yes")
+        if threshold := os.getenv("MCP_NEAR_DUPLICATE_THRESHOLD"):
+            config.extraction.near_duplicate_threshold = int(threshold)
         
         # Output settings
         if output_dir := os.getenv("MCP_OUTPUT_DIRECTORY"):
             config.output.output_base_directory = Path(output_dir)
+        if cache_dir := os.getenv("MCP_CACHE_DIRECTORY"):
+            config.output.cache_directory = Path(cache_dir)
         
         return config
     
+    def get_cache_directory(self) -> Path:
+        """Return the directory used for persistent crawl caches."""
+        if self.output.cache_directory is not None:
+            return self.output.cache_directory
+        return self.output.output_base_directory / ".cache"
+    
     def validate(self) -> None:
         """Validate configuration values."""
         # Validate context granularity
@@ -98,4 +173,43 @@ class Config:
         
         # Validate crawl delay
         if self.crawling.crawl_delay_seconds < 0.5:
-            raise ValueError(f"crawl_delay_seconds must be at least 0.5")
\ No newline at end of file
+            raise ValueError(f"crawl_delay_seconds must be at least 0.5")
+        
+        # Validate content length cap
+        if self.extraction.max_content_length < 1:
+            raise ValueError(f"max_content_length must be at least 1")
+        
+        # Validate near-duplicate threshold
+        if not 0 <= self.extraction.near_duplicate_threshold <= 15:
+            raise ValueError(f"near_duplicate_threshold must be between 0 and 15")
+        
+        # Validate parser workers
+        if self.extraction.parser_workers is not None and self.extraction.parser_workers < 0:
+            raise ValueError(f"parser_workers must not be negative")
+        
+        # Validate sitemap limit
+        if self.crawling.max_sitemaps < 1:
+            raise ValueError(f"max_sitemaps must be at least 1")
+        
+        # Validate retry and circuit breaker settings
+        if self.crawling.max_retries < 0:
+            raise ValueError(f"max_retries must not be negative")
+        if self.crawling.circuit_failure_threshold < 1:
+            raise ValueError(f"circuit_failure_threshold must be at least 1")
+        if self.crawling.circuit_reset_seconds <= 0:
+            raise ValueError(f"circuit_reset_seconds must be positive")
+        
+        # Validate checkpoint interval
+        if self.crawling.checkpoint_interval_seconds < 0:
+            raise ValueError(f"checkpoint_interval_seconds must not be negative")
+        
+        # Validate URL score weights
+        for name, weight in self.crawling.url_score_weights.items():
+            if isinstance(weight, bool) or not isinstance(weight, (int, float)):
+                raise ValueError(f"url_score_weights[{name!r}] must be a number")
+        
+        # Validate concurrency limits
+        if self.crawling.max_concurrent_requests < 1:
+            raise ValueError(f"max_concurrent_requests must be at least 1")
+        if self.crawling.max_concurrent_per_host < 1:
+            raise ValueError(f"max_concurrent_per_host must be at least 1")
\ No newline at end of file
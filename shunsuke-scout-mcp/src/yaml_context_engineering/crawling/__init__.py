@@ -0,0 +1,48 @@
+"""Crawling infrastructure for YAML Context Engineering.
+
+This module provides the building blocks used by the web crawler:
+frontier management, crawl budgets, per-host politeness scheduling,
+robots.txt enforcement, conditional-request caching, a shared
+HTTP connection pool, URL canonicalization with a persistent
+seen-URL store, content fingerprinting for duplicate suppression,
+batch URL ranking, streaming sitemap ingestion, per-host health
+tracking with adaptive concurrency and circuit breaking, decoding of
+compressed transfers and checkpoints for resuming interrupted crawls.
+"""
+
+from .frontier import CrawlFrontier, FrontierEntry
+from .scheduler import HostScheduler
+from .robots import RobotsCache, RobotsRules
+from .http_cache import HTTPCache
+from .pool import ConnectionPool
+from .seen_store import SeenURLStore
+from .urls import canonicalize_url
+from .fingerprint import DuplicateDetector, DuplicateMatch, Fingerprint
+from .ranking import URLRankingModel
+from .sitemap import SitemapEntry, SitemapParser, SitemapReader
+from .host_health import CircuitOpenError, HostHealth
+from .compression import ContentDecoder
+from .checkpoint import CrawlCheckpoint
+
+__all__ = [
+    'CrawlFrontier',
+    'FrontierEntry',
+    'HostScheduler',
+    'RobotsCache',
+    'RobotsRules',
+    'HTTPCache',
+    'ConnectionPool',
+    'SeenURLStore',
+    'canonicalize_url',
+    'DuplicateDetector',
+    'DuplicateMatch',
+    'Fingerprint',
+    'URLRankingModel',
+    'SitemapEntry',
+    'SitemapParser',
+    'SitemapReader',
+    'CircuitOpenError',
+    'HostHealth',
+    'ContentDecoder',
+    'CrawlCheckpoint'
+]
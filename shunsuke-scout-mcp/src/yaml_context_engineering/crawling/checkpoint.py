@@ -0,0 +1,207 @@
+"""On-disk checkpoints for resuming interrupted crawls."""
+
+import asyncio
+import gzip
+import json
+import os
+import re
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from nanoid import generate
+
+from ..utils.logging import get_logger
+
+
+CHECKPOINT_VERSION = 1
+
+# Bytes of the pages file read at a time when replaying pages
+_READ_SIZE = 65536
+
+_JOB_ID = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+
+class CrawlCheckpoint:
+    """Periodic snapshot of a crawl, stored as two gzip files per job.
+    
+    ``<job_id>.state.json.gz`` holds the crawl parameters, the frontier
+    (queue, seen set, per-domain budgets) and counters. It is small and
+    rewritten atomically on every save.
+    
+    ``<job_id>.pages.jsonl.gz`` holds the completed page results, one JSON
+    object per line. Each save appends only the pages completed since the
+    last one, as a new gzip member, so checkpoint cost does not grow with
+    the number of pages already saved.
+    
+    The state records how many bytes of the pages file it covers. A crash
+    between the two writes leaves extra bytes that are ignored on load and
+    overwritten by the next save, so a resumed crawl never sees a page
+    twice or a page whose links are missing from the frontier. Saved pages
+    are streamed back with ``iter_pages`` rather than loaded at once.
+    """
+    
+    def __init__(self, directory: Path, job_id: Optional[str] = None):
+        """Initialize the checkpoint.
+        
+        Args:
+            directory: Directory holding checkpoint files
+            job_id: Job to save or resume, or None for a new job
+        
+        Raises:
+            ValueError: If the job ID is not a plain identifier
+        """
+        if job_id is not None and not _JOB_ID.fullmatch(job_id):
+            raise ValueError(f"Invalid job ID: {job_id!r}")
+        
+        self.directory = directory
+        self.job_id = job_id or generate(size=12)
+        self.logger = get_logger(__name__)
+        
+        self._pages: List[Dict[str, Any]] = []  # Completed since the last save
+        self._committed_bytes = 0
+        self._committed_pages = 0
+        self._loaded_bytes = 0  # Size of the pages file covered by the loaded state
+        self._writing: Optional[asyncio.Future] = None
+    
+    @property
+    def state_path(self) -> Path:
+        """File holding the crawl state."""
+        return self.directory / f"{self.job_id}.state.json.gz"
+    
+    @property
+    def pages_path(self) -> Path:
+        """File holding the completed pages."""
+        return self.directory / f"{self.job_id}.pages.jsonl.gz"
+    
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Load the saved state of the job.
+        
+        The completed pages are not read here; ``iter_pages`` streams the
+        pages covered by the loaded state.
+        
+        Returns:
+            Saved state with the number of completed pages under
+            ``"pages_count"``, or None if the job has no usable checkpoint
+        """
+        if not self.state_path.exists():
+            return None
+        
+        try:
+            state = json.loads(gzip.decompress(self.state_path.read_bytes()))
+            if state.get("version") != CHECKPOINT_VERSION:
+                raise ValueError(f"unsupported checkpoint version {state.get('version')}")
+            
+            pages_bytes = state["pages_bytes"]
+            if pages_bytes and self.pages_path.stat().st_size < pages_bytes:
+                raise ValueError("pages file is shorter than the saved state")
+        except (OSError, EOFError, ValueError, KeyError) as e:
+            self.logger.warning(f"Ignoring unreadable checkpoint for job {self.job_id}", error=str(e))
+            return None
+        
+        state.setdefault("pages_count", 0)
+        self._committed_bytes = self._loaded_bytes = pages_bytes
+        self._committed_pages = state["pages_count"]
+        return state
+    
+    def iter_pages(self) -> Iterator[Dict[str, Any]]:
+        """Stream the completed pages covered by the loaded state.
+        
+        The pages file is read in small blocks and each gzip member is
+        decompressed incrementally, one line at a time, so memory does not
+        grow with the number of saved pages. Pages appended by saves made
+        during the replay are not included. An unreadable pages file ends
+        the stream with a warning.
+        
+        Yields:
+            Saved page results in the order they were completed
+        """
+        remaining = self._loaded_bytes
+        if not remaining:
+            return
+        
+        try:
+            with open(self.pages_path, "rb") as f:
+                decompressor = zlib.decompressobj(wbits=31)  # gzip member
+                in_member = False
+                buffer = b""
+                while remaining:
+                    data = f.read(min(_READ_SIZE, remaining))
+                    if not data:
+                        raise EOFError("pages file ended early")
+                    remaining -= len(data)
+                    while data:
+                        in_member = True
+                        *lines, buffer = (buffer + decompressor.decompress(data)).split(b"\n")
+                        for line in lines:
+                            yield json.loads(line)
+                        if not decompressor.eof:
+                            break
+                        # Each save appended its pages as a new member
+                        data = decompressor.unused_data
+                        decompressor = zlib.decompressobj(wbits=31)
+                        in_member = False
+                if in_member or buffer:
+                    raise EOFError("pages file ends inside a gzip member")
+        except (OSError, EOFError, zlib.error, ValueError) as e:
+            self.logger.warning(f"Stopped replaying unreadable pages for job {self.job_id}", error=str(e))
+    
+    def add_page(self, page: Dict[str, Any]) -> None:
+        """Record a completed page for the next save."""
+        self._pages.append(page)
+    
+    async def save(self, state: Dict[str, Any]) -> None:
+        """Write a checkpoint.
+        
+        The state is captured by the caller without yielding to the event
+        loop, so it is consistent with the pages added so far; compression
+        and file I/O then run in a thread.
+        
+        Args:
+            state: JSON-serializable crawl state
+        """
+        # Saves never overlap, even if an earlier caller was cancelled
+        if self._writing is not None:
+            await asyncio.gather(self._writing, return_exceptions=True)
+        
+        pages, self._pages = self._pages, []
+        state = {**state, "version": CHECKPOINT_VERSION, "job_id": self.job_id}
+        self._writing = asyncio.ensure_future(asyncio.to_thread(self._write, state, pages))
+        try:
+            await asyncio.shield(self._writing)
+        except (OSError, TypeError, ValueError) as e:
+            # Pages past the committed size are rewritten by the next save
+            self._pages = pages + self._pages
+            self.logger.warning(f"Failed to save checkpoint for job {self.job_id}", error=str(e))
+    
+    def _write(self, state: Dict[str, Any], pages: List[Dict[str, Any]]) -> None:
+        """Append pages and replace the state file."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        
+        mode = "r+b" if self.pages_path.exists() else "wb"
+        with open(self.pages_path, mode) as f:
+            # Drop bytes a failed or interrupted save left behind
+            f.seek(self._committed_bytes)
+            f.truncate()
+            if pages:
+                lines = "".join(json.dumps(page, ensure_ascii=False) + "\n" for page in pages)
+                f.write(gzip.compress(lines.encode("utf-8")))
+            pages_bytes = f.tell()
+        
+        pages_count = self._committed_pages + len(pages)
+        data = json.dumps({**state, "pages_bytes": pages_bytes, "pages_count": pages_count}, separators=(",", ":"))
+        temp_path = self.state_path.with_suffix(".tmp")
+        temp_path.write_bytes(gzip.compress(data.encode("utf-8")))
+        os.replace(temp_path, self.state_path)
+        self._committed_bytes = pages_bytes
+        self._committed_pages = pages_count
+    
+    async def delete(self) -> None:
+        """Remove the checkpoint files of a finished job."""
+        if self._writing is not None:
+            await asyncio.gather(self._writing, return_exceptions=True)
+        for path in (self.state_path, self.pages_path):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
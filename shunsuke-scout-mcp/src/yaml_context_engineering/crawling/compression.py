@@ -0,0 +1,266 @@
+"""Content-Encoding negotiation and incremental body decoding.
+
+gzip and deflate are always available. Brotli (``br``) is offered when
+``brotli`` or ``brotlicffi`` is installed, and Zstandard (``zstd``) when
+``compression.zstd`` (Python 3.14+), ``backports.zstd`` or ``zstandard``
+is importable.
+"""
+
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+
+_DECODE_ERRORS: Tuple[type, ...] = (zlib.error,)
+
+try:
+    import brotli as _brotli
+    _DECODE_ERRORS += (_brotli.error,)
+except ImportError:
+    try:
+        import brotlicffi as _brotli
+        _DECODE_ERRORS += (_brotli.error,)
+    except ImportError:
+        _brotli = None
+
+try:
+    from compression import zstd as _zstd
+except ImportError:
+    try:
+        from backports import zstd as _zstd
+    except ImportError:
+        _zstd = None
+if _zstd is not None:
+    _DECODE_ERRORS += (_zstd.ZstdError,)
+    _zstandard = None
+else:
+    try:
+        import zstandard as _zstandard
+        _DECODE_ERRORS += (_zstandard.ZstdError,)
+    except ImportError:
+        _zstandard = None
+
+
+class UnsupportedEncodingError(ValueError):
+    """Raised for a Content-Encoding no installed decoder can handle."""
+
+
+class ContentDecodingError(ValueError):
+    """Raised when a compressed body is corrupt."""
+
+
+# Input fed at a time to decoders that cannot bound their output, so a
+# highly compressed body is checked against the budget every few bytes
+_SLICE_SIZE = 64
+
+
+class _ZlibStage:
+    """gzip or deflate decompression."""
+    
+    def __init__(self, coding: str):
+        self.coding = coding
+        self._decompressor = None
+        self._pending = b""  # Input held back once the output limit was reached
+        if coding == "gzip":
+            self._decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    
+    def decompress(self, data: bytes, limit: Optional[int] = None) -> bytes:
+        if self._pending:
+            data = self._pending + data
+        if self._decompressor is None:
+            if not data:
+                return b""
+            # "deflate" should be zlib-wrapped, but some servers send raw deflate
+            wrapped = len(data) >= 2 and data[0] & 0x0F == 8 and ((data[0] << 8) | data[1]) % 31 == 0
+            self._decompressor = zlib.decompressobj(zlib.MAX_WBITS if wrapped else -zlib.MAX_WBITS)
+        if limit is None:
+            self._pending = b""
+            return self._decompressor.decompress(data)
+        output = self._decompressor.decompress(data, limit)
+        self._pending = self._decompressor.unconsumed_tail
+        return output
+    
+    def flush(self, limit: Optional[int] = None) -> bytes:
+        output = self.decompress(b"", limit) if self._pending else b""
+        if not self._pending and self._decompressor is not None:
+            output += self._decompressor.flush()
+        return output
+
+
+class _SlicedStage:
+    """Feeds a decoder without an output limit in small slices of input."""
+    
+    def __init__(self, process: Callable[[bytes], bytes]):
+        self._process = process  # Decodes one piece of input
+        self._pending = b""
+    
+    def decompress(self, data: bytes, limit: Optional[int] = None) -> bytes:
+        if self._pending:
+            data = self._pending + data
+        if limit is None:
+            self._pending = b""
+            return self._process(data) if data else b""
+        
+        parts = []
+        produced = 0
+        offset = 0
+        while offset < len(data) and produced < limit:
+            part = self._process(data[offset:offset + _SLICE_SIZE])
+            offset += _SLICE_SIZE
+            parts.append(part)
+            produced += len(part)
+        self._pending = data[offset:]
+        return b"".join(parts)
+    
+    def flush(self, limit: Optional[int] = None) -> bytes:
+        return self.decompress(b"", limit)
+
+
+class _BrotliStage(_SlicedStage):
+    """Brotli decompression with either brotli binding."""
+    
+    def __init__(self, coding: str):
+        decompressor = _brotli.Decompressor()
+        # brotli names the method process, brotlicffi decompress
+        super().__init__(getattr(decompressor, "process", None) or decompressor.decompress)
+
+
+class _ZstandardStage(_SlicedStage):
+    """Zstandard decompression with the zstandard package."""
+    
+    def __init__(self, coding: str):
+        super().__init__(_zstandard.ZstdDecompressor().decompressobj().decompress)
+
+
+class _ZstdStage:
+    """Zstandard decompression with the standard library (or its backport)."""
+    
+    def __init__(self, coding: str):
+        self._decompressor = _zstd.ZstdDecompressor()
+    
+    def decompress(self, data: bytes, limit: Optional[int] = None) -> bytes:
+        # The decoder bounds its output itself and buffers unread input
+        if self._decompressor.eof or (not data and self._decompressor.needs_input):
+            return b""
+        return self._decompressor.decompress(data, -1 if limit is None else limit)
+    
+    def flush(self, limit: Optional[int] = None) -> bytes:
+        return self.decompress(b"", limit)
+
+
+def _stage_factories() -> Dict[str, Callable[[str], object]]:
+    """Return the decoder of every supported coding, in preference order."""
+    factories: Dict[str, Callable[[str], object]] = {}
+    if _zstd is not None:
+        factories["zstd"] = _ZstdStage
+    elif _zstandard is not None:
+        factories["zstd"] = _ZstandardStage
+    if _brotli is not None:
+        factories["br"] = _BrotliStage
+    factories["gzip"] = _ZlibStage
+    factories["x-gzip"] = lambda coding: _ZlibStage("gzip")
+    factories["deflate"] = _ZlibStage
+    return factories
+
+
+_STAGES = _stage_factories()
+
+
+def supported_encodings() -> Tuple[str, ...]:
+    """Return the content codings this installation can decode, best first."""
+    return tuple(coding for coding in _STAGES if coding != "x-gzip")
+
+
+def accept_encoding(enabled: bool = True) -> str:
+    """Build the ``Accept-Encoding`` request header.
+    
+    Args:
+        enabled: Whether to ask for compressed responses at all
+    
+    Returns:
+        Header value listing every supported coding, or ``identity``
+    """
+    return ", ".join(supported_encodings()) if enabled else "identity"
+
+
+class ContentDecoder:
+    """Decodes a response body chunk by chunk and counts its bytes.
+    
+    ``wire_bytes`` counts the body bytes as transferred, ``decoded_bytes``
+    the bytes after removing every content coding. Codings applied in
+    sequence (``Content-Encoding: gzip, br``) are undone in reverse order.
+    """
+    
+    def __init__(self, content_encoding: Optional[str] = None):
+        """Initialize the decoder.
+        
+        Args:
+            content_encoding: Content-Encoding header of the response
+        
+        Raises:
+            UnsupportedEncodingError: If a coding cannot be decoded here
+        """
+        codings: List[str] = [
+            coding.strip().lower()
+            for coding in (content_encoding or "").split(",")
+            if coding.strip() and coding.strip().lower() != "identity"
+        ]
+        for coding in codings:
+            if coding not in _STAGES:
+                raise UnsupportedEncodingError(f"Unsupported content encoding: {coding}")
+        
+        self.content_encoding = ", ".join(codings) or "identity"
+        self._stages = [_STAGES[coding](coding) for coding in reversed(codings)]
+        self.wire_bytes = 0
+        self.decoded_bytes = 0
+    
+    def decode(self, data: bytes, max_length: Optional[int] = None) -> bytes:
+        """Decode the next chunk of the body.
+        
+        With ``max_length``, decompression stops once that many bytes have
+        been produced and the rest of the input is held back, so a small,
+        highly compressed body cannot inflate past the caller's budget.
+        Decoders without a native output limit are fed 64 bytes at a time
+        and may overshoot by what one such slice expands to.
+        
+        Args:
+            data: Next chunk of the body as transferred
+            max_length: Maximum number of decoded bytes to return
+        
+        Raises:
+            ContentDecodingError: If the body is not validly encoded
+        """
+        self.wire_bytes += len(data)
+        try:
+            for stage in self._stages:
+                data = stage.decompress(data, max_length)
+        except _DECODE_ERRORS as e:
+            raise ContentDecodingError(f"Invalid {self.content_encoding} body: {e}") from e
+        self.decoded_bytes += len(data)
+        return data
+    
+    def flush(self, max_length: Optional[int] = None) -> bytes:
+        """Return any bytes still buffered once the body has ended.
+        
+        Args:
+            max_length: Maximum number of decoded bytes to return
+        
+        Raises:
+            ContentDecodingError: If the body is not validly encoded
+        """
+        data = b""
+        try:
+            for stage in self._stages:
+                data = stage.decompress(data, max_length)
+                if max_length is None or len(data) < max_length:
+                    data += stage.flush(None if max_length is None else max_length - len(data))
+        except _DECODE_ERRORS as e:
+            raise ContentDecodingError(f"Invalid {self.content_encoding} body: {e}") from e
+        self.decoded_bytes += len(data)
+        return data
+    
+    def stats(self) -> Dict[str, object]:
+        """Return the coding and byte counts for a fetch result."""
+        return {
+            "content_encoding": self.content_encoding,
+            "wire_bytes": self.wire_bytes,
+            "decoded_bytes": self.decoded_bytes
+        }
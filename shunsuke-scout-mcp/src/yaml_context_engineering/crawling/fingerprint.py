@@ -0,0 +1,239 @@
+"""Content fingerprinting for exact and near-duplicate detection."""
+
+import hashlib
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set
+
+from .urls import canonicalize_url
+
+
+SIMHASH_BITS = 64
+SHINGLE_SIZE = 3
+
+# Below this many words SimHash is too noisy to call pages near duplicates
+MIN_WORDS_FOR_SIMHASH = 20
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def _shingle_digests(words: List[str]) -> List[bytes]:
+    """Hash each distinct word shingle to eight bytes."""
+    if len(words) < SHINGLE_SIZE:
+        shingles = {" ".join(words)}
+    else:
+        shingles = {
+            " ".join(words[i:i + SHINGLE_SIZE])
+            for i in range(len(words) - SHINGLE_SIZE + 1)
+        }
+    return [hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest() for s in shingles]
+
+
+def simhash(words: List[str]) -> int:
+    """Compute the 64-bit SimHash of a word sequence.
+    
+    Each distinct 3-word shingle votes on every bit of the fingerprint.
+    Rather than testing 64 bits per shingle, digests are split into byte
+    columns and each column's byte values are counted at C speed; the
+    per-bit tallies are then derived from at most 256 distinct values per
+    column.
+    
+    Args:
+        words: Normalized words of the document
+    
+    Returns:
+        SimHash as an integer
+    """
+    digests = _shingle_digests(words)
+    tallies = [0] * SIMHASH_BITS
+    for column, byte_values in enumerate(zip(*digests)):
+        for value, count in Counter(byte_values).items():
+            for bit in range(8):
+                if value >> bit & 1:
+                    tallies[column * 8 + bit] += count
+    
+    half = len(digests) / 2
+    fingerprint = 0
+    for position, tally in enumerate(tallies):
+        if tally > half:
+            fingerprint |= 1 << position
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Return the number of differing bits between two fingerprints."""
+    return bin(a ^ b).count("1")
+
+
+@dataclass(frozen=True)
+class Fingerprint:
+    """Exact and similarity fingerprints of a document."""
+    
+    sha256: str
+    simhash: int
+    words: int
+    
+    @classmethod
+    def of(cls, text: str) -> "Fingerprint":
+        """Fingerprint a document.
+        
+        Text is lower-cased and reduced to its words first, so whitespace
+        and punctuation differences do not affect either fingerprint.
+        
+        Args:
+            text: Document text (usually Markdown)
+        
+        Returns:
+            Fingerprint of the text
+        """
+        words = _WORD_PATTERN.findall(text.lower())
+        digest = hashlib.sha256(" ".join(words).encode("utf-8")).hexdigest()
+        return cls(sha256=digest, simhash=simhash(words) if words else 0, words=len(words))
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable dictionary."""
+        return {"sha256": self.sha256, "simhash": f"{self.simhash:016x}", "words": self.words}
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Fingerprint":
+        """Create a fingerprint from to_dict() output."""
+        return cls(sha256=data["sha256"], simhash=int(data["simhash"], 16), words=data["words"])
+
+
+@dataclass(frozen=True)
+class DuplicateMatch:
+    """A previously seen document that a new one duplicates."""
+    
+    url: str
+    exact: bool
+    distance: int
+
+
+class DuplicateDetector:
+    """Index of document fingerprints for duplicate suppression.
+    
+    Exact duplicates are found through a hash table keyed by SHA-256.
+    Near duplicates are documents whose SimHashes differ in at most
+    ``threshold`` bits. The 64-bit SimHash is cut into ``threshold + 1``
+    bands; by the pigeonhole principle any two fingerprints within the
+    threshold agree on at least one whole band, so only documents sharing
+    a band bucket are compared.
+    """
+    
+    def __init__(self, threshold: int = 3):
+        """Initialize the detector.
+        
+        Args:
+            threshold: Maximum differing SimHash bits for near duplicates
+        """
+        self.threshold = threshold
+        self._bands = threshold + 1
+        self._band_width = -(-SIMHASH_BITS // self._bands)
+        
+        self._exact: Dict[str, str] = {}
+        self._urls: Dict[str, str] = {}  # Indexed URL by canonical URL
+        self._sha256s: Dict[str, str] = {}  # Content hash indexed for each URL
+        self._simhashes: Dict[str, int] = {}
+        self._buckets: Dict[tuple, Set[str]] = defaultdict(set)
+    
+    def _band_keys(self, value: int) -> List[tuple]:
+        """Split a SimHash into its band bucket keys."""
+        mask = (1 << self._band_width) - 1
+        return [(band, value >> (band * self._band_width) & mask) for band in range(self._bands)]
+    
+    def find(self, fingerprint: Fingerprint) -> Optional[DuplicateMatch]:
+        """Find an indexed document duplicating a fingerprint.
+        
+        Args:
+            fingerprint: Fingerprint of the new document
+        
+        Returns:
+            The closest match, or None
+        """
+        url = self._exact.get(fingerprint.sha256)
+        if url is not None:
+            return DuplicateMatch(url=url, exact=True, distance=0)
+        
+        if self.threshold <= 0 or fingerprint.words < MIN_WORDS_FOR_SIMHASH:
+            return None
+        
+        best: Optional[DuplicateMatch] = None
+        candidates = set()
+        for key in self._band_keys(fingerprint.simhash):
+            candidates.update(self._buckets.get(key, ()))
+        for candidate in candidates:
+            distance = hamming_distance(fingerprint.simhash, self._simhashes[candidate])
+            if distance <= self.threshold and (best is None or distance < best.distance):
+                best = DuplicateMatch(url=candidate, exact=False, distance=distance)
+        return best
+    
+    def add(self, url: str, fingerprint: Fingerprint) -> None:
+        """Index a document.
+        
+        Adding a URL again (in any canonically equal form) replaces its
+        previous fingerprint, so a page re-fetched with changed content is
+        compared by its new content.
+        
+        Args:
+            url: URL identifying the document
+            fingerprint: Fingerprint of the document
+        """
+        canonical = canonicalize_url(url)
+        previous = self._urls.get(canonical)
+        if previous is not None:
+            self._remove(previous)
+        self._urls[canonical] = url
+        self._sha256s[url] = fingerprint.sha256
+        self._exact.setdefault(fingerprint.sha256, url)
+        if fingerprint.words >= MIN_WORDS_FOR_SIMHASH:
+            self._simhashes[url] = fingerprint.simhash
+            for key in self._band_keys(fingerprint.simhash):
+                self._buckets[key].add(url)
+    
+    def _remove(self, url: str) -> None:
+        """Drop the fingerprint indexed for a URL, if any."""
+        sha256 = self._sha256s.pop(url, None)
+        if sha256 is not None and self._exact.get(sha256) == url:
+            del self._exact[sha256]
+        
+        simhash = self._simhashes.pop(url, None)
+        if simhash is None:
+            return
+        for key in self._band_keys(simhash):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(url)
+                if not bucket:
+                    del self._buckets[key]
+    
+    def check(
+        self,
+        url: str,
+        text: str,
+        fingerprint: Optional[Fingerprint] = None
+    ) -> Optional[DuplicateMatch]:
+        """Check a document and index it if it is new.
+        
+        A document never duplicates itself: a match on the same canonical
+        URL is ignored, so the same page may be checked at several stages.
+        
+        Args:
+            url: URL identifying the document
+            text: Document text
+            fingerprint: Precomputed fingerprint of the text, if any
+        
+        Returns:
+            The document it duplicates, or None if it is unique
+        """
+        fingerprint = fingerprint or Fingerprint.of(text)
+        match = self.find(fingerprint)
+        if match is not None and canonicalize_url(match.url) != canonicalize_url(url):
+            return match
+        
+        self.add(url, fingerprint)
+        return None
+    
+    def __len__(self) -> int:
+        """Return the number of distinct documents indexed."""
+        return len(self._exact)
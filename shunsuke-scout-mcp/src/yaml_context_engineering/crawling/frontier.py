@@ -0,0 +1,236 @@
+"""Crawl frontier for recursive web crawling."""
+
+import asyncio
+import itertools
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+from .seen_store import SeenURLStore
+from .urls import canonicalize_url
+
+
+@dataclass(order=True)
+class FrontierEntry:
+    """A URL waiting in the crawl frontier."""
+    
+    sort_key: Tuple[float, int, int]
+    url: str = field(compare=False)
+    depth: int = field(compare=False, default=1)
+    priority: float = field(compare=False, default=0.5)
+    parent_url: Optional[str] = field(compare=False, default=None)
+
+
+class CrawlFrontier:
+    """Priority queue of URLs to crawl with depth and per-domain budgets.
+    
+    Seed URLs have depth 1. A URL is only admitted while its depth does
+    not exceed ``max_depth`` and its domain has pages left in the
+    ``max_pages_per_domain`` budget. Higher priority URLs are served
+    first; ties are broken by depth, then by insertion order.
+    
+    URLs are deduplicated on their canonical form. When a
+    ``SeenURLStore`` is given, discovered URLs already fetched by an
+    earlier crawl are not admitted; seed URLs are always admitted.
+    
+    ``snapshot`` and ``restore`` save and reload the queue, seen set and
+    budgets, so an interrupted crawl can continue where it stopped.
+    """
+    
+    def __init__(
+        self,
+        max_depth: int,
+        max_pages_per_domain: int,
+        max_pages: Optional[int] = None,
+        seen_store: Optional[SeenURLStore] = None
+    ):
+        """Initialize the frontier.
+        
+        Args:
+            max_depth: Maximum link depth to crawl (seed pages are depth 1)
+            max_pages_per_domain: Maximum pages to fetch from one domain
+            max_pages: Optional overall page budget for the crawl
+            seen_store: Optional store of URLs fetched by earlier crawls
+        """
+        self.max_depth = max_depth
+        self.max_pages_per_domain = max_pages_per_domain
+        self.max_pages = max_pages
+        self.seen_store = seen_store
+        
+        self._queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._counter = itertools.count()
+        self.seen: Set[str] = set()
+        self.pages_per_domain: Counter = Counter()
+        self.pages_dispatched = 0
+        self.skipped: Counter = Counter()
+        
+        # Queued and claimed-but-unfinished entries, for snapshots
+        self._pending: Dict[int, FrontierEntry] = {}
+        self._in_flight: Dict[int, FrontierEntry] = {}
+    
+    @staticmethod
+    def domain_of(url: str) -> str:
+        """Return the domain (netloc) a URL belongs to."""
+        return urlparse(url).netloc.lower()
+    
+    def _budget_left(self, domain: str) -> bool:
+        """Check whether another page may be fetched from a domain."""
+        if self.max_pages is not None and self.pages_dispatched >= self.max_pages:
+            return False
+        return self.pages_per_domain[domain] < self.max_pages_per_domain
+    
+    def push(
+        self,
+        url: str,
+        depth: int,
+        priority: float = 0.5,
+        parent_url: Optional[str] = None
+    ) -> bool:
+        """Add a URL to the frontier.
+        
+        Args:
+            url: URL to enqueue
+            depth: Link depth of the URL
+            priority: Priority score (0.0 to 1.0, higher is fetched sooner)
+            parent_url: URL of the page the link was found on
+        
+        Returns:
+            True if the URL was enqueued
+        """
+        key = canonicalize_url(url)
+        if key in self.seen:
+            self.skipped["seen"] += 1
+            return False
+        if depth > self.max_depth:
+            self.skipped["depth"] += 1
+            return False
+        if depth > 1 and self.seen_store is not None and key in self.seen_store:
+            self.skipped["fetched"] += 1
+            return False
+        if not self._budget_left(self.domain_of(url)):
+            self.skipped["budget"] += 1
+            return False
+        
+        self.seen.add(key)
+        self._enqueue(url, depth, priority, parent_url)
+        return True
+    
+    def _enqueue(self, url: str, depth: int, priority: float, parent_url: Optional[str]) -> None:
+        """Put an admitted URL on the queue."""
+        entry = FrontierEntry(
+            sort_key=(-priority, depth, next(self._counter)),
+            url=url,
+            depth=depth,
+            priority=priority,
+            parent_url=parent_url
+        )
+        self._pending[entry.sort_key[2]] = entry
+        self._queue.put_nowait(entry)
+    
+    async def get(self) -> FrontierEntry:
+        """Wait for the next entry in priority order."""
+        entry = await self._queue.get()
+        self._pending.pop(entry.sort_key[2], None)
+        return entry
+    
+    def claim(self, entry: FrontierEntry) -> bool:
+        """Reserve budget for fetching an entry.
+        
+        Budgets are charged when a URL is dispatched rather than when it
+        is enqueued, so that high priority URLs discovered late still win
+        over low priority URLs discovered early.
+        
+        Args:
+            entry: Entry taken from the frontier
+        
+        Returns:
+            True if the entry may be fetched
+        """
+        domain = self.domain_of(entry.url)
+        if not self._budget_left(domain):
+            self.skipped["budget"] += 1
+            return False
+        self.pages_per_domain[domain] += 1
+        self.pages_dispatched += 1
+        self._in_flight[entry.sort_key[2]] = entry
+        return True
+    
+    def release(self, entry: FrontierEntry, reason: str) -> None:
+        """Give up on an entry taken from the frontier without fetching it.
+        
+        A claimed entry gets its budget back, so URLs that could not be
+        fetched (disallowed by robots.txt, for instance) do not use up the
+        pages of their domain.
+        
+        Args:
+            entry: Entry taken from the frontier
+            reason: Reason counted in the skipped statistics
+        """
+        if self._in_flight.pop(entry.sort_key[2], None) is not None:
+            self.pages_per_domain[self.domain_of(entry.url)] -= 1
+            self.pages_dispatched -= 1
+        self.skipped[reason] += 1
+    
+    def finish(self, entry: FrontierEntry) -> None:
+        """Record that a claimed entry has been fetched and its links added."""
+        self._in_flight.pop(entry.sort_key[2], None)
+    
+    def task_done(self) -> None:
+        """Mark the last retrieved entry as processed."""
+        self._queue.task_done()
+    
+    async def join(self) -> None:
+        """Wait until every enqueued entry has been processed."""
+        await self._queue.join()
+    
+    def __len__(self) -> int:
+        """Return the number of queued entries."""
+        return self._queue.qsize()
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the frontier state as JSON-serializable data.
+        
+        Claimed entries that have not finished are put back on the queue
+        and their budget is released, so a restored frontier fetches them
+        again.
+        
+        Returns:
+            State accepted by ``restore``
+        """
+        in_flight = list(self._in_flight.values())
+        pages_per_domain = Counter(self.pages_per_domain)
+        pages_per_domain.subtract(self.domain_of(entry.url) for entry in in_flight)
+        
+        return {
+            "pending": [
+                [entry.url, entry.depth, entry.priority, entry.parent_url]
+                for entry in sorted([*in_flight, *self._pending.values()])
+            ],
+            "seen": list(self.seen),
+            "pages_per_domain": {domain: count for domain, count in pages_per_domain.items() if count > 0},
+            "pages_dispatched": self.pages_dispatched - len(in_flight),
+            "skipped": dict(self.skipped)
+        }
+    
+    def restore(self, state: Dict[str, Any]) -> None:
+        """Load a state returned by ``snapshot`` into an empty frontier.
+        
+        Args:
+            state: Saved frontier state
+        """
+        self.seen.update(state["seen"])
+        self.pages_per_domain.update(state["pages_per_domain"])
+        self.pages_dispatched = state["pages_dispatched"]
+        self.skipped.update(state["skipped"])
+        for url, depth, priority, parent_url in state["pending"]:
+            self._enqueue(url, depth, priority, parent_url)
+    
+    def stats(self) -> Dict[str, object]:
+        """Return frontier statistics."""
+        return {
+            "urls_seen": len(self.seen),
+            "pages_dispatched": self.pages_dispatched,
+            "pages_per_domain": dict(self.pages_per_domain),
+            "skipped": dict(self.skipped)
+        }
@@ -0,0 +1,237 @@
+"""Per-host health tracking: adaptive concurrency, circuit breaking and retry rules."""
+
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+
+# Statuses worth retrying: timeouts, throttling and transient server errors
+RETRY_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+# Statuses that mean the host asks us to slow down
+OVERLOAD_STATUSES = frozenset({429, 503})
+
+
+class CircuitOpenError(Exception):
+    """Raised when a request is refused because its host is failing."""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a ``Retry-After`` header.
+    
+    Args:
+        value: Delay in seconds or an HTTP date
+    
+    Returns:
+        Seconds to wait (never negative), or None if missing or malformed
+    """
+    if not value:
+        return None
+    
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+@dataclass
+class _HostState:
+    """Health of a single host."""
+    
+    limit: float
+    in_flight: int = 0
+    failures: int = 0
+    opened_at: Optional[float] = None
+    probing: bool = False
+    not_before: float = 0.0
+    changed: asyncio.Condition = field(default_factory=asyncio.Condition)
+
+
+class HostHealth:
+    """Tracks the health of every host and gates requests to it.
+    
+    Each host gets a concurrency limit managed AIMD-style: every success
+    raises it by roughly one request per window, up to
+    ``max_concurrency``, and every overload signal (429, 503, timeout)
+    halves it, down to one.
+    
+    After ``failure_threshold`` consecutive failures the host's circuit
+    opens: new and queued requests fail immediately with
+    ``CircuitOpenError`` instead of waiting on a dead host. After
+    ``reset_seconds`` a single probe request is let through; its success
+    closes the circuit again, its failure keeps it open for another
+    period, as does a probe that ends without recording either.
+    
+    A ``Retry-After`` delay from a host holds back all requests to that
+    host, but never requests to other hosts.
+    """
+    
+    def __init__(
+        self,
+        max_concurrency: int,
+        failure_threshold: int = 5,
+        reset_seconds: float = 30.0
+    ):
+        """Initialize the tracker.
+        
+        Args:
+            max_concurrency: Upper bound of each host's concurrency limit
+            failure_threshold: Consecutive failures that open a circuit
+            reset_seconds: How long an open circuit rejects requests
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self._hosts: Dict[str, _HostState] = {}
+    
+    def _state(self, host: str) -> _HostState:
+        """Return the state of a host, creating it on first use."""
+        state = self._hosts.get(host)
+        if state is None:
+            state = _HostState(limit=float(self.max_concurrency))
+            self._hosts[host] = state
+        return state
+    
+    def circuit_state(self, host: str) -> str:
+        """Return ``closed``, ``open`` or ``half_open`` for a host."""
+        state = self._hosts.get(host)
+        if state is None or state.opened_at is None:
+            return "closed"
+        if time.monotonic() - state.opened_at < self.reset_seconds:
+            return "open"
+        return "half_open"
+    
+    def check(self, host: str) -> None:
+        """Fail fast if a host's circuit does not admit another request.
+        
+        Args:
+            host: Host name (netloc)
+        
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with its
+                probe request still in flight
+        """
+        state = self._hosts.get(host)
+        if state is None:
+            return
+        circuit = self.circuit_state(host)
+        if circuit == "open" or (circuit == "half_open" and state.probing):
+            raise CircuitOpenError(f"Circuit open for {host} after {state.failures} failures")
+    
+    @asynccontextmanager
+    async def slot(self, host: str):
+        """Hold one of a host's concurrency slots for a request.
+        
+        Args:
+            host: Host name (netloc)
+        
+        Raises:
+            CircuitOpenError: If the host's circuit is open
+        """
+        self.check(host)
+        state = self._state(host)
+        
+        # Honour a Retry-After the host sent to an earlier request
+        delay = state.not_before - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        
+        async with state.changed:
+            while True:
+                self.check(host)
+                if state.in_flight < int(state.limit):
+                    break
+                await state.changed.wait()
+            state.in_flight += 1
+            probe = self.circuit_state(host) == "half_open"
+            if probe:
+                state.probing = True
+        
+        try:
+            yield
+        finally:
+            # A probe that ended without a recorded outcome (an unexpected
+            # error or a cancellation) reopens the circuit instead of
+            # leaving it half-open and rejecting requests forever
+            if probe and state.probing:
+                state.opened_at = time.monotonic()
+                state.probing = False
+            async with state.changed:
+                state.in_flight -= 1
+                state.changed.notify_all()
+    
+    def record_success(self, host: str) -> None:
+        """Record a request the host answered normally."""
+        state = self._state(host)
+        state.failures = 0
+        state.opened_at = None
+        state.probing = False
+        state.limit = min(float(self.max_concurrency), state.limit + 1.0 / state.limit)
+    
+    def record_failure(self, host: str, overloaded: bool = False, retry_after: Optional[float] = None) -> None:
+        """Record a failed request.
+        
+        Args:
+            host: Host name (netloc)
+            overloaded: The failure signals overload; halve the limit
+            retry_after: Seconds the host asked us to wait, if any
+        """
+        state = self._state(host)
+        state.failures += 1
+        if overloaded:
+            state.limit = max(1.0, state.limit / 2)
+        if retry_after:
+            state.not_before = max(state.not_before, time.monotonic() + retry_after)
+        
+        # A failed probe reopens the circuit for another period
+        if state.failures >= self.failure_threshold or state.probing:
+            state.opened_at = time.monotonic()
+            state.probing = False
+    
+    def stats(self) -> Dict[str, Dict[str, object]]:
+        """Return the health of every host seen so far."""
+        return {
+            host: {
+                "limit": round(state.limit, 2),
+                "consecutive_failures": state.failures,
+                "circuit": self.circuit_state(host)
+            }
+            for host, state in self._hosts.items()
+        }
+
+
+def retry_delay(
+    attempt: int,
+    retry_after: Optional[float] = None,
+    base: float = 0.5,
+    cap: float = 10.0,
+    max_retry_after: float = 60.0
+) -> Optional[float]:
+    """Return how long to wait before the next attempt.
+    
+    Args:
+        attempt: Number of the attempt that failed (0 for the first)
+        retry_after: Delay requested by the server, if any
+        base: Backoff for the first retry
+        cap: Upper bound of the exponential backoff
+        max_retry_after: Longest server-requested delay worth waiting for
+    
+    Returns:
+        Seconds to wait, or None if the request should not be retried
+    """
+    if retry_after is not None:
+        return retry_after if retry_after <= max_retry_after else None
+    # Exponential backoff with jitter so retries from many requests spread out
+    return min(cap, base * 2 ** attempt) * random.uniform(0.5, 1.0)
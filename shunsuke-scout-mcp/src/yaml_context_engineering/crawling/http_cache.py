@@ -0,0 +1,119 @@
+"""On-disk HTTP cache for conditional re-fetching."""
+
+import contextlib
+import hashlib
+import json
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import aiofiles
+
+from ..utils.logging import get_logger
+
+
+class HTTPCache:
+    """Stores validators and converted results for fetched URLs.
+    
+    For each URL the cache keeps the ``ETag`` and ``Last-Modified``
+    response headers together with the converted fetch result. A later
+    fetch sends them back as ``If-None-Match`` / ``If-Modified-Since``;
+    when the server answers ``304 Not Modified`` the stored result is
+    reused without downloading or converting the page again.
+    
+    Entries are JSON files sharded by the first two hex digits of the
+    SHA-256 of the URL.
+    """
+    
+    def __init__(self, cache_dir: Path):
+        """Initialize the cache.
+        
+        Args:
+            cache_dir: Directory holding cache entries
+        """
+        self.cache_dir = cache_dir
+        self.logger = get_logger(__name__)
+    
+    def _entry_path(self, url: str) -> Path:
+        """Return the file holding the entry for a URL."""
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.cache_dir / digest[:2] / f"{digest}.json"
+    
+    async def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Load the cache entry for a URL.
+        
+        Args:
+            url: Requested URL
+        
+        Returns:
+            Entry with ``etag``, ``last_modified`` and ``result`` keys, or None
+        """
+        entry_path = self._entry_path(url)
+        if not entry_path.exists():
+            return None
+        
+        try:
+            async with aiofiles.open(entry_path, 'r', encoding='utf-8') as f:
+                entry = json.loads(await f.read())
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable HTTP cache entry for {url}", error=str(e))
+            return None
+        
+        return entry if entry.get("url") == url else None
+    
+    async def put(
+        self,
+        url: str,
+        result: Dict[str, Any],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ) -> None:
+        """Store a fetch result with its validators.
+        
+        Results without any validator cannot be revalidated and are not
+        stored. Write errors are logged rather than raised, so a failing
+        cache never fails the fetch it belongs to.
+        
+        Args:
+            url: Requested URL
+            result: Converted fetch result
+            etag: ETag response header
+            last_modified: Last-Modified response header
+        """
+        if not etag and not last_modified:
+            return
+        
+        entry_path = self._entry_path(url)
+        entry = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "stored_at": time.time(),
+            "result": result
+        }
+        
+        # Write to a temporary file first so readers never see partial JSON;
+        # the name is unique so concurrent writers of one entry (two
+        # fetches of a URL, or two crawls sharing the cache) never share it
+        tmp_path = entry_path.with_name(f"{entry_path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            entry_path.parent.mkdir(parents=True, exist_ok=True)
+            async with aiofiles.open(tmp_path, 'w', encoding='utf-8') as f:
+                await f.write(json.dumps(entry, ensure_ascii=False))
+            tmp_path.replace(entry_path)
+        except (OSError, TypeError, ValueError) as e:
+            self.logger.warning(f"Failed to write HTTP cache entry for {url}", error=str(e))
+            with contextlib.suppress(OSError):
+                tmp_path.unlink()
+    
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Build conditional request headers from a cache entry."""
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
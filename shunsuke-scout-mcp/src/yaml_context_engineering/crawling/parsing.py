@@ -0,0 +1,143 @@
+"""CPU-bound HTML processing for fetched pages.
+
+Functions in this module are pure and picklable so that the fetcher can
+run them in a process pool, away from the event loop. Each page is
+tokenized once: the Markdown conversion pass also collects the title,
+meta description and links.
+"""
+
+from typing import Any, Dict, List, Optional
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+import html2text
+from langdetect import detect
+import validators
+
+from .fingerprint import Fingerprint
+
+
+class PageConverter(html2text.HTML2Text):
+    """HTML to Markdown converter that also collects page metadata.
+    
+    While html2text tokenizes the document to produce Markdown, the tag
+    callback records the first ``<title>``, the meta description and the
+    ``href`` of every anchor, so a page is parsed exactly once.
+    """
+    
+    def __init__(self, base_url: str = ""):
+        """Initialize the converter.
+        
+        Args:
+            base_url: URL the document was fetched from, used to resolve links
+        """
+        super().__init__()
+        self.ignore_links = False
+        self.ignore_images = True
+        self.body_width = 0  # No line wrapping
+        self.tag_callback = self._record_tag
+        
+        self.base_url = base_url
+        self.page_title = ""
+        self.meta_description = ""
+        self.hrefs: Dict[str, None] = {}  # Insertion-ordered set
+        self._title_parts: Optional[List[str]] = None
+        self._title_done = False
+    
+    def _record_tag(self, parser: html2text.HTML2Text, tag: str,
+                    attrs: Dict[str, Optional[str]], start: bool) -> bool:
+        """Record metadata and links; always defer to the default handling."""
+        if tag == "a" and start:
+            href = attrs.get("href")
+            if href:
+                self.hrefs[href.strip()] = None
+        elif tag == "title" and not self._title_done:
+            if start:
+                self._title_parts = []
+            elif self._title_parts is not None:
+                self.page_title = " ".join("".join(self._title_parts).split())
+                self._title_parts = None
+                self._title_done = True
+        elif tag == "meta" and start and not self.meta_description:
+            if (attrs.get("name") or "").lower() == "description":
+                self.meta_description = attrs.get("content") or ""
+        return False
+    
+    def handle_data(self, data: str, entity_char: bool = False) -> None:
+        """Collect title text before passing data on to html2text."""
+        if self._title_parts is not None:
+            self._title_parts.append(data)
+        super().handle_data(data, entity_char)
+    
+    def links(self) -> List[str]:
+        """Return the unique absolute HTTP(S) links found in the document."""
+        urls = {}
+        for href in self.hrefs:
+            absolute_url = urljoin(self.base_url, href)
+            # Cheap scheme check before the comparatively slow validator
+            if absolute_url.startswith(("http://", "https://")) and absolute_url not in urls:
+                if validators.url(absolute_url):
+                    urls[absolute_url] = None
+        return list(urls)
+
+
+def detect_language(text: str) -> str:
+    """Detect the language of a text sample.
+    
+    Args:
+        text: Text to analyze
+    
+    Returns:
+        ISO 639-1 language code, or "unknown"
+    """
+    try:
+        return detect(text[:1000])
+    except Exception:
+        return "unknown"
+
+
+def extract_links(soup: BeautifulSoup, base_url: str) -> List[str]:
+    """Extract absolute link URLs from a parsed HTML document.
+    
+    Args:
+        soup: BeautifulSoup object
+        base_url: Base URL for resolving relative URLs
+    
+    Returns:
+        List of unique extracted URLs in document order
+    """
+    urls = {}
+    
+    # Navigation links are ordinary anchors too, so one walk covers them
+    for link in soup.find_all("a", href=True):
+        absolute_url = urljoin(base_url, link["href"])
+        if absolute_url not in urls and validators.url(absolute_url):
+            urls[absolute_url] = None
+    
+    return list(urls)
+
+
+def process_html(html: str, base_url: str, language_detection: bool = True) -> Dict[str, Any]:
+    """Parse an HTML page into metadata, links and Markdown.
+    
+    Args:
+        html: Raw HTML document
+        base_url: URL the document was fetched from
+        language_detection: Whether to detect the content language
+    
+    Returns:
+        Dictionary with content, title, meta_description, language,
+        extracted_urls and fingerprint keys
+    """
+    # One tokenizer pass yields the Markdown and all metadata
+    converter = PageConverter(base_url)
+    markdown_content = converter.handle(html)
+    
+    return {
+        "content": markdown_content,
+        "title": converter.page_title,
+        "meta_description": converter.meta_description,
+        "language": detect_language(markdown_content) if language_detection else "unknown",
+        "extracted_urls": converter.links(),
+        "fingerprint": Fingerprint.of(markdown_content).to_dict()
+    }
@@ -0,0 +1,77 @@
+"""Long-lived HTTP connection pool shared by the crawling tools."""
+
+from typing import Optional
+
+import aiohttp
+
+from ..config import CrawlingConfig
+from ..utils.logging import get_logger
+
+
+class ConnectionPool:
+    """Owns the aiohttp session and connector for a server's lifetime.
+    
+    One session is created lazily and reused by every request, so repeated
+    requests to a host ride on warm keep-alive connections instead of
+    paying for a new TCP and TLS handshake each time. Resolved addresses
+    are cached for ``dns_cache_ttl_seconds``.
+    
+    Timeouts are applied per request rather than baked into the session,
+    so callers can use different timeouts without rebuilding the pool.
+    """
+    
+    def __init__(self, config: CrawlingConfig):
+        """Initialize the pool.
+        
+        Args:
+            config: Crawling configuration
+        """
+        self.config = config
+        self.logger = get_logger(__name__)
+        self._session: Optional[aiohttp.ClientSession] = None
+    
+    def _create_connector(self) -> aiohttp.TCPConnector:
+        """Create the connector backing the session."""
+        return aiohttp.TCPConnector(
+            limit=self.config.max_concurrent_requests,
+            limit_per_host=self.config.max_concurrent_per_host,
+            use_dns_cache=True,
+            ttl_dns_cache=self.config.dns_cache_ttl_seconds,
+            keepalive_timeout=self.config.keepalive_timeout_seconds
+        )
+    
+    async def session(self) -> aiohttp.ClientSession:
+        """Get the shared session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=self._create_connector(),
+                timeout=self.request_timeout(),
+                headers={"User-Agent": self.config.user_agent}
+            )
+            self.logger.debug(
+                "Created HTTP connection pool",
+                limit=self.config.max_concurrent_requests,
+                limit_per_host=self.config.max_concurrent_per_host
+            )
+        return self._session
+    
+    def request_timeout(self, total: Optional[float] = None) -> aiohttp.ClientTimeout:
+        """Build a timeout for a single request.
+        
+        Args:
+            total: Total seconds allowed, or None for the configured default
+        
+        Returns:
+            Timeout to pass to the request
+        """
+        return aiohttp.ClientTimeout(total=total if total is not None else self.config.timeout_seconds)
+    
+    @property
+    def closed(self) -> bool:
+        """Whether the pool has no open session."""
+        return self._session is None or self._session.closed
+    
+    async def close(self) -> None:
+        """Close the session and every pooled connection."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
@@ -0,0 +1,236 @@
+"""robots.txt fetching, caching and enforcement."""
+
+import asyncio
+import json
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+import aiofiles
+import aiohttp
+
+from ..utils.logging import get_logger
+
+
+class RobotsRules:
+    """Parsed robots.txt rules for one origin."""
+    
+    def __init__(
+        self,
+        origin: str,
+        lines: List[str],
+        user_agent: str,
+        fetched_at: float,
+        status: int = 200,
+        disallow_all: bool = False
+    ):
+        """Initialize the rules.
+        
+        Args:
+            origin: Scheme and host the rules apply to
+            lines: Raw robots.txt lines
+            user_agent: User agent the rules are evaluated for
+            fetched_at: Unix time the file was fetched
+            status: HTTP status of the robots.txt response
+            disallow_all: Deny every URL (robots.txt was unreachable)
+        """
+        self.origin = origin
+        self.lines = lines
+        self.user_agent = user_agent
+        self.fetched_at = fetched_at
+        self.status = status
+        self.disallow_all = disallow_all
+        
+        self._parser = RobotFileParser()
+        self._parser.parse(lines)
+        if disallow_all:
+            self._parser.disallow_all = True
+    
+    def allowed(self, url: str) -> bool:
+        """Check whether a URL may be fetched."""
+        return self._parser.can_fetch(self.user_agent, url)
+    
+    @property
+    def crawl_delay(self) -> Optional[float]:
+        """Return the Crawl-delay for our user agent, if any."""
+        delay = self._parser.crawl_delay(self.user_agent)
+        return float(delay) if delay is not None else None
+    
+    @property
+    def sitemaps(self) -> List[str]:
+        """Return the sitemap URLs declared with ``Sitemap:`` lines."""
+        return list(self._parser.site_maps() or [])
+    
+    def is_expired(self, ttl_seconds: float) -> bool:
+        """Check whether the rules are older than the TTL."""
+        return time.time() - self.fetched_at > ttl_seconds
+    
+    def to_dict(self) -> Dict[str, object]:
+        """Convert to a JSON-serializable dictionary."""
+        return {
+            "origin": self.origin,
+            "lines": self.lines,
+            "fetched_at": self.fetched_at,
+            "status": self.status,
+            "disallow_all": self.disallow_all
+        }
+
+
+class RobotsCache:
+    """Per-origin robots.txt cache shared by every fetch.
+    
+    Each origin's robots.txt is fetched at most once per TTL, even when
+    many requests for it arrive concurrently. Parsed rules are kept in
+    memory and persisted as JSON under ``cache_dir`` so that later server
+    runs can reuse them.
+    
+    Responses are interpreted as in RFC 9309: a 4xx status means there
+    are no restrictions, while a 5xx status or a network error means the
+    whole origin is disallowed. Unreachable results are only kept in
+    memory and retried after ``retry_seconds``.
+    """
+    
+    def __init__(
+        self,
+        user_agent: str,
+        ttl_seconds: float = 86400,
+        cache_dir: Optional[Path] = None,
+        retry_seconds: float = 300
+    ):
+        """Initialize the cache.
+        
+        Args:
+            user_agent: User agent rules are evaluated for
+            ttl_seconds: How long fetched rules stay valid
+            cache_dir: Optional directory for persisted rules
+            retry_seconds: How long an unreachable robots.txt is trusted
+        """
+        self.user_agent = user_agent
+        self.ttl_seconds = ttl_seconds
+        self.cache_dir = cache_dir
+        self.retry_seconds = min(retry_seconds, ttl_seconds)
+        self.logger = get_logger(__name__)
+        
+        self._rules: Dict[str, RobotsRules] = {}
+        self._pending: Dict[str, asyncio.Task] = {}
+    
+    @staticmethod
+    def origin_of(url: str) -> str:
+        """Return the scheme and host a URL's robots.txt belongs to."""
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc.lower()}"
+    
+    def _cache_file(self, origin: str) -> Path:
+        """Return the on-disk cache file for an origin."""
+        return self.cache_dir / (re.sub(r"[^A-Za-z0-9.-]+", "_", origin) + ".json")
+    
+    def _is_fresh(self, rules: RobotsRules) -> bool:
+        """Check whether cached rules can still be used."""
+        ttl = self.retry_seconds if rules.disallow_all else self.ttl_seconds
+        return not rules.is_expired(ttl)
+    
+    async def _load(self, origin: str) -> Optional[RobotsRules]:
+        """Load persisted rules for an origin."""
+        if self.cache_dir is None:
+            return None
+        
+        cache_file = self._cache_file(origin)
+        if not cache_file.exists():
+            return None
+        
+        try:
+            async with aiofiles.open(cache_file, 'r', encoding='utf-8') as f:
+                data = json.loads(await f.read())
+            return RobotsRules(
+                origin=data["origin"],
+                lines=data["lines"],
+                user_agent=self.user_agent,
+                fetched_at=data["fetched_at"],
+                status=data.get("status", 200),
+                disallow_all=data.get("disallow_all", False)
+            )
+        except (OSError, ValueError, KeyError) as e:
+            self.logger.warning(f"Ignoring unreadable robots cache: {cache_file}", error=str(e))
+            return None
+    
+    async def _store(self, rules: RobotsRules) -> None:
+        """Persist rules for an origin."""
+        if self.cache_dir is None or rules.disallow_all:
+            return
+        
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        async with aiofiles.open(self._cache_file(rules.origin), 'w', encoding='utf-8') as f:
+            await f.write(json.dumps(rules.to_dict(), ensure_ascii=False))
+    
+    async def _download(self, origin: str, session: aiohttp.ClientSession) -> RobotsRules:
+        """Fetch and parse robots.txt for an origin."""
+        robots_url = f"{origin}/robots.txt"
+        try:
+            async with session.get(robots_url) as response:
+                if response.status >= 500:
+                    self.logger.warning(f"robots.txt unavailable: {robots_url}", status=response.status)
+                    return RobotsRules(origin, [], self.user_agent, time.time(),
+                                       status=response.status, disallow_all=True)
+                if response.status >= 400:
+                    lines = []
+                else:
+                    lines = (await response.text()).splitlines()
+                return RobotsRules(origin, lines, self.user_agent, time.time(), status=response.status)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.logger.warning(f"robots.txt unreachable: {robots_url}", error=str(e))
+            return RobotsRules(origin, [], self.user_agent, time.time(), status=0, disallow_all=True)
+    
+    async def _refresh(self, origin: str, session: aiohttp.ClientSession) -> RobotsRules:
+        """Load rules from disk or the network and cache them in memory."""
+        rules = await self._load(origin)
+        if rules is None or not self._is_fresh(rules):
+            rules = await self._download(origin, session)
+            await self._store(rules)
+        self._rules[origin] = rules
+        return rules
+    
+    def cached_rules(self, url: str) -> Optional[RobotsRules]:
+        """Return the rules for a URL if they are in memory and fresh.
+        
+        Args:
+            url: URL about to be fetched
+        
+        Returns:
+            Parsed rules for the URL's origin, or None if they would have
+            to be loaded or downloaded first
+        """
+        rules = self._rules.get(self.origin_of(url))
+        if rules is not None and self._is_fresh(rules):
+            return rules
+        return None
+    
+    async def get_rules(self, url: str, session: aiohttp.ClientSession) -> RobotsRules:
+        """Return the robots.txt rules that apply to a URL.
+        
+        Args:
+            url: URL about to be fetched
+            session: Session used if robots.txt must be downloaded
+        
+        Returns:
+            Parsed rules for the URL's origin
+        """
+        rules = self.cached_rules(url)
+        if rules is not None:
+            return rules
+        
+        # Share one download between concurrent callers
+        origin = self.origin_of(url)
+        task = self._pending.get(origin)
+        if task is None:
+            task = asyncio.ensure_future(self._refresh(origin, session))
+            self._pending[origin] = task
+            task.add_done_callback(lambda _: self._pending.pop(origin, None))
+        return await asyncio.shield(task)
+    
+    async def is_allowed(self, url: str, session: aiohttp.ClientSession) -> bool:
+        """Check whether robots.txt allows fetching a URL."""
+        rules = await self.get_rules(url, session)
+        return rules.allowed(url)
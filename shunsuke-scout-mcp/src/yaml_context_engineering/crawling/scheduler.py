@@ -0,0 +1,97 @@
+"""Per-host politeness scheduling for crawl requests."""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+
+@dataclass
+class _TokenBucket:
+    """Token bucket state for a single host."""
+    
+    tokens: float
+    updated_at: float
+    interval: float
+
+
+class HostScheduler:
+    """Token-bucket scheduler that spaces out requests to each host.
+    
+    Every host owns an independent bucket refilled at one token per
+    ``interval`` seconds, so requests to different hosts never wait on
+    each other. Tokens are reserved before sleeping, which keeps waiting
+    requests in FIFO order without a lock.
+    
+    The interval for a host is the larger of the configured crawl delay
+    and any ``Crawl-delay`` registered for it (e.g. from robots.txt).
+    """
+    
+    def __init__(self, default_delay: float, burst: int = 1):
+        """Initialize the scheduler.
+        
+        Args:
+            default_delay: Minimum seconds between requests to one host
+            burst: Number of requests a host may receive back to back
+        """
+        self.default_delay = max(0.0, default_delay)
+        self.burst = max(1, burst)
+        self._buckets: Dict[str, _TokenBucket] = {}
+        self._crawl_delays: Dict[str, float] = {}
+    
+    def set_crawl_delay(self, host: str, delay: Optional[float]) -> None:
+        """Register a host-specific crawl delay.
+        
+        Args:
+            host: Host name (netloc)
+            delay: Seconds between requests, or None to clear it
+        """
+        host = host.lower()
+        if delay is None:
+            self._crawl_delays.pop(host, None)
+        else:
+            self._crawl_delays[host] = max(0.0, float(delay))
+        
+        bucket = self._buckets.get(host)
+        if bucket is not None:
+            bucket.interval = self.delay_for(host)
+    
+    def delay_for(self, host: str) -> float:
+        """Return the effective delay between requests to a host."""
+        return max(self.default_delay, self._crawl_delays.get(host.lower(), 0.0))
+    
+    def _reserve(self, host: str) -> float:
+        """Take a token for a host and return how long to wait for it."""
+        now = time.monotonic()
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = _TokenBucket(tokens=self.burst, updated_at=now, interval=self.delay_for(host))
+            self._buckets[host] = bucket
+        
+        if bucket.interval <= 0:
+            return 0.0
+        
+        # Refill, then reserve one token; a negative balance is a queue of
+        # reservations that each wait one more interval
+        elapsed = now - bucket.updated_at
+        bucket.tokens = min(self.burst, bucket.tokens + elapsed / bucket.interval)
+        bucket.updated_at = now
+        bucket.tokens -= 1
+        
+        if bucket.tokens >= 0:
+            return 0.0
+        return -bucket.tokens * bucket.interval
+    
+    async def wait(self, host: str) -> float:
+        """Wait until a request to a host is allowed.
+        
+        Args:
+            host: Host name (netloc)
+        
+        Returns:
+            Seconds spent waiting
+        """
+        delay = self._reserve(host.lower())
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
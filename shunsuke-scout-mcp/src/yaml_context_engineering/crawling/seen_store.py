@@ -0,0 +1,136 @@
+"""Persistent record of URLs that have already been fetched."""
+
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from ..utils.logging import get_logger
+from .urls import canonicalize_url
+
+
+class SeenURLStore:
+    """Set of fetched URLs kept in memory and backed by SQLite.
+    
+    URLs are canonicalized before being stored or looked up, so variants
+    that differ only by fragment, trailing slash, host case, tracking
+    parameters or ``index.html`` count as the same page. Lookups hit the
+    in-memory set first and fall back to an indexed SQLite table, so the
+    store does not need to load every URL from earlier crawls up front.
+    
+    With ``ttl_seconds`` set, a URL counts as seen only if it was fetched
+    within that many seconds, so pages are eventually revisited.
+    """
+    
+    COMMIT_EVERY = 100
+    
+    def __init__(self, path: Optional[Path] = None, ttl_seconds: Optional[float] = None):
+        """Initialize the store.
+        
+        Args:
+            path: SQLite database file, or None to keep URLs in memory only
+            ttl_seconds: How long a fetched URL counts as seen (None = forever)
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.logger = get_logger(__name__)
+        
+        self._memory: Dict[str, float] = {}
+        self._db: Optional[sqlite3.Connection] = None
+        self._uncommitted = 0
+    
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """Open the database on first use."""
+        if self._db is None and self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(self.path))
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS seen_urls ("
+                "url TEXT PRIMARY KEY, fetched_at REAL NOT NULL)"
+            )
+        return self._db
+    
+    def _is_fresh(self, fetched_at: float) -> bool:
+        """Check whether a fetch time is within the TTL."""
+        return self.ttl_seconds is None or time.time() - fetched_at <= self.ttl_seconds
+    
+    def fetched_at(self, url: str) -> Optional[float]:
+        """Return when a URL was last fetched, ignoring the TTL.
+        
+        Args:
+            url: URL to look up
+        
+        Returns:
+            Unix time of the last fetch, or None if it was never fetched
+        """
+        key = canonicalize_url(url)
+        fetched_at = self._memory.get(key)
+        
+        if fetched_at is None:
+            db = self._connection()
+            if db is None:
+                return None
+            row = db.execute("SELECT fetched_at FROM seen_urls WHERE url = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            fetched_at = row[0]
+            self._memory[key] = fetched_at
+        
+        return fetched_at
+    
+    def is_unchanged(self, url: str, lastmod: Optional[float]) -> bool:
+        """Check whether a URL needs no refetch given its last modification.
+        
+        With a known ``lastmod`` a page is unchanged if it was fetched at or
+        after that time, regardless of the TTL; otherwise the TTL decides.
+        
+        Args:
+            url: URL to check
+            lastmod: Unix time the page was last modified, if known
+        
+        Returns:
+            True if the stored copy is still current
+        """
+        if lastmod is None:
+            return url in self
+        fetched_at = self.fetched_at(url)
+        return fetched_at is not None and fetched_at >= lastmod
+    
+    def __contains__(self, url: str) -> bool:
+        """Check whether a URL has been fetched (within the TTL)."""
+        fetched_at = self.fetched_at(url)
+        return fetched_at is not None and self._is_fresh(fetched_at)
+    
+    def add(self, url: str, fetched_at: Optional[float] = None) -> None:
+        """Record that a URL has been fetched.
+        
+        Args:
+            url: Fetched URL
+            fetched_at: Unix time of the fetch (defaults to now)
+        """
+        key = canonicalize_url(url)
+        fetched_at = fetched_at if fetched_at is not None else time.time()
+        self._memory[key] = fetched_at
+        
+        db = self._connection()
+        if db is not None:
+            db.execute(
+                "INSERT OR REPLACE INTO seen_urls (url, fetched_at) VALUES (?, ?)",
+                (key, fetched_at)
+            )
+            self._uncommitted += 1
+            if self._uncommitted >= self.COMMIT_EVERY:
+                self.flush()
+    
+    def flush(self) -> None:
+        """Commit pending writes to disk."""
+        if self._db is not None and self._uncommitted:
+            self._db.commit()
+            self._uncommitted = 0
+    
+    def close(self) -> None:
+        """Commit pending writes and close the database."""
+        self.flush()
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,231 @@
+"""Streaming sitemap.xml and sitemap index ingestion."""
+
+import asyncio
+import zlib
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import AsyncIterator, Iterable, List, Optional, Tuple
+from xml.etree.ElementTree import ParseError, XMLPullParser
+
+import aiohttp
+
+from ..utils.logging import get_logger
+from .pool import ConnectionPool
+
+
+# Uncompressed size limit from the sitemap protocol
+MAX_SITEMAP_BYTES = 50 * 1024 * 1024
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+@dataclass(frozen=True)
+class SitemapEntry:
+    """A page or child sitemap listed in a sitemap."""
+    
+    url: str
+    lastmod: Optional[float] = None  # Unix time
+
+
+def parse_lastmod(value: Optional[str]) -> Optional[float]:
+    """Parse a W3C datetime ``<lastmod>`` value.
+    
+    Args:
+        value: Date (``2024-05-01``) or datetime with optional offset
+    
+    Returns:
+        Unix time, or None if the value is missing or malformed
+    """
+    if not value:
+        return None
+    
+    value = value.strip()
+    if value.endswith(("Z", "z")):
+        value = value[:-1] + "+00:00"
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    
+    # Dates without an offset are taken as UTC
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _local_name(tag: str) -> str:
+    """Strip the XML namespace from a tag."""
+    return tag.rsplit("}", 1)[-1]
+
+
+class SitemapParser:
+    """Incremental parser for sitemap and sitemap index documents.
+    
+    Bytes are fed as they arrive from the network; gzip-compressed
+    sitemaps are detected by their magic number and inflated on the fly.
+    Each ``<url>`` or ``<sitemap>`` element is reported as soon as it is
+    complete and then discarded, so memory use does not grow with the
+    size of the sitemap.
+    """
+    
+    def __init__(self, max_bytes: int = MAX_SITEMAP_BYTES):
+        """Initialize the parser.
+        
+        Args:
+            max_bytes: Maximum uncompressed bytes accepted
+        """
+        self.max_bytes = max_bytes
+        self.bytes_parsed = 0
+        
+        self._parser = XMLPullParser(events=("start", "end"))
+        self._decompressor = None  # Set for gzip-compressed documents
+        self._started = False
+        self._root = None
+        self._loc: Optional[str] = None
+        self._lastmod: Optional[str] = None
+    
+    def feed(self, data: bytes) -> List[Tuple[str, SitemapEntry]]:
+        """Parse the next chunk of the document.
+        
+        Args:
+            data: Raw (possibly gzip-compressed) bytes
+        
+        Returns:
+            Completed items as ``("url", entry)`` for pages and
+            ``("sitemap", entry)`` for child sitemaps
+        
+        Raises:
+            ValueError: If the uncompressed document exceeds ``max_bytes``
+            xml.etree.ElementTree.ParseError: If the document is not well-formed
+        """
+        if not self._started and data:
+            self._started = True
+            if data.startswith(_GZIP_MAGIC):
+                self._decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+        
+        if self._decompressor is not None:
+            # Never inflate more than the remaining allowance in one step
+            data = self._decompressor.decompress(data, self.max_bytes - self.bytes_parsed + 1)
+            if self._decompressor.unconsumed_tail:
+                raise ValueError(f"Sitemap exceeds {self.max_bytes} bytes")
+        
+        self.bytes_parsed += len(data)
+        if self.bytes_parsed > self.max_bytes:
+            raise ValueError(f"Sitemap exceeds {self.max_bytes} bytes")
+        
+        self._parser.feed(data)
+        return self._drain()
+    
+    def close(self) -> List[Tuple[str, SitemapEntry]]:
+        """Finish parsing and return any remaining items."""
+        if self._decompressor is not None:
+            self._parser.feed(self._decompressor.flush())
+        self._parser.close()
+        return self._drain()
+    
+    def _drain(self) -> List[Tuple[str, SitemapEntry]]:
+        """Collect items completed by the data fed so far."""
+        items = []
+        for event, element in self._parser.read_events():
+            if event == "start":
+                if self._root is None:
+                    self._root = element
+                continue
+            
+            name = _local_name(element.tag)
+            if name == "loc":
+                self._loc = (element.text or "").strip()
+            elif name == "lastmod":
+                self._lastmod = element.text
+            elif name in ("url", "sitemap"):
+                if self._loc:
+                    items.append((name, SitemapEntry(self._loc, parse_lastmod(self._lastmod))))
+                self._loc = self._lastmod = None
+                # Processed elements are dropped to keep memory flat
+                self._root.clear()
+        return items
+
+
+class SitemapReader:
+    """Fetches sitemaps and yields the pages they list.
+    
+    Sitemap indexes are followed breadth-first, each sitemap is fetched
+    at most once, and at most ``max_sitemaps`` documents are read per
+    call. Bodies are streamed through ``SitemapParser``, so the first
+    pages are available before a large sitemap has finished downloading.
+    """
+    
+    CHUNK_SIZE = 64 * 1024
+    
+    def __init__(
+        self,
+        pool: ConnectionPool,
+        max_sitemaps: int = 50,
+        max_bytes: int = MAX_SITEMAP_BYTES
+    ):
+        """Initialize the reader.
+        
+        Args:
+            pool: Connection pool used for requests
+            max_sitemaps: Maximum number of sitemap documents read per call
+            max_bytes: Maximum uncompressed bytes per sitemap document
+        """
+        self.pool = pool
+        self.max_sitemaps = max_sitemaps
+        self.max_bytes = max_bytes
+        self.logger = get_logger(__name__)
+        self._session: Optional[aiohttp.ClientSession] = None
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Get the HTTP session from the shared pool."""
+        if self._session is None or self._session.closed:
+            self._session = await self.pool.session()
+        return self._session
+    
+    async def _read(self, url: str) -> AsyncIterator[Tuple[str, SitemapEntry]]:
+        """Stream the items of one sitemap document."""
+        session = await self._get_session()
+        parser = SitemapParser(self.max_bytes)
+        
+        try:
+            async with session.get(url, timeout=self.pool.request_timeout()) as response:
+                if response.status != 200:
+                    self.logger.info(f"No sitemap at {url}", status=response.status)
+                    return
+                async for chunk in response.content.iter_chunked(self.CHUNK_SIZE):
+                    for item in parser.feed(chunk):
+                        yield item
+            for item in parser.close():
+                yield item
+        except (aiohttp.ClientError, asyncio.TimeoutError, ParseError, ValueError) as e:
+            self.logger.warning(f"Stopped reading sitemap {url}", error=str(e))
+    
+    async def iter_entries(self, sitemap_urls: Iterable[str]) -> AsyncIterator[SitemapEntry]:
+        """Yield every page listed by the sitemaps and their indexes.
+        
+        Args:
+            sitemap_urls: Sitemap or sitemap index URLs to start from
+        
+        Yields:
+            One entry per listed page, in document order
+        """
+        pending = deque(sitemap_urls)
+        visited = set()
+        
+        while pending and len(visited) < self.max_sitemaps:
+            url = pending.popleft()
+            if url in visited:
+                continue
+            visited.add(url)
+            
+            async for kind, entry in self._read(url):
+                if kind == "sitemap":
+                    pending.append(entry.url)
+                else:
+                    yield entry
+        
+        unread = set(pending) - visited
+        if unread:
+            self.logger.warning(f"Sitemap limit reached, {len(unread)} sitemaps not read",
+                              max_sitemaps=self.max_sitemaps)
@@ -0,0 +1,105 @@
+"""Bounded, streaming reads of HTTP response bodies."""
+
+import codecs
+from typing import Optional, Tuple
+
+import aiohttp
+
+from .compression import ContentDecoder
+
+# Media types whose bodies are read and converted; everything else
+# (PDFs, archives, images, ...) is skipped before downloading
+TEXTUAL_CONTENT_TYPES = (
+    "application/xhtml+xml",
+    "application/xml",
+    "application/json",
+    "application/javascript",
+)
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def media_type(content_type: str) -> str:
+    """Return the lower-cased media type without parameters."""
+    return content_type.split(";", 1)[0].strip().lower()
+
+
+def is_textual_content_type(content_type: str) -> bool:
+    """Check whether a Content-Type header denotes text worth reading.
+    
+    A missing Content-Type is treated as text, since many servers omit it
+    for HTML pages.
+    
+    Args:
+        content_type: Content-Type header value
+    
+    Returns:
+        True if the body should be downloaded
+    """
+    mime = media_type(content_type)
+    if not mime or mime.startswith("text/") or mime in TEXTUAL_CONTENT_TYPES:
+        return True
+    return mime.endswith("+xml") or mime.endswith("+json")
+
+
+def declared_length(response: aiohttp.ClientResponse) -> Optional[int]:
+    """Return the Content-Length of a response, if present and valid."""
+    try:
+        return int(response.headers.get("Content-Length", ""))
+    except ValueError:
+        return None
+
+
+async def read_text(
+    response: aiohttp.ClientResponse,
+    max_bytes: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    decoder: Optional[ContentDecoder] = None
+) -> Tuple[str, bool]:
+    """Read and decode a response body, stopping after ``max_bytes``.
+    
+    The body is read in chunks and fed through an incremental decoder, so
+    at most one chunk of undecoded bytes is held at a time and multi-byte
+    characters split across chunks decode correctly. Compressed chunks
+    are inflated only up to the remaining budget. Reading stops as soon
+    as the budget is spent; the rest of the body is never downloaded.
+    
+    Args:
+        response: Response whose body to read
+        max_bytes: Maximum number of (decompressed) body bytes to read
+        chunk_size: Size of each read
+        decoder: Optional decoder for a body read with content codings
+            intact; it also counts the bytes on the wire
+    
+    Returns:
+        Tuple of the decoded text and whether it was truncated
+    
+    Raises:
+        ContentDecodingError: If the decoder finds the body corrupt
+    """
+    encoding = response.charset or "utf-8"
+    try:
+        text_decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    except LookupError:
+        text_decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    
+    parts = []
+    remaining = max_bytes
+    truncated = False
+    async for chunk in response.content.iter_chunked(chunk_size):
+        if decoder is not None:
+            # Inflate no more than one byte past the budget
+            chunk = decoder.decode(chunk, remaining + 1)
+        if len(chunk) > remaining:
+            parts.append(text_decoder.decode(chunk[:remaining]))
+            truncated = True
+            break
+        parts.append(text_decoder.decode(chunk))
+        remaining -= len(chunk)
+    
+    # A cut may land inside a multi-byte character; drop the partial bytes
+    if not truncated:
+        tail = decoder.flush(remaining + 1) if decoder is not None else b""
+        parts.append(text_decoder.decode(tail[:remaining], final=True))
+        truncated = len(tail) > remaining
+    return "".join(parts), truncated
@@ -0,0 +1,127 @@
+"""Single-pass scanner for URLs in Markdown, HTML and plain text."""
+
+import re
+from typing import Dict, Iterator, Optional, Tuple
+from urllib.parse import urljoin
+
+import validators
+
+
+# One alternation covers every URL form, so the text is scanned once and
+# a URL inside a Markdown link or anchor is never matched a second time
+_URL_SCANNER = re.compile(
+    r"""
+    \[[^\]\n]*\]\(\s*(?P<md>[^)\s]+)[^)]*\)                     # [text](target "title")
+    | (?i:<a\b[^>]*?\bhref)\s*=\s*["']?(?P<href>[^"'>\s]+)      # <a href="target">
+    | (?P<url>(?i:https?)://[^\s<>"'{}|\\^`\[\]]+)              # bare URL
+    | (?<![\w@./:-])(?P<domain>                                 # plain domain reference
+        (?:[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?\.)+[A-Za-z]{2,63}
+      )(?P<path>/[^\s<>"'`()\[\]]*)?
+    """,
+    re.VERBOSE
+)
+
+# Dotted tokens that look like domains but are file names in documentation
+FILE_EXTENSIONS = frozenset({
+    "py", "pyc", "md", "rst", "txt", "js", "mjs", "ts", "tsx", "jsx", "json",
+    "yaml", "yml", "toml", "ini", "cfg", "conf", "lock", "log", "csv", "xml",
+    "html", "htm", "css", "scss", "sh", "bash", "ps1", "bat", "rb", "go", "rs",
+    "java", "kt", "swift", "c", "h", "cc", "cpp", "hpp", "cs", "php", "pl",
+    "sql", "png", "jpg", "jpeg", "gif", "svg", "ico", "webp", "pdf", "zip",
+    "gz", "tgz", "tar", "whl", "exe", "dll", "so", "env", "example", "tmp",
+})
+
+_SKIPPED_SCHEMES = ("#", "mailto:", "javascript:", "tel:", "data:")
+_TRAILING_PUNCTUATION = ".,;:!?'\""
+
+
+def _trim_bare_url(url: str) -> str:
+    """Strip sentence punctuation and unbalanced parentheses from a bare URL."""
+    while url:
+        if url[-1] in _TRAILING_PUNCTUATION:
+            url = url[:-1]
+        elif url[-1] == ")" and url.count(")") > url.count("("):
+            url = url[:-1]
+        else:
+            break
+    return url
+
+
+def _looks_like_domain(domain: str) -> bool:
+    """Cheap pre-filter run before the comparatively slow validator."""
+    tld = domain.rsplit(".", 1)[-1].lower()
+    return tld not in FILE_EXTENSIONS
+
+
+def scan_url_spans(text: str, base_url: Optional[str] = None) -> Iterator[Tuple[str, int, int]]:
+    """Find every URL occurrence in Markdown, HTML or plain text in a single pass.
+    
+    Markdown link targets and anchor ``href`` values may be relative and
+    are resolved against ``base_url``. Bare domains such as
+    ``docs.example.com/guide`` become ``https://`` URLs, while dotted
+    tokens ending in a file extension (``setup.py``) or a number
+    (``1.2.3``) are rejected before validation. Each distinct candidate
+    is validated once, however often it occurs.
+    
+    Args:
+        text: Text to scan
+        base_url: URL relative link targets are resolved against
+    
+    Yields:
+        Tuples of absolute URL, start offset and end offset of the URL
+        as written in the text, in document order
+    """
+    checked: Dict[str, bool] = {}
+    
+    for match in _URL_SCANNER.finditer(text):
+        kind = match.lastgroup
+        if kind == "path":
+            kind = "domain"
+        
+        if kind in ("md", "href"):
+            target = match.group(kind)
+            if target.startswith(_SKIPPED_SCHEMES):
+                continue
+            start, end = match.span(kind)
+            if not target.startswith(("http://", "https://")):
+                if base_url is None:
+                    continue
+                target = urljoin(base_url, target)
+            candidate = target
+        elif kind == "url":
+            candidate = _trim_bare_url(match.group("url"))
+            start = match.start("url")
+            end = start + len(candidate)
+        else:
+            domain = match.group("domain")
+            if not _looks_like_domain(domain):
+                continue
+            path = _trim_bare_url(match.group("path") or "")
+            candidate = f"https://{domain}{path}"
+            start = match.start("domain")
+            end = start + len(domain) + len(path)
+        
+        valid = checked.get(candidate)
+        if valid is None:
+            valid = checked[candidate] = bool(validators.url(candidate))
+        if valid:
+            yield candidate, start, end
+
+
+def scan_urls(text: str, base_url: Optional[str] = None) -> Iterator[str]:
+    """Find distinct URLs in Markdown, HTML or plain text in a single pass.
+    
+    See scan_url_spans() for the recognized forms.
+    
+    Args:
+        text: Text to scan
+        base_url: URL relative link targets are resolved against
+    
+    Yields:
+        Absolute, validated URLs in order of first appearance
+    """
+    seen = set()
+    for url, _, _ in scan_url_spans(text, base_url):
+        if url not in seen:
+            seen.add(url)
+            yield url
@@ -0,0 +1,76 @@
+"""URL canonicalization for crawl deduplication."""
+
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+# Query parameters that only track where a visitor came from
+TRACKING_PARAMS = frozenset({
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "mc_cid", "mc_eid",
+    "_ga", "_gl", "igshid", "ref_src",
+})
+TRACKING_PREFIXES = ("utm_",)
+
+# Directory index documents that name the same page as the directory
+INDEX_DOCUMENTS = ("index.html", "index.htm", "index.php")
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def _is_tracking_param(name: str) -> bool:
+    """Check whether a query parameter is a tracking parameter."""
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def canonicalize_url(url: str) -> str:
+    """Reduce a URL to a canonical form for deduplication.
+    
+    The scheme and host are lower-cased and default ports dropped, the
+    fragment is removed, tracking parameters (``utm_*``, ``gclid``, ...)
+    are stripped and the remaining query parameters are sorted. Directory
+    index documents such as ``index.html`` and trailing slashes are
+    removed from the path. The path is otherwise kept as is, since it is
+    case-sensitive on most servers.
+    
+    Args:
+        url: Absolute URL
+    
+    Returns:
+        Canonical URL; non-HTTP URLs are returned unchanged
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS:
+        return url
+    
+    host = (parts.hostname or "").rstrip(".")
+    if ":" in host:
+        host = f"[{host}]"  # IPv6 literal
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host if port in (None, DEFAULT_PORTS[scheme]) else f"{host}:{port}"
+    if parts.username or parts.password:
+        userinfo = parts.username or ""
+        if parts.password:
+            userinfo += f":{parts.password}"
+        netloc = f"{userinfo}@{netloc}"
+    
+    path = parts.path or "/"
+    last_segment = path.rsplit("/", 1)[-1]
+    if last_segment.lower() in INDEX_DOCUMENTS:
+        path = path[:-len(last_segment)]
+    if len(path) > 1:
+        path = path.rstrip("/") or "/"
+    
+    query = ""
+    if parts.query:
+        params = [
+            (name, value)
+            for name, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not _is_tracking_param(name)
+        ]
+        query = urlencode(sorted(params))
+    
+    return urlunsplit((scheme, netloc, path, query, ""))
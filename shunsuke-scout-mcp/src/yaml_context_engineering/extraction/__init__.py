@@ -0,0 +1,38 @@
+"""Structure extraction for YAML Context Engineering.
+
+This module provides the building blocks used by the structure
+extractor: single-pass scanning of Markdown headings and fenced code
+blocks with their line numbers and offsets, heading extractors for HTML,
+reStructuredText and AsciiDoc behind a format registry, bounded
+detection of the markup format of a document, and section hashing and
+stored state for incremental re-extraction.
+"""
+
+from .asciidoc import extract_asciidoc_headings
+from .html import extract_html_headings
+from .incremental import Section, StructureStateStore, diff_sections, split_sections
+from .markdown import Fence, Heading, MarkdownScan, scan_markdown
+from .registry import ExtractorRegistry, HeadingExtractor, default_registry, extract_markdown_headings
+from .rst import extract_rst_headings
+from .sniffing import FORMATS, FormatSniff, sniff_format
+
+__all__ = [
+    'FORMATS',
+    'ExtractorRegistry',
+    'Fence',
+    'FormatSniff',
+    'Heading',
+    'HeadingExtractor',
+    'MarkdownScan',
+    'Section',
+    'StructureStateStore',
+    'default_registry',
+    'diff_sections',
+    'extract_asciidoc_headings',
+    'extract_html_headings',
+    'extract_markdown_headings',
+    'extract_rst_headings',
+    'scan_markdown',
+    'sniff_format',
+    'split_sections'
+]
@@ -0,0 +1,63 @@
+"""Heading extraction for AsciiDoc documents."""
+
+import re
+from typing import List
+
+from .markdown import Heading
+
+
+# A section title ("== Title", or Markdown-style "## Title") or the
+# delimiter line of a block whose contents cannot hold titles
+_BLOCK_LINE = re.compile(
+    r"^(?:"
+    r"(?P<marker>={1,6}|#{1,6})[ \t]+(?P<text>\S[^\n]*?)(?:[ \t]+(?P=marker))?"
+    r"|(?P<delimiter>-{4,}|\.{4,}|={4,}|\*{4,}|\+{4,}|/{4,}|_{4,}|--)"
+    r")[ \t]*$",
+    re.MULTILINE
+)
+
+
+def extract_asciidoc_headings(content: str) -> List[Heading]:
+    """Extract section titles from AsciiDoc.
+    
+    The document title (``= Title``) is level 1 and each further ``=``
+    adds a level, matching the Markdown levels of the same marker count.
+    Lines inside delimited blocks (listing ``----``, literal ``....``,
+    example ``====``, comment ``////`` and the like) are skipped by
+    searching for the closing delimiter; an unclosed block runs to the end
+    of the document.
+    
+    Args:
+        content: AsciiDoc text
+    
+    Returns:
+        Headings in document order; offsets span the title line
+    """
+    headings = []
+    line_number = 1
+    position = 0
+    pos = 0
+    length = len(content)
+    
+    while True:
+        match = _BLOCK_LINE.search(content, pos)
+        if match is None:
+            break
+        
+        start, end = match.span()
+        pos = end + 1
+        delimiter = match.group("delimiter")
+        if delimiter:
+            closing = re.compile(rf"^{re.escape(delimiter)}[ \t]*$", re.MULTILINE).search(content, pos)
+            if closing is None:
+                break
+            pos = closing.end() + 1
+            continue
+        
+        line_number += content.count("\n", position, start)
+        position = start
+        headings.append(Heading(
+            len(match.group("marker")), match.group("text"), line_number, start, min(pos, length)
+        ))
+    
+    return headings
@@ -0,0 +1,38 @@
+"""Heading extraction for HTML documents."""
+
+import re
+from typing import List
+
+from .markdown import Heading
+
+
+_HTML_HEADING = re.compile(r"<h([1-6]).*?>(.*?)</h[1-6]>", re.IGNORECASE | re.DOTALL)
+_TAG = re.compile(r"<.*?>")
+
+
+def extract_html_headings(content: str) -> List[Heading]:
+    """Extract ``<h1>`` to ``<h6>`` headings from HTML.
+    
+    Args:
+        content: HTML text
+    
+    Returns:
+        Headings in document order; offsets span the line each heading
+        starts on
+    """
+    headings = []
+    line_number = 1
+    position = 0
+    
+    for match in _HTML_HEADING.finditer(content):
+        level = int(match.group(1))
+        text = _TAG.sub("", match.group(2)).strip()
+        # Count lines incrementally rather than from the start each time
+        line_number += content.count("\n", position, match.start())
+        position = match.start()
+        line_start = content.rfind("\n", 0, position) + 1
+        line_end = content.find("\n", position)
+        end = len(content) if line_end < 0 else line_end + 1
+        headings.append(Heading(level, text, line_number, line_start, end))
+    
+    return headings
@@ -0,0 +1,220 @@
+"""Section hashing, structure diffs and stored state for incremental extraction."""
+
+import hashlib
+import json
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import aiofiles
+
+from ..utils.logging import get_logger
+from .markdown import Heading
+
+
+STATE_VERSION = 1
+
+# (level, text, occurrence) identifies a heading across versions of a
+# document; the occurrence tells apart repeated headings such as "Example"
+SectionKey = Tuple[int, str, int]
+
+
+class Section(NamedTuple):
+    """A heading with its section text, or the text before the first heading."""
+    
+    key: Optional[SectionKey]  # None for the text before the first heading
+    parent: Optional[SectionKey]  # Key of the enclosing heading
+    line_number: int
+    start: int  # Offset of the heading line
+    end: int  # Offset of the next heading, or the end of the document
+    digest: str  # Hash of the heading line and section text
+
+
+def split_sections(content: str, headings: Sequence[Heading]) -> List[Section]:
+    """Split a document into hashed sections at its headings.
+    
+    Each section runs from its heading line to the next heading, so an
+    edit anywhere in the document changes the hash of exactly the section
+    it falls in.
+    
+    Args:
+        content: Document text
+        headings: Headings of the document in order
+    
+    Returns:
+        Sections in document order, starting with the text before the
+        first heading if there is any
+    """
+    sections = []
+    first = headings[0].start if headings else len(content)
+    if first:
+        sections.append(Section(None, None, 1, 0, first, _digest(content, 0, first)))
+    
+    occurrences: Dict[Tuple[int, str], int] = {}
+    stack: List[SectionKey] = []
+    for i, heading in enumerate(headings):
+        occurrence = occurrences.get((heading.level, heading.text), 0)
+        occurrences[(heading.level, heading.text)] = occurrence + 1
+        key = (heading.level, heading.text, occurrence)
+        
+        while stack and stack[-1][0] >= heading.level:
+            stack.pop()
+        end = headings[i + 1].start if i + 1 < len(headings) else len(content)
+        sections.append(Section(
+            key, stack[-1] if stack else None, heading.line_number, heading.start, end,
+            _digest(content, heading.start, end)
+        ))
+        stack.append(key)
+    
+    return sections
+
+
+def _digest(content: str, start: int, end: int) -> str:
+    """Hash a span of the document."""
+    return hashlib.blake2b(content[start:end].encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _in_order(positions: List[int]) -> set:
+    """Return the indexes of a longest increasing subsequence of positions."""
+    tails: List[int] = []  # Last position of the best run of each length
+    tail_indexes: List[int] = []
+    previous = [-1] * len(positions)
+    for i, position in enumerate(positions):
+        length = bisect_left(tails, position)
+        if length == len(tails):
+            tails.append(position)
+            tail_indexes.append(i)
+        else:
+            tails[length] = position
+            tail_indexes[length] = i
+        previous[i] = tail_indexes[length - 1] if length else -1
+    
+    kept = set()
+    i = tail_indexes[-1] if tail_indexes else -1
+    while i >= 0:
+        kept.add(i)
+        i = previous[i]
+    return kept
+
+
+def diff_sections(previous: List[Dict[str, Any]], current: List[Section]) -> Dict[str, Any]:
+    """Compare the sections of two versions of a document.
+    
+    Sections are matched by key. A matched section is modified when its
+    hash changed, and moved when it has a new parent or falls out of the
+    longest run of sections that kept their relative order; a single
+    insertion therefore does not mark every later section as moved. Text
+    before the first heading is not reported.
+    
+    Args:
+        previous: Section records of the stored state
+        current: Sections of the new version
+    
+    Returns:
+        Lists of ``added``, ``removed``, ``modified`` and ``moved``
+        headings, and the number of ``unchanged`` ones
+    """
+    old = {tuple(record["key"]): (i, record) for i, record in enumerate(previous) if record["key"] is not None}
+    matched = [section for section in current if section.key in old]
+    in_order = _in_order([old[section.key][0] for section in matched])
+    
+    diff: Dict[str, Any] = {"added": [], "removed": [], "modified": [], "moved": [], "unchanged": 0}
+    for section in current:
+        if section.key is not None and section.key not in old:
+            diff["added"].append(_describe(section.key, section.line_number))
+    
+    for i, section in enumerate(matched):
+        record = old[section.key][1]
+        parent = tuple(record["parent"]) if record["parent"] is not None else None
+        is_modified = record["hash"] != section.digest
+        is_moved = i not in in_order or parent != section.parent
+        if is_modified:
+            diff["modified"].append(_describe(section.key, section.line_number))
+        if is_moved:
+            diff["moved"].append(_describe(section.key, section.line_number))
+        if not is_modified and not is_moved:
+            diff["unchanged"] += 1
+    
+    current_keys = {section.key for section in current}
+    for key, (_, record) in old.items():
+        if key not in current_keys:
+            diff["removed"].append(_describe(key, record["line_number"]))
+    
+    return diff
+
+
+def _describe(key: SectionKey, line_number: int) -> Dict[str, Any]:
+    """Describe a heading in a structure diff."""
+    return {"level": key[0], "text": key[1], "line_number": line_number}
+
+
+class StructureStateStore:
+    """Stores the section state of extracted documents between runs.
+    
+    The state of a document lists its sections with their keys, hashes and
+    extracted entities, so that the next extraction of the document only
+    recomputes sections whose hash is new. Entries are JSON files sharded
+    by the first two hex digits of the SHA-256 of the document ID.
+    """
+    
+    def __init__(self, directory: Path):
+        """Initialize the store.
+        
+        Args:
+            directory: Directory holding state files
+        """
+        self.directory = directory
+        self.logger = get_logger(__name__)
+    
+    def _entry_path(self, document_id: str) -> Path:
+        """Return the file holding the state of a document."""
+        digest = hashlib.sha256(document_id.encode("utf-8")).hexdigest()
+        return self.directory / digest[:2] / f"{digest}.json"
+    
+    async def get(self, document_id: str) -> Optional[Dict[str, Any]]:
+        """Load the stored state of a document.
+        
+        Args:
+            document_id: Caller-chosen identifier of the document
+        
+        Returns:
+            State with ``sections`` records, or None
+        """
+        entry_path = self._entry_path(document_id)
+        if not entry_path.exists():
+            return None
+        
+        try:
+            async with aiofiles.open(entry_path, 'r', encoding='utf-8') as f:
+                state = json.loads(await f.read())
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable structure state for {document_id}", error=str(e))
+            return None
+        
+        if state.get("version") != STATE_VERSION or state.get("document_id") != document_id:
+            return None
+        return state
+    
+    async def put(self, document_id: str, sections: List[Dict[str, Any]]) -> None:
+        """Store the section state of a document.
+        
+        Args:
+            document_id: Caller-chosen identifier of the document
+            sections: Section records with key, parent, hash, line number
+                and entities
+        """
+        entry_path = self._entry_path(document_id)
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+        state = {
+            "version": STATE_VERSION,
+            "document_id": document_id,
+            "stored_at": time.time(),
+            "sections": sections
+        }
+        
+        # Write to a temporary file first so readers never see partial JSON
+        tmp_path = entry_path.with_suffix(".tmp")
+        async with aiofiles.open(tmp_path, 'w', encoding='utf-8') as f:
+            await f.write(json.dumps(state, ensure_ascii=False))
+        tmp_path.replace(entry_path)
@@ -0,0 +1,130 @@
+"""Single-pass scanning of Markdown block structure."""
+
+import re
+from itertools import chain
+from dataclasses import dataclass, field
+from typing import List, NamedTuple
+
+
+# A line that opens a block we care about: an ATX heading or a code fence,
+# indented by at most three spaces. Matched at line starts only.
+_BLOCK_LINE = re.compile(
+    r" {0,3}(?:"
+    r"(?P<hashes>#{1,6})(?=[ \t\r\n]|$)(?P<text>[^\n]*)"
+    r"|(?P<fence>`{3,}|~{3,})(?P<info>[^\n]*)"
+    r")$",
+    re.MULTILINE
+)
+
+# Newlines followed by a line that may open a block. Starting the pattern
+# with a literal lets the regex engine skip through ordinary text quickly.
+_CANDIDATE = re.compile(r"\n(?= {0,3}[#`~])")
+
+# Optional closing sequence of a heading: "## Title ##"
+_CLOSING_HASHES = re.compile(r"(?:^|[ \t])#+$")
+
+# Newline and the line after it that can close a fence of each character
+_CLOSING_FENCE = {
+    char: re.compile(rf"\n {{0,3}}({re.escape(char)}{{3,}})[ \t\r]*$", re.MULTILINE)
+    for char in "`~"
+}
+
+
+class Heading(NamedTuple):
+    """An ATX heading and where its line sits in the content."""
+    
+    level: int
+    text: str
+    line_number: int  # 1-based
+    start: int  # Offset of the start of the heading line
+    end: int  # Offset just past the heading line, including its newline
+
+
+class Fence(NamedTuple):
+    """A fenced code block, from its opening to its closing fence line."""
+    
+    info: str  # Info string after the opening fence (usually a language)
+    line_number: int  # 1-based line of the opening fence
+    end_line: int  # 1-based line of the closing fence, or the last line
+    start: int  # Offset of the start of the opening fence line
+    end: int  # Offset just past the closing fence line
+
+
+@dataclass
+class MarkdownScan:
+    """Block structure of a Markdown document."""
+    
+    headings: List[Heading] = field(default_factory=list)
+    fences: List[Fence] = field(default_factory=list)
+    line_count: int = 0
+
+
+def scan_markdown(content: str) -> MarkdownScan:
+    """Find the headings and fenced code blocks of a Markdown document.
+    
+    Only lines that can start a heading or a fence are visited, in a
+    single regex pass over the content, and the body of a fence is skipped
+    by searching for its closing line; line numbers are counted
+    incrementally between them, so the cost is linear in the size of the
+    document and no list of lines is built. Heading-like lines inside
+    fenced code blocks (``# comment`` in a shell snippet) are not
+    headings. A fence is closed by a fence of the same character that is
+    at least as long and has no info string; an unclosed fence runs to
+    the end of the document.
+    
+    Args:
+        content: Markdown text
+    
+    Returns:
+        Headings and fences with their line numbers and offsets
+    """
+    length = len(content)
+    count = content.count
+    scan = MarkdownScan(line_count=count("\n") + 1)
+    headings = scan.headings
+    line_number = 1
+    position = 0  # Offset line_number was counted up to
+    resume = 0  # Offset before which candidates are inside a fence
+    
+    line_starts = chain((0,), (candidate.end() for candidate in _CANDIDATE.finditer(content)))
+    for start in line_starts:
+        if start < resume:
+            continue
+        match = _BLOCK_LINE.match(content, start)
+        if match is None:
+            continue
+        
+        end = match.end()
+        line_number += count("\n", position, start)
+        position = start
+        hashes, text, fence, info = match.groups()
+        
+        if fence:
+            info = info.strip()
+            # Backtick fences cannot have backticks in their info string
+            if fence[0] == "`" and "`" in info:
+                continue
+            
+            # Only a bare fence of the same kind, at least as long, closes
+            closing = _CLOSING_FENCE[fence[0]].search(content, end)
+            while closing is not None and len(closing.group(1)) < len(fence):
+                closing = _CLOSING_FENCE[fence[0]].search(content, closing.end())
+            
+            if closing is None:
+                scan.fences.append(Fence(info, line_number, scan.line_count, start, length))
+                break
+            
+            opened_line = line_number
+            line_number += count("\n", position, closing.end())
+            position = closing.end()
+            resume = min(closing.end() + 1, length)
+            scan.fences.append(Fence(info, opened_line, line_number, start, resume))
+            continue
+        
+        text = text.strip()
+        if text.endswith("#"):
+            text = _CLOSING_HASHES.sub("", text).rstrip()
+        if text:
+            headings.append(Heading(len(hashes), text, line_number, start, min(end + 1, length)))
+    
+    return scan
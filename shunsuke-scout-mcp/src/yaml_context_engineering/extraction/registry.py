@@ -0,0 +1,108 @@
+"""Registry mapping document formats to heading extractors."""
+
+from typing import Any, Callable, Dict, List, Optional
+
+from .asciidoc import extract_asciidoc_headings
+from .html import extract_html_headings
+from .markdown import Heading, MarkdownScan, scan_markdown
+from .rst import extract_rst_headings
+
+
+HeadingExtractor = Callable[[str], List[Heading]]
+
+
+def extract_markdown_headings(content: str) -> List[Heading]:
+    """Extract ATX headings from Markdown, skipping fenced code blocks."""
+    return scan_markdown(content).headings
+
+
+class ExtractorRegistry:
+    """Heading extractors by format name.
+    
+    An extractor takes the document text and returns its headings in
+    document order, with offsets, as ``Heading`` tuples. Formats without an
+    extractor fall back to the ``fallback`` format.
+    """
+    
+    def __init__(self, fallback: str = "markdown"):
+        """Initialize an empty registry.
+        
+        Args:
+            fallback: Format used for formats without an extractor
+        """
+        self.fallback = fallback
+        self._extractors: Dict[str, HeadingExtractor] = {}
+    
+    def register(self, format_type: str, extractor: HeadingExtractor, replace: bool = False) -> None:
+        """Register the extractor of a format.
+        
+        Args:
+            format_type: Format name, such as ``"rst"``
+            extractor: Function returning the headings of a document
+            replace: Whether to replace an extractor already registered
+        
+        Raises:
+            ValueError: If the format already has an extractor and
+                ``replace`` is false
+        """
+        if format_type in self._extractors and not replace:
+            raise ValueError(f"Extractor already registered for format: {format_type}")
+        self._extractors[format_type] = extractor
+    
+    def unregister(self, format_type: str) -> None:
+        """Remove the extractor of a format, if any."""
+        self._extractors.pop(format_type, None)
+    
+    def register_plugin(self, plugin: Any, replace: bool = False) -> List[str]:
+        """Register the heading extractors an ``ExtractorPlugin`` provides.
+        
+        Args:
+            plugin: Plugin with a ``heading_extractors()`` method
+            replace: Whether its extractors replace registered ones
+        
+        Returns:
+            Formats registered for the plugin; none if it is disabled
+        """
+        if not plugin.metadata.enabled:
+            return []
+        
+        extractors = plugin.heading_extractors()
+        for format_type, extractor in extractors.items():
+            self.register(format_type, extractor, replace=replace)
+        return list(extractors)
+    
+    def get(self, format_type: str) -> Optional[HeadingExtractor]:
+        """Return the extractor of a format, or None."""
+        return self._extractors.get(format_type)
+    
+    def formats(self) -> List[str]:
+        """Return the formats with an extractor."""
+        return list(self._extractors)
+    
+    def extract(self, content: str, format_type: str, scan: Optional[MarkdownScan] = None) -> List[Heading]:
+        """Extract headings with the extractor of a format.
+        
+        Args:
+            content: Document text
+            format_type: Format of the document
+            scan: ``scan_markdown`` result for the document, if the caller
+                already has one; the built-in Markdown extractor returns
+                its headings instead of scanning again
+        
+        Returns:
+            Headings in document order
+        """
+        extractor = self._extractors.get(format_type) or self._extractors[self.fallback]
+        if scan is not None and extractor is extract_markdown_headings:
+            return scan.headings
+        return extractor(content)
+
+
+def default_registry() -> ExtractorRegistry:
+    """Create a registry with the built-in Markdown, HTML, RST and AsciiDoc extractors."""
+    registry = ExtractorRegistry()
+    registry.register("markdown", extract_markdown_headings)
+    registry.register("html", extract_html_headings)
+    registry.register("rst", extract_rst_headings)
+    registry.register("asciidoc", extract_asciidoc_headings)
+    return registry
@@ -0,0 +1,71 @@
+"""Heading extraction for reStructuredText documents."""
+
+import re
+from typing import Dict, List, Tuple
+
+from .markdown import Heading
+
+
+# Characters reStructuredText accepts as section adornment
+_ADORNMENT = r"[!-/:-@\[-`{-~]"
+
+# A section title: text with an overline and an identical underline, or
+# text with an underline only. Titles start in the first column, so
+# indented literal blocks and quotes never match.
+_TITLE = re.compile(
+    rf"^(?:(?P<over>(?P<over_char>{_ADORNMENT})(?P=over_char){{2,}})[ \t]*\n"
+    rf"[ \t]*(?P<over_text>\S[^\n]*?)[ \t]*\n(?P=over)"
+    rf"|(?P<text>\S[^\n]*?)[ \t]*\n(?P<under>(?P<under_char>{_ADORNMENT})(?P=under_char){{2,}})"
+    rf")[ \t]*$",
+    re.MULTILINE
+)
+
+_ADORNMENT_ONLY = re.compile(rf"({_ADORNMENT})\1*")
+
+
+def extract_rst_headings(content: str) -> List[Heading]:
+    """Extract section titles from reStructuredText.
+    
+    reStructuredText has no fixed heading levels: each adornment style (the
+    character, and whether it has an overline) gets the next level the
+    first time it is seen, so ``=`` with an overline and ``=`` without one
+    are different levels. Levels deeper than six are reported as six.
+    Adornment shorter than the title text is not a title, and neither is
+    text that is itself adornment.
+    
+    Args:
+        content: reStructuredText
+    
+    Returns:
+        Headings in document order; offsets span the title and its
+        adornment lines
+    """
+    headings = []
+    styles: Dict[Tuple[str, bool], int] = {}
+    line_number = 1
+    position = 0
+    length = len(content)
+    
+    for match in _TITLE.finditer(content):
+        overlined = match.group("over") is not None
+        if overlined:
+            text, adornment = match.group("over_text"), match.group("over")
+        else:
+            text, adornment = match.group("text"), match.group("under")
+        if len(adornment) < len(text) or _ADORNMENT_ONLY.fullmatch(text):
+            continue
+        
+        start = match.start()
+        line_number += content.count("\n", position, start)
+        position = start
+        
+        style = (adornment[0], overlined)
+        if style not in styles:
+            styles[style] = min(len(styles) + 1, 6)
+        
+        end = match.end()
+        headings.append(Heading(
+            styles[style], text, line_number + overlined, start, end + 1 if end < length else end
+        ))
+    
+    return headings
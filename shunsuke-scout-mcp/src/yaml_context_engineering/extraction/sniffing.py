@@ -0,0 +1,147 @@
+"""Bounded detection of the markup format of a document."""
+
+import re
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple
+
+from .markdown import Fence, scan_markdown
+
+
+FORMATS = ("markdown", "html", "rst", "asciidoc")
+
+# Characters read from the start of the document
+PREFIX_SIZE = 16384
+
+# Windows sampled from the rest of the document, and their size
+SAMPLE_WINDOWS = 4
+WINDOW_SIZE = 4096
+
+# Share of the evidence a secondary format needs for a document to be mixed
+MIXED_THRESHOLD = 0.2
+
+# Every signal in one alternation, so a window is read by a single regex
+# pass; each named group is a signal and maps to (format, weight) below
+_SIGNALS = re.compile(
+    r"(?P<html_heading><h[1-6][\s>])"
+    r"|(?P<html_block></?(?:html|body|div|p|ul|ol|li|table|section|article)[\s>])"
+    r"|^(?P<rst_title>(?P<rst_text>[^\s][^\n]*)\n(?P<rst_line>(?P<rst_char>[=\-~#\"^+*])(?P=rst_char){2,})[ \t]*)$"
+    r"|^(?P<rst_directive>\.\. [\w-]+::)"
+    r"|^(?P<md_heading> {0,3}#{1,6}[ \t]+\S)"
+    r"|^(?P<md_fence> {0,3}(?:`{3,}|~{3,}))"
+    r"|(?P<md_link>\]\([^)\s]+\))"
+    r"|^(?P<adoc_heading>={1,6}[ \t]+(?![= \t]*$)\S)"
+    r"|^(?P<adoc_block>\[(?:source|NOTE|TIP|WARNING|IMPORTANT|CAUTION)[\],])",
+    re.IGNORECASE | re.MULTILINE
+)
+
+_WEIGHTS: Dict[str, Tuple[str, float]] = {
+    "html_heading": ("html", 3.0),
+    "html_block": ("html", 1.0),
+    "rst_title": ("rst", 2.0),
+    "rst_directive": ("rst", 3.0),
+    "md_heading": ("markdown", 3.0),
+    "md_fence": ("markdown", 1.0),
+    "md_link": ("markdown", 1.0),
+    "adoc_heading": ("asciidoc", 3.0),
+    "adoc_block": ("asciidoc", 2.0),
+}
+
+
+@dataclass
+class FormatSniff:
+    """Detected format of a document and the evidence for each format."""
+    
+    format: str = "markdown"
+    confidence: Dict[str, float] = field(default_factory=lambda: dict.fromkeys(FORMATS, 0.0))
+    formats: List[str] = field(default_factory=list)  # Formats with notable evidence, best first
+    
+    @property
+    def mixed(self) -> bool:
+        """Whether the document combines several markup formats."""
+        return len(self.formats) > 1
+
+
+def _windows(content: str) -> List[Tuple[int, int]]:
+    """Return the (start, end) spans to sample, aligned to line starts."""
+    length = len(content)
+    if length <= PREFIX_SIZE + SAMPLE_WINDOWS * WINDOW_SIZE:
+        return [(0, length)]
+    
+    spans = [(0, PREFIX_SIZE)]
+    stride = (length - PREFIX_SIZE) // SAMPLE_WINDOWS
+    for i in range(SAMPLE_WINDOWS):
+        start = PREFIX_SIZE + i * stride + stride // 2
+        # Start at the next line so anchored signals line up, without
+        # searching further than one window for it
+        newline = content.find("\n", start, start + WINDOW_SIZE)
+        if newline < 0:
+            continue
+        spans.append((newline + 1, min(newline + 1 + WINDOW_SIZE, length)))
+    return spans
+
+
+def in_fence(fences: Sequence[Fence], starts: Sequence[int], offset: int) -> bool:
+    """Return whether an offset falls inside one of the fenced code blocks.
+    
+    Args:
+        fences: Fenced code blocks in document order
+        starts: Start offsets of the fences
+        offset: Offset to look up
+    """
+    i = bisect_right(starts, offset) - 1
+    return i >= 0 and offset < fences[i].end
+
+
+def sniff_format(content: str) -> FormatSniff:
+    """Detect the markup format of a document from a bounded sample.
+    
+    The first ``PREFIX_SIZE`` characters and ``SAMPLE_WINDOWS`` windows
+    spread over the rest of the document are read once with a combined
+    pattern, so the cost does not depend on the size of the document.
+    Each signal (an HTML heading tag, a Markdown ATX heading, an RST
+    underline, ...) adds its weight to a format; confidence is the share
+    of the total weight. Ties go to the earlier format in ``FORMATS``, and
+    documents without any signal are treated as Markdown.
+    
+    Signals inside Markdown fenced code blocks are ignored, apart from the
+    fence lines themselves, so an ```` ```html ```` snippet does not make
+    a Markdown document look like HTML. Fences are looked for from
+    ``WINDOW_SIZE`` characters before each window, so a window starting
+    inside a short code block still sees where it opened, and the cost
+    stays bounded.
+    
+    Args:
+        content: Document text
+    
+    Returns:
+        Primary format, per-format confidence and the formats present
+    """
+    scores = dict.fromkeys(FORMATS, 0.0)
+    for start, end in _windows(content):
+        scan_start = start
+        if start:
+            newline = content.find("\n", max(0, start - WINDOW_SIZE), start)
+            if newline >= 0:
+                scan_start = newline + 1
+        window = content[scan_start:end]
+        fences = scan_markdown(window).fences
+        starts = [fence.start for fence in fences]
+        for match in _SIGNALS.finditer(window, start - scan_start):
+            signal = match.lastgroup
+            if signal != "md_fence" and fences and in_fence(fences, starts, match.start()):
+                continue
+            # An RST underline is at least as long as its title
+            if signal == "rst_title" and len(match.group("rst_line")) < len(match.group("rst_text").rstrip()):
+                continue
+            fmt, weight = _WEIGHTS[signal]
+            scores[fmt] += weight
+    
+    total = sum(scores.values())
+    if not total:
+        return FormatSniff()
+    
+    confidence = {fmt: round(score / total, 3) for fmt, score in scores.items()}
+    ranked = sorted(FORMATS, key=lambda fmt: -scores[fmt])
+    formats = [fmt for fmt in ranked if scores[fmt] / total >= MIXED_THRESHOLD]
+    return FormatSniff(format=ranked[0], confidence=confidence, formats=formats)
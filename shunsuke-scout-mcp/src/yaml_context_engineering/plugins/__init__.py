@@ -1,13 +1,11 @@
 """Plugin system for YAML Context Engineering."""
 
-from .base import Plugin, PluginMetadata, PluginType
-from .manager import PluginManager
-from .registry import PluginRegistry
+from .base import ExtractorPlugin, Hooks, Plugin, PluginMetadata, PluginType
 
 __all__ = [
+    "ExtractorPlugin",
+    "Hooks",
     "Plugin",
     "PluginMetadata", 
-    "PluginType",
-    "PluginManager",
-    "PluginRegistry"
+    "PluginType"
 ]
\ No newline at end of file
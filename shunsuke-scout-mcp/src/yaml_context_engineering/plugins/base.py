@@ -162,6 +162,19 @@ class ExtractorPlugin(Plugin):
             Extracted content and metadata
         """
         pass
+    
+    def heading_extractors(self) -> Dict[str, Callable[[str], List[Any]]]:
+        """Return heading extractors for additional document formats.
+        
+        Registered with ``ExtractorRegistry.register_plugin``, these let the
+        structure extractor handle formats it has no built-in support for.
+        Each extractor takes the document text and returns its headings in
+        document order as ``extraction.Heading`` tuples.
+        
+        Returns:
+            Extractors by format name; none by default
+        """
+        return {}
 
 
 class FormatterPlugin(Plugin):
@@ -10,9 +10,11 @@ from mcp.server.stdio import stdio_server
 from mcp.types import Tool
 
 from .config import Config
+from .crawling import ConnectionPool, DuplicateDetector, SeenURLStore
 from .utils.logging import get_logger, console
 from .tools import (
     WebContentFetcher,
+    WebCrawler,
     LLMStructureExtractor,
     URLDiscoveryEngine,
     FileSystemManager
@@ -35,11 +37,32 @@ class YamlContextServer:
         self.logger = get_logger(__name__)
         self.server = Server("shunsuke-scout-mcp")
         
+        # HTTP connections are pooled for the lifetime of the server
+        self.connection_pool = ConnectionPool(config.crawling)
+        
+        # URLs fetched by earlier crawls, shared by crawling and discovery
+        self.seen_urls = SeenURLStore(
+            config.get_cache_directory() / "seen_urls.sqlite3" if config.crawling.persist_seen_urls else None,
+            ttl_seconds=config.crawling.seen_urls_ttl_seconds
+        )
+        
+        # Content fingerprints, shared so each page is processed once
+        self.duplicates = None
+        if config.extraction.deduplicate_content:
+            self.duplicates = DuplicateDetector(config.extraction.near_duplicate_threshold)
+        
         # Initialize tools
-        self.web_fetcher = WebContentFetcher(config)
+        self.web_fetcher = WebContentFetcher(config, pool=self.connection_pool)
         self.structure_extractor = LLMStructureExtractor(config)
-        self.url_discovery = URLDiscoveryEngine(config)
-        self.file_manager = FileSystemManager(config)
+        self.url_discovery = URLDiscoveryEngine(config, seen_store=self.seen_urls, pool=self.connection_pool)
+        self.file_manager = FileSystemManager(config, duplicates=self.duplicates)
+        self.crawler = WebCrawler(
+            config,
+            self.web_fetcher,
+            self.url_discovery,
+            seen_store=self.seen_urls,
+            duplicates=self.duplicates
+        )
         
         # Initialize LDD system
         ldd_config = LDDConfig(
@@ -85,6 +108,51 @@ class YamlContextServer:
                         "required": ["urls"]
                     }
                 ),
+                Tool(
+                    name="web_crawler",
+                    description="開始URLから再帰的にクロールし、深さとドメインごとのページ上限を守ってコンテンツを取得",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "start_urls": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "description": "クロールを開始するURLのリスト"
+                            },
+                            "max_depth": {
+                                "type": "integer",
+                                "description": "最大クロール深度（開始URLは深度1）"
+                            },
+                            "max_pages_per_domain": {
+                                "type": "integer",
+                                "description": "ドメインごとの最大ページ数"
+                            },
+                            "max_pages": {
+                                "type": "integer",
+                                "description": "クロール全体の最大ページ数"
+                            },
+                            "same_domain": {
+                                "type": "boolean",
+                                "default": True,
+                                "description": "開始URLと同じドメインのリンクのみを辿る"
+                            },
+                            "url_filters": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "description": "辿るURLが一致すべき正規表現パターン"
+                            },
+                            "use_sitemaps": {
+                                "type": "boolean",
+                                "description": "開始URLのサイトのsitemap.xmlに載っているページもクロールする（lastmod以降に取得済みのページは除外）"
+                            },
+                            "job_id": {
+                                "type": "string",
+                                "description": "中断したクロールのジョブID。指定するとチェックポイントから再開する（再開時はstart_urlsを省略可）"
+                            }
+                        },
+                        "required": []
+                    }
+                ),
                 Tool(
                     name="llm_structure_extractor",
                     description="テキストコンテンツから階層的な見出し構造を抽出",
@@ -125,6 +193,11 @@ class YamlContextServer:
                                 "type": "array",
                                 "items": {"type": "string"},
                                 "description": "URLフィルターパターン"
+                            },
+                            "include_sitemap": {
+                                "type": "boolean",
+                                "default": False,
+                                "description": "基準ドメインのsitemap.xmlに載っているURLも含める"
                             }
                         },
                         "required": ["content", "base_domain"]
@@ -204,7 +277,18 @@ class YamlContextServer:
                 if name == "web_content_fetcher":
                     result = await self.web_fetcher.fetch(
                         urls=arguments["urls"],
-                        timeout=arguments.get("timeout", 30)
+                        timeout=arguments.get("timeout")
+                    )
+                elif name == "web_crawler":
+                    result = await self.crawler.crawl(
+                        start_urls=arguments.get("start_urls"),
+                        max_depth=arguments.get("max_depth"),
+                        max_pages_per_domain=arguments.get("max_pages_per_domain"),
+                        max_pages=arguments.get("max_pages"),
+                        same_domain=arguments.get("same_domain", True),
+                        url_filters=arguments.get("url_filters"),
+                        use_sitemaps=arguments.get("use_sitemaps"),
+                        job_id=arguments.get("job_id")
                     )
                 elif name == "llm_structure_extractor":
                     result = await self.structure_extractor.extract(
@@ -216,7 +300,8 @@ class YamlContextServer:
                     result = await self.url_discovery.discover(
                         content=arguments["content"],
                         base_domain=arguments["base_domain"],
-                        filters=arguments.get("filters", [])
+                        filters=arguments.get("filters", []),
+                        include_sitemap=arguments.get("include_sitemap", False)
                     )
                 elif name == "file_system_manager":
                     result = await self.file_manager.execute(
@@ -273,4 +358,13 @@ class YamlContextServer:
             console.warning("Server stopped by user")
         except Exception as e:
             console.error(f"Server error: {e}")
-            raise
\ No newline at end of file
+            raise
+        finally:
+            await self.close()
+    
+    async def close(self) -> None:
+        """Release the server's network connections and worker processes."""
+        await self.web_fetcher.close()
+        await self.url_discovery.close()
+        await self.connection_pool.close()
+        self.seen_urls.close()
\ No newline at end of file
@@ -1,6 +1,7 @@
 """Tools for YAML Context Engineering MCP Server."""
 
 from .web_content_fetcher import WebContentFetcher
+from .web_crawler import WebCrawler
 from .llm_structure_extractor import LLMStructureExtractor
 from .url_discovery_engine import URLDiscoveryEngine
 from .file_system_manager import FileSystemManager
@@ -8,6 +9,7 @@ from .quality_analyzer_tool import QualityAnalyzerTool
 
 __all__ = [
     "WebContentFetcher",
+    "WebCrawler",
     "LLMStructureExtractor", 
     "URLDiscoveryEngine",
     "FileSystemManager",
@@ -12,19 +12,23 @@ import yaml
 from ruamel.yaml import YAML
 
 from ..config import Config
+from ..crawling import DuplicateDetector
 from ..utils.logging import get_logger
 
 
 class FileSystemManager:
     """Tool for managing file system operations."""
     
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, duplicates: Optional[DuplicateDetector] = None):
         """Initialize the file system manager.
         
         Args:
             config: Server configuration
+            duplicates: Optional duplicate detector; context files whose
+                body duplicates an earlier one are not written
         """
         self.config = config
+        self.duplicates = duplicates
         self.logger = get_logger(__name__)
         self.ruamel_yaml = YAML()
         self.ruamel_yaml.preserve_quotes = True
@@ -229,6 +233,23 @@ class FileSystemManager:
                 file_path = self.config.output.output_base_directory / path
                 
                 if isinstance(content, dict) and "body" in content:
+                    # Skip context files duplicating one already written
+                    if self.duplicates is not None:
+                        match = self.duplicates.check(
+                            content.get("source_url") or str(file_path), content["body"]
+                        )
+                        if match is not None:
+                            self.logger.info(f"Skipping duplicate context file: {file_path}",
+                                           duplicate_of=match.url)
+                            return {
+                                "success": True,
+                                "action": action,
+                                "path": str(file_path),
+                                "skipped": True,
+                                "duplicate_of": match.url,
+                                "message": "Duplicate content, file not written"
+                            }
+                    
                     # Context file with metadata
                     await self._write_context_file(file_path, content)
                 else:
@@ -2,31 +2,134 @@
 
 import re
 from typing import Dict, Any, List, Optional, Tuple
-from dataclasses import dataclass, field
 import json
 
 from ..config import Config
+from ..extraction import (
+    FormatSniff, Heading, StructureStateStore, default_registry, diff_sections, extract_html_headings,
+    extract_markdown_headings, scan_markdown, sniff_format, split_sections
+)
+from ..extraction.sniffing import in_fence
 from ..utils.logging import get_logger
 
 
-@dataclass
 class HeadingNode:
-    """Represents a heading in the document structure."""
-    level: int
-    text: str
-    content: str = ""
-    children: List["HeadingNode"] = field(default_factory=list)
-    line_number: int = 0
+    """Represents a heading in the document structure.
     
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary representation."""
-        return {
-            "level": self.level,
-            "text": self.text,
-            "content": self.content,
-            "children": [child.to_dict() for child in self.children],
-            "line_number": self.line_number
-        }
+    A node does not copy its section text. It keeps the source document
+    and the offsets of the section, and ``content`` slices them on access,
+    so a tree over a large document costs little more than the document
+    itself. Content can also be given directly. ``to_dict`` copies the
+    section text into its result unless ``include_content`` is false, so
+    a full serialized tree holds a second copy of the document.
+    """
+    
+    __slots__ = ("level", "text", "children", "line_number", "source", "start", "end", "_content")
+    
+    def __init__(
+        self,
+        level: int,
+        text: str,
+        content: Optional[str] = None,
+        children: Optional[List["HeadingNode"]] = None,
+        line_number: int = 0,
+        source: str = "",
+        start: int = 0,
+        end: int = 0
+    ):
+        """Initialize the node.
+        
+        Args:
+            level: Heading level, 1 to 6
+            text: Heading text
+            content: Section text, or None to slice it from the source
+            children: Child nodes
+            line_number: 1-based line of the heading
+            source: Document the section offsets refer to
+            start: Offset where the section text starts
+            end: Offset where the section text ends
+        """
+        self.level = level
+        self.text = text
+        self.children = children if children is not None else []
+        self.line_number = line_number
+        self.source = source
+        self.start = start
+        self.end = end
+        self._content = content
+    
+    @property
+    def content(self) -> str:
+        """Section text between this heading and the next one."""
+        if self._content is not None:
+            return self._content
+        return self.source[self.start:self.end].strip()
+    
+    def __repr__(self) -> str:
+        return f"HeadingNode(level={self.level}, text={self.text!r}, line_number={self.line_number})"
+    
+    def to_dict(self, max_level: int = 6, include_content: bool = True) -> Dict[str, Any]:
+        """Convert to dictionary representation.
+        
+        Args:
+            max_level: Deepest heading level to include among descendants
+            include_content: Include the section text; when false only its
+                ``start`` and ``end`` offsets in the source are given
+        """
+        data: Dict[str, Any] = {"level": self.level, "text": self.text}
+        if include_content:
+            data["content"] = self.content
+        else:
+            data["start"] = self.start
+            data["end"] = self.end
+        data["children"] = [
+            child.to_dict(max_level, include_content) for child in self.children if child.level <= max_level
+        ]
+        data["line_number"] = self.line_number
+        return data
+
+
+class HeadingView:
+    """Read-only view of a heading subtree limited to a maximum level.
+    
+    Filtering by granularity wraps nodes instead of rebuilding the tree;
+    children deeper than ``max_level`` are skipped when iterated.
+    """
+    
+    __slots__ = ("node", "max_level")
+    
+    def __init__(self, node: HeadingNode, max_level: int):
+        self.node = node
+        self.max_level = max_level
+    
+    @property
+    def level(self) -> int:
+        return self.node.level
+    
+    @property
+    def text(self) -> str:
+        return self.node.text
+    
+    @property
+    def content(self) -> str:
+        return self.node.content
+    
+    @property
+    def line_number(self) -> int:
+        return self.node.line_number
+    
+    @property
+    def children(self) -> List["HeadingView"]:
+        """Children within the level limit, as views."""
+        return [HeadingView(child, self.max_level) for child in self.node.children if child.level <= self.max_level]
+    
+    def to_dict(self, include_content: bool = True) -> Dict[str, Any]:
+        """Convert to dictionary representation.
+        
+        Args:
+            include_content: Include the section text rather than offsets
+        """
+        return self.node.to_dict(self.max_level, include_content)
 
 
 class LLMStructureExtractor:
@@ -41,13 +144,11 @@ class LLMStructureExtractor:
         self.config = config
         self.logger = get_logger(__name__)
         
-        # Heading patterns for different formats
-        self.heading_patterns = {
-            "markdown": re.compile(r"^(#{1,6})\s+(.+)$", re.MULTILINE),
-            "html": re.compile(r"<h([1-6]).*?>(.*?)</h[1-6]>", re.IGNORECASE | re.DOTALL),
-            "rst": re.compile(r"^(.+)\n([=\-~`#\"^+*]{3,})$", re.MULTILINE),
-            "asciidoc": re.compile(r"^(={1,6})\s+(.+)$", re.MULTILINE)
-        }
+        # Heading extractors by format; plugins can register more
+        self.extractors = default_registry()
+        
+        # Section state of documents extracted incrementally
+        self.state_store = StructureStateStore(config.get_cache_directory() / "structure")
     
     def _detect_format(self, content: str) -> str:
         """Detect the format of the content.
@@ -58,72 +159,68 @@ class LLMStructureExtractor:
         Returns:
             Detected format type
         """
-        # Check for HTML tags
-        if re.search(r"<h[1-6].*?>", content, re.IGNORECASE):
-            return "html"
-        
-        # Check for Markdown headers
-        if re.search(r"^#{1,6}\s+", content, re.MULTILINE):
-            return "markdown"
-        
-        # Check for reStructuredText
-        if re.search(r"^.+\n[=\-~`#\"^+*]{3,}$", content, re.MULTILINE):
-            return "rst"
+        return sniff_format(content).format
+    
+    def _extract_headings(self, content: str, sniff: FormatSniff) -> List[Heading]:
+        """Extract headings for every format found in the content.
         
-        # Check for AsciiDoc
-        if re.search(r"^={1,6}\s+", content, re.MULTILINE):
-            return "asciidoc"
+        Mixed documents, such as Markdown with embedded HTML headings, are
+        read with each format's extractor and the headings merged in
+        document order. Headings of the secondary formats that fall inside
+        a Markdown fenced code block are example markup, not headings.
         
-        # Default to markdown
-        return "markdown"
+        Args:
+            content: Text content
+            sniff: Detected formats of the content
+            
+        Returns:
+            Headings in document order
+        """
+        formats = sniff.formats or [sniff.format]
+        # A single scan serves the Markdown extractor and the fence check
+        scan = scan_markdown(content) if "markdown" in formats or len(formats) > 1 else None
+        if len(formats) == 1:
+            return self.extractors.extract(content, formats[0], scan)
+        
+        headings = list(self.extractors.extract(content, formats[0], scan))
+        starts = [fence.start for fence in scan.fences]
+        for format_type in formats[1:]:
+            headings.extend(
+                h for h in self.extractors.extract(content, format_type, scan)
+                if not in_fence(scan.fences, starts, h.start)
+            )
+        return sorted(headings, key=lambda h: h.start)
     
-    def _extract_markdown_headings(self, content: str) -> List[Tuple[int, str, int]]:
+    def _extract_markdown_headings(self, content: str) -> List[Heading]:
         """Extract headings from Markdown content.
         
+        Lines inside fenced code blocks are not headings.
+        
         Args:
             content: Markdown content
             
         Returns:
-            List of (level, text, line_number) tuples
+            List of headings with their line numbers and offsets
         """
-        headings = []
-        lines = content.split("\n")
-        
-        for i, line in enumerate(lines):
-            match = self.heading_patterns["markdown"].match(line)
-            if match:
-                level = len(match.group(1))
-                text = match.group(2).strip()
-                headings.append((level, text, i + 1))
-        
-        return headings
+        return extract_markdown_headings(content)
     
-    def _extract_html_headings(self, content: str) -> List[Tuple[int, str, int]]:
+    def _extract_html_headings(self, content: str) -> List[Heading]:
         """Extract headings from HTML content.
         
         Args:
             content: HTML content
             
         Returns:
-            List of (level, text, line_number) tuples
+            List of headings; offsets span the line each heading starts on
         """
-        headings = []
-        
-        for match in self.heading_patterns["html"].finditer(content):
-            level = int(match.group(1))
-            text = re.sub(r"<.*?>", "", match.group(2)).strip()
-            # Approximate line number
-            line_number = content[:match.start()].count("\n") + 1
-            headings.append((level, text, line_number))
-        
-        return headings
+        return extract_html_headings(content)
     
-    def _build_hierarchy(self, headings: List[Tuple[int, str, int]], content_lines: List[str]) -> List[HeadingNode]:
+    def _build_hierarchy(self, headings: List[Heading], content: str) -> List[HeadingNode]:
         """Build hierarchical structure from flat heading list.
         
         Args:
-            headings: List of (level, text, line_number) tuples
-            content_lines: Original content lines
+            headings: Headings in document order
+            content: Content the headings were found in
             
         Returns:
             List of root heading nodes
@@ -134,18 +231,19 @@ class LLMStructureExtractor:
         root_nodes = []
         stack = []  # Stack of (level, node) tuples
         
-        for i, (level, text, line_num) in enumerate(headings):
-            # Extract content between this heading and the next
-            start_line = line_num
-            if i + 1 < len(headings):
-                end_line = headings[i + 1][2] - 1
-            else:
-                end_line = len(content_lines)
+        for i, heading in enumerate(headings):
+            level = heading.level
+            # A section runs from after its heading line to the next heading
+            end = headings[i + 1].start if i + 1 < len(headings) else len(content)
             
-            # Get content, excluding the heading line itself
-            content = "\n".join(content_lines[start_line:end_line]).strip()
-            
-            node = HeadingNode(level=level, text=text, content=content, line_number=line_num)
+            node = HeadingNode(
+                level=level,
+                text=heading.text,
+                line_number=heading.line_number,
+                source=content,
+                start=heading.end,
+                end=end
+            )
             
             # Find parent node
             while stack and stack[-1][0] >= level:
@@ -162,7 +260,7 @@ class LLMStructureExtractor:
         
         return root_nodes
     
-    def _filter_by_granularity(self, nodes: List[HeadingNode], granularity: str) -> List[HeadingNode]:
+    def _filter_by_granularity(self, nodes: List[HeadingNode], granularity: str) -> List[HeadingView]:
         """Filter nodes based on granularity setting.
         
         Args:
@@ -170,7 +268,7 @@ class LLMStructureExtractor:
             granularity: Granularity level
             
         Returns:
-            Filtered list of nodes
+            Views of the root nodes within the level limit
         """
         max_level = {
             "L1_only": 1,
@@ -179,25 +277,7 @@ class LLMStructureExtractor:
             "full_hierarchy": 6
         }.get(granularity, 6)
         
-        def filter_node(node: HeadingNode) -> Optional[HeadingNode]:
-            if node.level > max_level:
-                return None
-            
-            filtered_children = []
-            for child in node.children:
-                filtered_child = filter_node(child)
-                if filtered_child:
-                    filtered_children.append(filtered_child)
-            
-            return HeadingNode(
-                level=node.level,
-                text=node.text,
-                content=node.content,
-                children=filtered_children,
-                line_number=node.line_number
-            )
-        
-        return [filter_node(node) for node in nodes if filter_node(node)]
+        return [HeadingView(node, max_level) for node in nodes if node.level <= max_level]
     
     def _summarize_content(self, content: str, level: str) -> str:
         """Summarize content based on summarization level.
@@ -213,13 +293,13 @@ class LLMStructureExtractor:
             return ""
         elif level == "brief":
             # Return first paragraph or 200 characters
-            paragraphs = content.split("\n\n")
+            paragraphs = content.split("\n\n", 1)
             if paragraphs:
                 return paragraphs[0][:200] + "..." if len(paragraphs[0]) > 200 else paragraphs[0]
             return content[:200] + "..." if len(content) > 200 else content
         elif level == "detailed":
             # Return first 500 characters or 2 paragraphs
-            paragraphs = content.split("\n\n")
+            paragraphs = content.split("\n\n", 2)
             if len(paragraphs) >= 2:
                 return "\n\n".join(paragraphs[:2])
             return content[:500] + "..." if len(content) > 500 else content
@@ -252,22 +332,20 @@ class LLMStructureExtractor:
             **(extraction_config or {})
         }
         
-        # Detect content format
-        format_type = self._detect_format(content)
-        self.logger.debug(f"Detected format: {format_type}")
+        # Detect content format from a bounded sample, unless given
+        sniff = sniff_format(content)
+        if config.get("format"):
+            if self.extractors.get(config["format"]) is None:
+                raise ValueError(f"Unsupported format: {config['format']}")
+            sniff = FormatSniff(format=config["format"], confidence=sniff.confidence, formats=[config["format"]])
+        format_type = sniff.format
+        self.logger.debug(f"Detected format: {format_type}", formats=sniff.formats)
         
-        # Extract headings based on format
-        if format_type == "markdown":
-            headings = self._extract_markdown_headings(content)
-        elif format_type == "html":
-            headings = self._extract_html_headings(content)
-        else:
-            # Fallback to markdown
-            headings = self._extract_markdown_headings(content)
+        # Extract headings for each format present
+        headings = self._extract_headings(content, sniff)
         
-        # Build hierarchy
-        content_lines = content.split("\n")
-        hierarchy = self._build_hierarchy(headings, content_lines)
+        # Build hierarchy from the heading offsets; the content is not split
+        hierarchy = self._build_hierarchy(headings, content)
         
         # Filter by granularity
         filtered_hierarchy = self._filter_by_granularity(hierarchy, config["granularity"])
@@ -276,18 +354,30 @@ class LLMStructureExtractor:
         total_headings = len(headings)
         confidence = min(1.0, total_headings / 10.0) if total_headings > 0 else 0.0
         
-        # Extract entities (simplified version)
-        entities = self._extract_entities(content)
+        # Extract entities (simplified version), reusing unchanged sections
+        # of the previous version in incremental mode
+        structure_diff = None
+        if config.get("incremental"):
+            if not config.get("document_id"):
+                raise ValueError("document_id is required for incremental extraction")
+            entities, structure_diff = await self._extract_incremental(config["document_id"], content, headings)
+        else:
+            entities = self._extract_entities(content)
         
         result = {
-            "structured_headings": [node.to_dict() for node in filtered_hierarchy],
+            "structured_headings": [
+                node.to_dict(include_content=config.get("include_content", True)) for node in filtered_hierarchy
+            ],
             "content_summary": self._summarize_content(content, config["summarization"]),
             "extracted_entities": entities,
             "confidence_score": confidence,
             "format_detected": format_type,
+            "format_confidence": sniff.confidence,
             "total_headings": total_headings,
             "hierarchy_levels": list(set(h[0] for h in headings)) if headings else []
         }
+        if structure_diff is not None:
+            result["structure_diff"] = structure_diff
         
         self.logger.info("Structure extraction completed", 
                         total_headings=total_headings,
@@ -295,6 +385,69 @@ class LLMStructureExtractor:
         
         return result
     
+    async def _extract_incremental(
+        self,
+        document_id: str,
+        content: str,
+        headings: List[Heading]
+    ) -> Tuple[Dict[str, List[str]], Dict[str, Any]]:
+        """Extract entities section by section, reusing the previous version.
+        
+        Sections are hashed and only those whose hash is not in the stored
+        state of the document are processed, so re-extracting a large
+        document that changed in a few places costs time proportional to
+        the change. The new state replaces the stored one.
+        
+        Args:
+            document_id: Identifier of the document across versions
+            content: Current document text
+            headings: Headings of the current document
+            
+        Returns:
+            Merged entities and the structure diff against the previous
+            version, with the number of sections recomputed
+        """
+        previous = await self.state_store.get(document_id)
+        previous_sections = previous["sections"] if previous else []
+        known = {record["hash"]: record["entities"] for record in previous_sections}
+        
+        sections = split_sections(content, headings)
+        records = []
+        recomputed = 0
+        for section in sections:
+            entities = known.get(section.digest)
+            if entities is None:
+                entities = self._extract_entities(content[section.start:section.end])
+                recomputed += 1
+            records.append({
+                "key": section.key,
+                "parent": section.parent,
+                "hash": section.digest,
+                "line_number": section.line_number,
+                "entities": entities
+            })
+        
+        structure_diff = diff_sections(previous_sections, sections)
+        structure_diff["recomputed"] = recomputed
+        await self.state_store.put(document_id, records)
+        
+        self.logger.debug(
+            "Incremental extraction",
+            document_id=document_id,
+            sections=len(sections),
+            recomputed=recomputed
+        )
+        return self._merge_entities([record["entities"] for record in records]), structure_diff
+    
+    def _merge_entities(self, parts: List[Dict[str, List[str]]]) -> Dict[str, List[str]]:
+        """Merge per-section entities in document order without duplicates."""
+        return {
+            "urls": list(dict.fromkeys(url for part in parts for url in part["urls"])),
+            "emails": list(dict.fromkeys(email for part in parts for email in part["emails"])),
+            "code_blocks": [block for part in parts for block in part["code_blocks"]],
+            "key_terms": list(dict.fromkeys(term for part in parts for term in part["key_terms"]))
+        }
+    
     def _extract_entities(self, content: str) -> Dict[str, List[str]]:
         """Extract named entities from content.
         
@@ -1,84 +1,150 @@
 """URL discovery engine for YAML Context Engineering."""
 
-import re
-from typing import List, Dict, Any, Set
-from urllib.parse import urlparse, urljoin
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
+from urllib.parse import urlparse
 from collections import defaultdict
+from datetime import datetime, timezone
 
-import validators
+import numpy as np
 
 from ..config import Config
+from ..crawling import ConnectionPool, SeenURLStore, URLRankingModel, canonicalize_url
+from ..crawling.ranking import base_netloc, relation_type
+from ..crawling.sitemap import SitemapEntry, SitemapReader
+from ..crawling.url_scanner import scan_url_spans
 from ..utils.logging import get_logger
+from ..utils.matching import PatternMatcher
 
 
 class URLDiscoveryEngine:
     """Tool for discovering and prioritizing URLs from content."""
     
-    def __init__(self, config: Config):
+    # Path fragments used to estimate content value
+    CONTENT_VALUE_PATTERNS = {
+        "high": [
+            "/api", "/docs", "/documentation", "/reference", "/spec",
+            "/tutorial", "/guide", "/manual", "/quickstart"
+        ],
+        "medium": [
+            "/example", "/sample", "/demo", "/overview", "/about",
+            "/introduction", "/features", "/faq"
+        ],
+        "low": [
+            "/blog", "/news", "/press", "/contact", "/privacy",
+            "/terms", "/legal", "/careers", "/jobs"
+        ]
+    }
+    
+    def __init__(
+        self,
+        config: Config,
+        seen_store: Optional[SeenURLStore] = None,
+        pool: Optional[ConnectionPool] = None
+    ):
         """Initialize the URL discovery engine.
         
         Args:
             config: Server configuration
+            seen_store: Optional store of already fetched URLs
+            pool: Shared connection pool for sitemap requests (created
+                and owned by the engine if not given)
         """
         self.config = config
+        self.seen_store = seen_store
         self.logger = get_logger(__name__)
         
-        # URL extraction patterns
-        self.url_patterns = [
-            # Standard URLs
-            re.compile(r'https?://[^\s<>"\'{}\|\\^`\[\]]+'),
-            # Markdown links
-            re.compile(r'\[([^\]]+)\]\((https?://[^)]+)\)'),
-            # HTML links
-            re.compile(r'<a[^>]+href=["\']?(https?://[^"\'>\s]+)["\']?[^>]*>'),
-            # Plain domain references
-            re.compile(r'\b(?:www\.)?([a-zA-Z0-9-]+(?:\.[a-zA-Z0-9-]+)+)(?:/[^\s]*)?')
-        ]
+        # Sitemaps are fetched over the shared connection pool
+        self._owns_pool = pool is None
+        self.pool = pool or ConnectionPool(config.crawling)
+        self.sitemaps = SitemapReader(self.pool, max_sitemaps=config.crawling.max_sitemaps)
+        
+        # Linear model for URL scoring, weights tunable from config
+        self.ranking = URLRankingModel(config.crawling.url_score_weights)
+        self._domain_matcher = PatternMatcher([])
+    
+    def domain_matcher(self) -> PatternMatcher:
+        """Return the matcher for config target_domain_patterns.
         
-        # Priority keywords for URL scoring
-        self.priority_keywords = {
-            "high": ["api", "documentation", "docs", "reference", "guide", "tutorial", "manual"],
-            "medium": ["example", "sample", "demo", "overview", "introduction", "getting-started"],
-            "low": ["blog", "news", "about", "contact", "privacy", "terms"]
-        }
+        The matcher is rebuilt only when the configured patterns change.
+        """
+        patterns = tuple(self.config.crawling.target_domain_patterns)
+        if patterns != self._domain_matcher.patterns:
+            self._domain_matcher = PatternMatcher(patterns)
+        return self._domain_matcher
     
-    def _extract_urls(self, content: str, base_domain: str) -> Set[str]:
-        """Extract all URLs from content.
+    def _extract_urls(self, content: str, base_domain: str) -> Dict[str, List[Tuple[int, int]]]:
+        """Extract all URLs from content with their positions.
         
         Args:
             content: Text content
             base_domain: Base domain for resolving relative URLs
             
         Returns:
-            Set of unique URLs
+            Mapping of each unique URL (one variant per canonical URL) to
+            the (start, end) offsets of all its occurrences, in document order
         """
-        urls = set()
         base_url = f"https://{base_domain}" if not base_domain.startswith("http") else base_domain
+        variants: Dict[str, str] = {}
+        urls: Dict[str, List[Tuple[int, int]]] = {}
         
-        # Extract with different patterns
-        for pattern in self.url_patterns:
-            matches = pattern.findall(content)
-            for match in matches:
-                if isinstance(match, tuple):
-                    # For patterns that capture groups
-                    url = match[1] if len(match) > 1 else match[0]
-                else:
-                    url = match
-                
-                # Handle plain domain references
-                if not url.startswith(("http://", "https://")):
-                    if validators.domain(url.split("/")[0]):
-                        url = f"https://{url}"
-                    else:
-                        # Might be a relative path
-                        url = urljoin(base_url, url)
-                
-                # Validate and add
-                if validators.url(url):
-                    urls.add(url)
+        # One scan covers Markdown links, anchors, bare URLs and domains;
+        # occurrences of every variant are credited to the first variant
+        for url, start, end in scan_url_spans(content, base_url):
+            first = variants.setdefault(canonicalize_url(url), url)
+            urls.setdefault(first, []).append((start, end))
         
         return urls
     
+    @staticmethod
+    def _anchor_text(content: str, start: int, end: int) -> str:
+        """Return the link text of a Markdown link or HTML anchor.
+        
+        Args:
+            content: Text content
+            start: Start offset of the URL
+            end: End offset of the URL
+            
+        Returns:
+            Anchor text, or an empty string for bare URLs
+        """
+        # Markdown: [text](url)
+        if content[max(0, start - 2):start] == "](":
+            opening = content.rfind("[", max(0, start - 200), start - 2)
+            if opening != -1:
+                return content[opening + 1:start - 2].strip()
+            return ""
+        
+        # HTML: <a href="url">text</a>
+        if content.rfind("href", max(0, start - 8), start) != -1:
+            tag_end = content.find(">", end, end + 200)
+            if tag_end != -1:
+                text_end = content.find("<", tag_end + 1, tag_end + 201)
+                if text_end != -1:
+                    return content[tag_end + 1:text_end].strip()
+        
+        return ""
+    
+    def score_urls(
+        self,
+        urls: List[str],
+        base_domain: Optional[str] = None,
+        contexts: Optional[List[str]] = None,
+        anchors: Optional[List[str]] = None
+    ) -> np.ndarray:
+        """Score a batch of URLs in one vectorized call.
+        
+        Args:
+            urls: URLs to score
+            base_domain: Optional base domain for relation type features
+            contexts: Optional text surrounding each URL
+            anchors: Optional anchor text of each URL
+            
+        Returns:
+            Array of priority scores (0.0 to 1.0), one per URL
+        """
+        features = self.ranking.features(urls, contexts=contexts, anchors=anchors, base_domain=base_domain)
+        return self.ranking.score(features)
+    
     def _calculate_priority_score(self, url: str, context: str = "") -> float:
         """Calculate priority score for a URL.
         
@@ -89,37 +155,7 @@ class URLDiscoveryEngine:
         Returns:
             Priority score (0.0 to 1.0)
         """
-        score = 0.5  # Base score
-        url_lower = url.lower()
-        context_lower = context.lower() if context else ""
-        
-        # Check URL path for keywords
-        for priority, keywords in self.priority_keywords.items():
-            for keyword in keywords:
-                if keyword in url_lower:
-                    if priority == "high":
-                        score += 0.3
-                    elif priority == "medium":
-                        score += 0.2
-                    else:
-                        score -= 0.1
-        
-        # Check context for relevance
-        if context:
-            # URLs in headings or near important keywords get higher scores
-            if any(keyword in context_lower for keyword in ["important", "required", "must", "essential"]):
-                score += 0.2
-        
-        # Penalize certain URL patterns
-        if any(pattern in url_lower for pattern in ["#", "?page=", "login", "signin", "register"]):
-            score -= 0.2
-        
-        # Prefer documentation subdirectories
-        if any(path in url_lower for path in ["/docs/", "/api/", "/reference/", "/guide/"]):
-            score += 0.2
-        
-        # Normalize score
-        return max(0.0, min(1.0, score))
+        return float(self.score_urls([url], contexts=[context])[0])
     
     def _determine_relation_type(self, url: str, base_domain: str) -> str:
         """Determine the relation type of URL to base domain.
@@ -131,17 +167,7 @@ class URLDiscoveryEngine:
         Returns:
             Relation type
         """
-        parsed_url = urlparse(url)
-        parsed_base = urlparse(base_domain if base_domain.startswith("http") else f"https://{base_domain}")
-        
-        if parsed_url.netloc == parsed_base.netloc:
-            return "internal"
-        elif parsed_url.netloc.endswith(f".{parsed_base.netloc}"):
-            return "subdomain"
-        elif parsed_base.netloc.endswith(f".{parsed_url.netloc}"):
-            return "parent_domain"
-        else:
-            return "external"
+        return relation_type(urlparse(url).netloc, base_netloc(base_domain))
     
     def _estimate_content_value(self, url: str) -> str:
         """Estimate the content value of a URL.
@@ -154,34 +180,94 @@ class URLDiscoveryEngine:
         """
         url_lower = url.lower()
         
-        # High value patterns
-        if any(pattern in url_lower for pattern in [
-            "/api", "/docs", "/documentation", "/reference", "/spec",
-            "/tutorial", "/guide", "/manual", "/quickstart"
-        ]):
-            return "high"
+        # Categories are checked from high to low value
+        for value, patterns in self.CONTENT_VALUE_PATTERNS.items():
+            if any(pattern in url_lower for pattern in patterns):
+                return value
         
-        # Medium value patterns
-        if any(pattern in url_lower for pattern in [
-            "/example", "/sample", "/demo", "/overview", "/about",
-            "/introduction", "/features", "/faq"
-        ]):
-            return "medium"
+        return "unknown"
+    
+    def _is_unchanged(self, url: str, lastmod: Optional[float] = None) -> bool:
+        """Check whether a URL was fetched and has not changed since."""
+        return self.seen_store is not None and self.seen_store.is_unchanged(url, lastmod)
+    
+    async def iter_sitemap(
+        self,
+        base_domain: str,
+        sitemap_urls: Optional[List[str]] = None
+    ) -> AsyncIterator[SitemapEntry]:
+        """Stream the pages listed in a site's sitemaps.
         
-        # Low value patterns
-        if any(pattern in url_lower for pattern in [
-            "/blog", "/news", "/press", "/contact", "/privacy",
-            "/terms", "/legal", "/careers", "/jobs"
-        ]):
-            return "low"
+        Args:
+            base_domain: Domain (or URL) of the site
+            sitemap_urls: Sitemap or sitemap index URLs (defaults to
+                ``/sitemap.xml`` on the base domain)
+            
+        Yields:
+            One entry per listed page, with its ``lastmod`` if given
+        """
+        if not sitemap_urls:
+            scheme = urlparse(base_domain).scheme if base_domain.startswith("http") else "https"
+            sitemap_urls = [f"{scheme}://{base_netloc(base_domain)}/sitemap.xml"]
         
-        return "unknown"
+        async for entry in self.sitemaps.iter_entries(sitemap_urls):
+            yield entry
+    
+    async def discover_sitemap(
+        self,
+        base_domain: str,
+        sitemap_urls: Optional[List[str]] = None,
+        filters: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Discover and prioritize URLs from a site's sitemaps.
+        
+        Args:
+            base_domain: Domain (or URL) of the site
+            sitemap_urls: Optional sitemap or sitemap index URLs
+            filters: Optional URL filter patterns
+            
+        Returns:
+            List of discovered URLs with metadata; ``already_fetched`` is
+            true for pages fetched since their ``lastmod``
+        """
+        filter_matcher = PatternMatcher(filters or [])
+        domain_matcher = self.domain_matcher()
+        
+        entries: Dict[str, SitemapEntry] = {}
+        async for entry in self.iter_sitemap(base_domain, sitemap_urls):
+            if filter_matcher and not filter_matcher.matches(entry.url):
+                continue
+            if domain_matcher and not domain_matcher.matches(entry.url):
+                continue
+            entries.setdefault(canonicalize_url(entry.url), entry)
+        
+        candidates = [entry.url for entry in entries.values()]
+        scores = self.score_urls(candidates, base_domain)
+        
+        url_data = []
+        for entry, score in zip(entries.values(), scores.tolist()):
+            url_data.append({
+                "url": entry.url,
+                "priority_score": score,
+                "relation_type": self._determine_relation_type(entry.url, base_domain),
+                "estimated_content_value": self._estimate_content_value(entry.url),
+                "already_fetched": self._is_unchanged(entry.url, entry.lastmod),
+                "lastmod": (
+                    datetime.fromtimestamp(entry.lastmod, timezone.utc).isoformat()
+                    if entry.lastmod is not None else None
+                ),
+                "source": "sitemap"
+            })
+        
+        self.logger.info(f"Discovered {len(url_data)} URLs from sitemaps", base_domain=base_domain)
+        return url_data
     
     async def discover(
         self,
         content: str,
         base_domain: str,
-        filters: List[str] = None
+        filters: List[str] = None,
+        include_sitemap: bool = False
     ) -> List[Dict[str, Any]]:
         """Discover and prioritize URLs from content.
         
@@ -189,6 +275,7 @@ class URLDiscoveryEngine:
             content: Content to search for URLs
             base_domain: Base domain for context
             filters: Optional URL filter patterns
+            include_sitemap: Also add pages listed in the base domain's sitemap
             
         Returns:
             List of discovered URLs with metadata
@@ -202,41 +289,54 @@ class URLDiscoveryEngine:
         
         # Apply filters if provided
         if filters:
-            filtered_urls = set()
-            for url in urls:
-                if any(re.search(pattern, url) for pattern in filters):
-                    filtered_urls.add(url)
-            urls = filtered_urls
+            filter_matcher = PatternMatcher(filters)
+            urls = {url: spans for url, spans in urls.items() if filter_matcher.matches(url)}
         
         # Apply domain pattern restrictions from config
-        if self.config.crawling.target_domain_patterns:
-            domain_filtered = set()
-            for url in urls:
-                if any(re.search(pattern, url) for pattern in self.config.crawling.target_domain_patterns):
-                    domain_filtered.add(url)
-            urls = domain_filtered
-        
-        # Score and analyze each URL
+        domain_matcher = self.domain_matcher()
+        if domain_matcher:
+            urls = {url: spans for url, spans in urls.items() if domain_matcher.matches(url)}
+        
+        # Context is taken around the first occurrence recorded by the scanner:
+        # 100 characters before and after
+        candidates = list(urls)
+        contexts = []
+        anchors = []
+        for spans in urls.values():
+            first_start, first_end = spans[0]
+            contexts.append(content[max(0, first_start - 100):first_end + 100])
+            anchors.append(next(
+                (text for start, end in spans if (text := self._anchor_text(content, start, end))), ""
+            ))
+        
+        # Score all candidates in one batch
+        scores = self.score_urls(candidates, base_domain, contexts, anchors)
+        
+        # Analyze each URL
         url_data = []
-        for url in urls:
-            # Find context around URL in content
-            context = ""
-            url_index = content.find(url)
-            if url_index != -1:
-                # Get 100 characters before and after
-                start = max(0, url_index - 100)
-                end = min(len(content), url_index + len(url) + 100)
-                context = content[start:end]
-            
+        for url, context, anchor, score in zip(candidates, contexts, anchors, scores.tolist()):
+            spans = urls[url]
             url_info = {
                 "url": url,
-                "priority_score": self._calculate_priority_score(url, context),
+                "priority_score": score,
                 "relation_type": self._determine_relation_type(url, base_domain),
                 "estimated_content_value": self._estimate_content_value(url),
-                "context_snippet": context.strip() if context else ""
+                "already_fetched": self._is_unchanged(url),
+                "context_snippet": context.strip(),
+                "anchor_text": anchor,
+                "occurrences": [{"start": start, "end": end} for start, end in spans],
+                "source": "content"
             }
             url_data.append(url_info)
         
+        # Pages only listed in the sitemap are appended
+        if include_sitemap:
+            found = {canonicalize_url(url) for url in urls}
+            url_data.extend(
+                info for info in await self.discover_sitemap(base_domain, filters=filters)
+                if canonicalize_url(info["url"]) not in found
+            )
+        
         # Sort by priority score
         url_data.sort(key=lambda x: x["priority_score"], reverse=True)
         
@@ -248,4 +348,9 @@ class URLDiscoveryEngine:
         self.logger.info(f"Discovered {len(url_data)} URLs",
                         by_relation=dict(by_relation))
         
-        return url_data
\ No newline at end of file
+        return url_data
+    
+    async def close(self) -> None:
+        """Close the connection pool if the engine created it."""
+        if self._owns_pool:
+            await self.pool.close()
@@ -1,130 +1,359 @@
 """Web content fetching tool for YAML Context Engineering."""
 
 import asyncio
+import multiprocessing
 import re
-from typing import List, Dict, Any, Optional
-from urllib.parse import urljoin, urlparse
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Iterable, List, Dict, Any, Optional
+from urllib.parse import urlparse
 
 import aiohttp
 from bs4 import BeautifulSoup
-import html2text
-from langdetect import detect
 import validators
-from tenacity import retry, stop_after_attempt, wait_exponential
 
 from ..config import Config
+from ..crawling import CircuitOpenError, ConnectionPool, HostHealth, HostScheduler, RobotsCache, HTTPCache
+from ..crawling.compression import (
+    ContentDecoder, ContentDecodingError, UnsupportedEncodingError, accept_encoding
+)
+from ..crawling.host_health import OVERLOAD_STATUSES, RETRY_STATUSES, parse_retry_after, retry_delay
+from ..crawling.parsing import extract_links, process_html
+from ..crawling.streaming import declared_length, is_textual_content_type, read_text
 from ..utils.logging import get_logger
 
 
+# Parser workers are started from a clean server process (or spawned where
+# there is none) rather than forked from inside the running event loop,
+# which would copy its threads, locks and open sockets into each worker
+POOL_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+class _TransientFailure(Exception):
+    """A failed request that is worth retrying."""
+    
+    def __init__(self, error: str, status_code: int = 0, retry_after: Optional[float] = None):
+        super().__init__(error)
+        self.error = error
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
 class WebContentFetcher:
     """Tool for fetching web content from URLs."""
     
-    def __init__(self, config: Config):
+    def __init__(
+        self,
+        config: Config,
+        executor: Optional[Executor] = None,
+        pool: Optional[ConnectionPool] = None
+    ):
         """Initialize the web content fetcher.
         
         Args:
             config: Server configuration
+            executor: Optional executor for HTML parsing and conversion.
+                Defaults to a process pool sized by
+                config.extraction.parser_workers.
+            pool: Optional shared connection pool. Defaults to a pool
+                owned and closed by this fetcher.
         """
         self.config = config
         self.logger = get_logger(__name__)
-        self.html_converter = html2text.HTML2Text()
-        self.html_converter.ignore_links = False
-        self.html_converter.ignore_images = True
-        self.html_converter.body_width = 0  # No line wrapping
         
-        # Session for connection pooling
+        # Executor for CPU-bound parsing (created lazily unless supplied)
+        self._executor = executor
+        self._owns_executor = executor is None
+        
+        # Long-lived connection pool (created here unless shared)
+        self.pool = pool if pool is not None else ConnectionPool(config.crawling)
+        self._owns_pool = pool is None
         self._session: Optional[aiohttp.ClientSession] = None
+        
+        # Global concurrency limit (created lazily inside the running event loop)
+        self._global_limit: Optional[asyncio.Semaphore] = None
+        
+        # Adaptive per-host concurrency limits and circuit breakers
+        self.health = HostHealth(
+            config.crawling.max_concurrent_per_host,
+            failure_threshold=config.crawling.circuit_failure_threshold,
+            reset_seconds=config.crawling.circuit_reset_seconds
+        )
+        
+        # Per-host politeness delays
+        self.scheduler = HostScheduler(config.crawling.crawl_delay_seconds)
+        
+        # robots.txt rules, shared by every call on this fetcher
+        self.robots = RobotsCache(
+            user_agent=config.crawling.user_agent,
+            ttl_seconds=config.crawling.robots_cache_ttl_seconds,
+            cache_dir=config.get_cache_directory() / "robots"
+        )
+        
+        # Conditional-request cache for cheap re-crawls
+        self.http_cache: Optional[HTTPCache] = None
+        if config.crawling.http_cache_enabled:
+            self.http_cache = HTTPCache(config.get_cache_directory() / "http")
     
     async def _get_session(self) -> aiohttp.ClientSession:
-        """Get or create aiohttp session."""
+        """Get the session of the connection pool."""
         if self._session is None or self._session.closed:
-            timeout = aiohttp.ClientTimeout(total=self.config.crawling.timeout_seconds)
-            headers = {"User-Agent": self.config.crawling.user_agent}
-            self._session = aiohttp.ClientSession(
-                timeout=timeout,
-                headers=headers
-            )
+            self._session = await self.pool.session()
         return self._session
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10)
-    )
-    async def _fetch_single_url(self, url: str) -> Dict[str, Any]:
-        """Fetch content from a single URL with retry logic.
+    def _get_executor(self) -> Optional[Executor]:
+        """Get or create the parsing executor.
+        
+        Returns:
+            Executor to run parsing in, or None to parse on the event loop
+        """
+        if self._executor is None and self._owns_executor:
+            workers = self.config.extraction.parser_workers
+            if workers == 0:
+                return None
+            self._executor = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context(POOL_START_METHOD)
+            )
+        return self._executor
+    
+    async def _run_cpu(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a CPU-bound function in the parsing executor.
+        
+        Args:
+            func: Picklable function to run
+            *args: Arguments for the function
+            
+        Returns:
+            The function's return value
+        """
+        executor = self._get_executor()
+        if executor is None:
+            return func(*args)
+        
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool next time and parse inline now
+            self.logger.warning("Parser process pool broke, recreating it")
+            if self._owns_executor:
+                self._executor = None
+            return func(*args)
+    
+    @asynccontextmanager
+    async def _request_slot(self, url: str):
+        """Hold a per-host and a global concurrency slot for one request.
+        
+        Requests to a host whose circuit is open fail before queueing.
+        Otherwise the request waits for its turn in the host's politeness
+        schedule and then takes a host slot from ``HostHealth``, whose
+        limit adapts to how the host responds. The host slot is taken
+        before the global one so that requests queued behind a busy host
+        do not occupy global slots other hosts could use.
+        
+        Args:
+            url: URL about to be requested
+        
+        Raises:
+            CircuitOpenError: If the host's circuit is open
+        """
+        if self._global_limit is None:
+            self._global_limit = asyncio.Semaphore(self.config.crawling.max_concurrent_requests)
+        
+        host = urlparse(url).netloc.lower()
+        self.health.check(host)
+        await self.scheduler.wait(host)
+        
+        async with self.health.slot(host):
+            async with self._global_limit:
+                yield
+    
+    @staticmethod
+    def _failure(url: str, error: str, status_code: int = 0, **extra: Any) -> Dict[str, Any]:
+        """Build the result of a failed fetch."""
+        return {
+            "url": url,
+            "status_code": status_code,
+            "content": "",
+            "error": error,
+            "success": False,
+            **extra
+        }
+    
+    async def _fetch_single_url(self, url: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Fetch content from a single URL, retrying transient failures.
+        
+        Timeouts, connection errors and ``RETRY_STATUSES`` responses are
+        retried up to ``max_retries`` times, after the server's
+        ``Retry-After`` delay or an exponential backoff. Other client
+        errors are not retried. Requests to a host whose circuit is open
+        fail immediately, so a dead host does not hold up the rest of a
+        batch.
         
         Args:
             url: URL to fetch
+            timeout: Request timeout in seconds, or None for the configured one
             
         Returns:
             Dictionary with fetched content and metadata
         """
+        crawling = self.config.crawling
+        host = urlparse(url).netloc.lower()
         session = await self._get_session()
         
+        # Revalidate against the HTTP cache when we have seen this URL before
+        cached = await self.http_cache.get(url) if self.http_cache else None
+        headers = {
+            "Accept-Encoding": accept_encoding(crawling.compressed_transfer),
+            **HTTPCache.conditional_headers(cached)
+        }
+        request_timeout = self.pool.request_timeout(timeout)
+        
+        attempt = 0
+        while True:
+            try:
+                return await self._fetch_attempt(url, host, session, headers, cached, request_timeout)
+            except CircuitOpenError as e:
+                self.logger.info(f"Skipping URL on failing host: {url}", error=str(e))
+                return self._failure(url, str(e), circuit_open=True, attempts=attempt)
+            except _TransientFailure as e:
+                delay = retry_delay(attempt, e.retry_after, max_retry_after=crawling.max_retry_after_seconds)
+                attempt += 1
+                if attempt > crawling.max_retries or delay is None:
+                    self.logger.error(f"Failed to fetch URL: {url}", error=e.error, attempts=attempt)
+                    return self._failure(url, e.error, e.status_code, attempts=attempt)
+                
+                # Back off without holding any slot
+                self.logger.info(f"Retrying {url} in {delay:.1f}s", error=e.error, attempt=attempt)
+                await asyncio.sleep(delay)
+    
+    async def _fetch_attempt(
+        self,
+        url: str,
+        host: str,
+        session: aiohttp.ClientSession,
+        headers: Dict[str, str],
+        cached: Optional[Dict[str, Any]],
+        request_timeout: aiohttp.ClientTimeout
+    ) -> Dict[str, Any]:
+        """Make one request for a URL and record the outcome for its host.
+        
+        Raises:
+            CircuitOpenError: If the host's circuit is open
+            _TransientFailure: If the request failed in a retryable way
+        """
         try:
-            async with session.get(url) as response:
-                response.raise_for_status()
+            async with self._request_slot(url), \
+                    session.get(url, headers=headers, timeout=request_timeout,
+                                auto_decompress=False) as response:
+                if response.status in RETRY_STATUSES:
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    self.health.record_failure(
+                        host,
+                        overloaded=response.status in OVERLOAD_STATUSES,
+                        retry_after=retry_after
+                    )
+                    raise _TransientFailure(f"HTTP {response.status}", response.status, retry_after)
                 
-                # Get content
-                content_type = response.headers.get("Content-Type", "")
-                if "text/html" in content_type:
-                    html_content = await response.text()
-                    soup = BeautifulSoup(html_content, "lxml")
-                    
-                    # Extract metadata
-                    title = soup.find("title")
-                    title_text = title.string if title else ""
-                    
-                    meta_description = soup.find("meta", attrs={"name": "description"})
-                    description = meta_description.get("content", "") if meta_description else ""
-                    
-                    # Convert to markdown
-                    markdown_content = self.html_converter.handle(html_content)
-                    
-                    # Detect language
-                    try:
-                        language = detect(markdown_content[:1000])
-                    except:
-                        language = "unknown"
-                    
-                    # Extract URLs
-                    extracted_urls = self._extract_urls(soup, url)
-                    
+                # Other server errors count against the host but are not retried
+                if response.status >= 500:
+                    self.health.record_failure(host)
+                else:
+                    self.health.record_success(host)
+                
+                if response.status == 304 and cached:
+                    self.logger.debug(f"Not modified, using cached result: {url}")
                     return {
-                        "url": str(response.url),
-                        "status_code": response.status,
-                        "content": markdown_content,
-                        "title": title_text,
-                        "meta_description": description,
-                        "language": language,
-                        "extracted_urls": extracted_urls,
-                        "content_type": content_type,
-                        "success": True
+                        **cached["result"],
+                        "status_code": 304,
+                        "from_cache": True,
+                        "wire_bytes": 0,
+                        "decoded_bytes": 0
                     }
-                else:
-                    # Non-HTML content
-                    text_content = await response.text()
+                
+                if response.status >= 400:
+                    self.logger.error(f"Failed to fetch URL: {url}", status=response.status)
+                    return self._failure(url, f"HTTP {response.status}", response.status)
+                
+                # Skip binary assets before downloading their bodies
+                content_type = response.headers.get("Content-Type", "")
+                if not is_textual_content_type(content_type):
+                    self.logger.info(f"Skipping non-text content: {url}", content_type=content_type)
                     return {
                         "url": str(response.url),
                         "status_code": response.status,
-                        "content": text_content,
-                        "title": "",
-                        "meta_description": "",
-                        "language": "unknown",
-                        "extracted_urls": [],
+                        "content": "",
                         "content_type": content_type,
-                        "success": True
+                        "error": f"Unsupported content type: {content_type}",
+                        "success": False
                     }
-                    
-        except aiohttp.ClientError as e:
+                
+                # Bodies arrive still encoded so their size on the wire can be counted
+                try:
+                    decoder = ContentDecoder(response.headers.get("Content-Encoding"))
+                except UnsupportedEncodingError as e:
+                    self.logger.error(f"Failed to fetch URL: {url}", error=str(e))
+                    return self._failure(url, str(e), response.status)
+                
+                # A body declared larger than the cap is not downloaded at all
+                max_bytes = self.config.extraction.max_content_length
+                length = declared_length(response)
+                if length is not None and length > max_bytes and decoder.content_encoding == "identity":
+                    self.logger.info(f"Skipping content larger than {max_bytes} bytes: {url}", content_length=length)
+                    return self._failure(
+                        str(response.url),
+                        f"Content-Length {length} exceeds the {max_bytes} byte limit",
+                        response.status,
+                        content_type=content_type,
+                        content_length=length,
+                        wire_bytes=0,
+                        decoded_bytes=0
+                    )
+                
+                # Stream the body while holding the request slot
+                body, truncated = await read_text(response, max_bytes, decoder=decoder)
+                final_url = str(response.url)
+                status_code = response.status
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+        
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            # Timeouts suggest an overloaded host; refused connections a dead one
+            timed_out = isinstance(e, asyncio.TimeoutError)
+            self.health.record_failure(host, overloaded=timed_out)
+            raise _TransientFailure(str(e) or ("Request timed out" if timed_out else type(e).__name__))
+        except (aiohttp.ClientError, ContentDecodingError) as e:
             self.logger.error(f"Failed to fetch URL: {url}", error=str(e))
-            return {
-                "url": url,
-                "status_code": 0,
-                "content": "",
-                "error": str(e),
-                "success": False
+            return self._failure(url, str(e))
+        
+        if "text/html" in content_type:
+            # Parse and convert off the event loop
+            parsed = await self._run_cpu(
+                process_html, body, url, self.config.extraction.language_detection
+            )
+        else:
+            # Non-HTML content
+            parsed = {
+                "content": body,
+                "title": "",
+                "meta_description": "",
+                "language": "unknown",
+                "extracted_urls": []
             }
+        
+        result = {
+            "url": final_url,
+            "status_code": status_code,
+            **parsed,
+            "content_type": content_type,
+            "truncated": truncated,
+            **decoder.stats(),
+            "success": True
+        }
+        
+        if self.http_cache:
+            await self.http_cache.put(url, result, etag=etag, last_modified=last_modified)
+        return result
     
     def _extract_urls(self, soup: BeautifulSoup, base_url: str) -> List[str]:
         """Extract URLs from HTML content.
@@ -136,76 +365,118 @@ class WebContentFetcher:
         Returns:
             List of extracted URLs
         """
-        urls = []
+        return extract_links(soup, base_url)
+    
+    async def fetch_url(self, url: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Validate and fetch a single URL.
         
-        # Extract from links
-        for link in soup.find_all("a", href=True):
-            href = link["href"]
-            absolute_url = urljoin(base_url, href)
+        Args:
+            url: URL to fetch
+            timeout: Request timeout in seconds, or None for the configured one
             
-            # Validate URL
-            if validators.url(absolute_url):
-                urls.append(absolute_url)
-        
-        # Extract from navigation elements
-        for nav in soup.find_all(["nav", "aside"]):
-            for link in nav.find_all("a", href=True):
-                href = link["href"]
-                absolute_url = urljoin(base_url, href)
-                if validators.url(absolute_url) and absolute_url not in urls:
-                    urls.append(absolute_url)
-        
-        return urls
+        Returns:
+            Result dictionary for the URL
+        """
+        if not validators.url(url):
+            self.logger.warning(f"Invalid URL: {url}")
+            return {
+                "url": url,
+                "error": "Invalid URL format",
+                "success": False
+            }
+        
+        try:
+            if self.config.crawling.respect_robots_txt:
+                session = await self._get_session()
+                rules = await self.robots.get_rules(url, session)
+                self.scheduler.set_crawl_delay(urlparse(url).netloc, rules.crawl_delay)
+                if not rules.allowed(url):
+                    self.logger.info(f"Skipping URL disallowed by robots.txt: {url}")
+                    return {
+                        "url": url,
+                        "status_code": 0,
+                        "content": "",
+                        "error": "Disallowed by robots.txt",
+                        "robots_disallowed": True,
+                        "success": False
+                    }
+            
+            return await self._fetch_single_url(url, timeout)
+        except Exception as e:
+            return {
+                "url": url,
+                "error": str(e),
+                "success": False
+            }
     
-    async def fetch(self, urls: List[str], timeout: int = 30) -> List[Dict[str, Any]]:
+    async def fetch(self, urls: List[str], timeout: Optional[float] = None) -> List[Dict[str, Any]]:
         """Fetch content from multiple URLs.
         
         Args:
             urls: List of URLs to fetch
-            timeout: Timeout in seconds
+            timeout: Per-request timeout in seconds, or None for the configured one
             
         Returns:
             List of results for each URL
         """
         self.logger.info(f"Fetching {len(urls)} URLs", urls=urls)
         
-        # Update timeout if different from config
-        if timeout != self.config.crawling.timeout_seconds:
-            self.config.crawling.timeout_seconds = timeout
-        
-        # Validate URLs
-        valid_urls = []
-        results = []
-        
-        for url in urls:
-            if validators.url(url):
-                valid_urls.append(url)
-            else:
-                self.logger.warning(f"Invalid URL: {url}")
-                results.append({
-                    "url": url,
-                    "error": "Invalid URL format",
-                    "success": False
-                })
-        
-        # Fetch valid URLs concurrently
-        if valid_urls:
-            tasks = [self._fetch_single_url(url) for url in valid_urls]
-            fetch_results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            for result in fetch_results:
-                if isinstance(result, Exception):
-                    results.append({
-                        "error": str(result),
-                        "success": False
-                    })
-                else:
-                    results.append(result)
+        # Fetch concurrently; fetch_url validates and applies robots.txt
+        results = await asyncio.gather(*[self.fetch_url(url, timeout) for url in urls])
         
-        self.logger.info(f"Fetched {len(results)} URLs successfully")
+        self.logger.info(
+            f"Fetched {len(results)} URLs successfully",
+            wire_bytes=sum(r.get("wire_bytes", 0) for r in results),
+            decoded_bytes=sum(r.get("decoded_bytes", 0) for r in results)
+        )
         return results
     
+    async def iter_fetch(
+        self,
+        urls: Iterable[str],
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Fetch URLs concurrently, yielding each result as it completes.
+        
+        Unlike fetch(), results are yielded in completion order and are not
+        collected. At most twice max_concurrent_requests fetches are
+        scheduled at a time, so memory stays bounded however many URLs are
+        passed and however slowly the caller consumes results.
+        
+        Args:
+            urls: URLs to fetch (any iterable, consumed lazily)
+            timeout: Per-request timeout in seconds, or None for the configured one
+            
+        Yields:
+            Result dictionary for each URL
+        """
+        window = max(1, self.config.crawling.max_concurrent_requests) * 2
+        url_iter = iter(urls)
+        pending = set()
+        
+        try:
+            while True:
+                # Top up the window of scheduled fetches
+                for url in url_iter:
+                    pending.add(asyncio.ensure_future(self.fetch_url(url, timeout)))
+                    if len(pending) >= window:
+                        break
+                if not pending:
+                    return
+                
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+    
     async def close(self) -> None:
-        """Close the session."""
-        if self._session and not self._session.closed:
-            await self._session.close()
\ No newline at end of file
+        """Close an owned connection pool and parsing executor."""
+        if self._owns_pool:
+            await self.pool.close()
+            if self._session and not self._session.closed:
+                await self._session.close()
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
\ No newline at end of file
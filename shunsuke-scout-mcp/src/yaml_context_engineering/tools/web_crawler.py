@@ -0,0 +1,511 @@
+"""Recursive web crawling tool for YAML Context Engineering."""
+
+import asyncio
+import time
+from collections import Counter
+from typing import AsyncIterator, List, Dict, Any, Optional
+from urllib.parse import urlparse
+
+from ..config import Config
+from ..crawling import (
+    CrawlCheckpoint, CrawlFrontier, DuplicateDetector, Fingerprint, FrontierEntry, SeenURLStore
+)
+from ..utils.logging import get_logger
+from ..utils.matching import PatternMatcher
+from .web_content_fetcher import WebContentFetcher
+from .url_discovery_engine import URLDiscoveryEngine
+
+
+class WebCrawler:
+    """Tool for crawling a site starting from one or more seed URLs."""
+    
+    def __init__(
+        self,
+        config: Config,
+        fetcher: WebContentFetcher,
+        url_discovery: URLDiscoveryEngine,
+        workers: Optional[int] = None,
+        seen_store: Optional[SeenURLStore] = None,
+        duplicates: Optional[DuplicateDetector] = None
+    ):
+        """Initialize the web crawler.
+        
+        Args:
+            config: Server configuration
+            fetcher: Fetcher used to download pages
+            url_discovery: Discovery engine used to rank discovered links
+            workers: Number of concurrent crawl workers (defaults to
+                config max_concurrent_requests)
+            seen_store: Optional store of fetched URLs; discovered links
+                fetched by an earlier crawl are not downloaded again
+            duplicates: Optional duplicate detector; pages duplicating an
+                earlier page are flagged and their links are not followed
+        """
+        self.config = config
+        self.fetcher = fetcher
+        self.url_discovery = url_discovery
+        self.workers = workers or config.crawling.max_concurrent_requests
+        self.seen_store = seen_store
+        self.duplicates = duplicates
+        self.logger = get_logger(__name__)
+    
+    def _in_scope(
+        self,
+        url: str,
+        seed_domains: set,
+        same_domain: bool,
+        url_filters: PatternMatcher
+    ) -> bool:
+        """Check whether a discovered URL should be crawled.
+        
+        Args:
+            url: Discovered URL
+            seed_domains: Domains of the seed URLs
+            same_domain: Restrict the crawl to the seed domains
+            url_filters: Compiled patterns a URL must match, if any
+        
+        Returns:
+            True if the URL is in scope
+        """
+        if not url.startswith(("http://", "https://")):
+            return False
+        
+        if same_domain and CrawlFrontier.domain_of(url) not in seed_domains:
+            return False
+        
+        domain_matcher = self.url_discovery.domain_matcher()
+        if domain_matcher and not domain_matcher.matches(url):
+            return False
+        
+        if url_filters and not url_filters.matches(url):
+            return False
+        
+        return True
+    
+    async def _process_entry(
+        self,
+        entry: FrontierEntry,
+        frontier: CrawlFrontier,
+        seed_domains: set,
+        same_domain: bool,
+        url_filters: PatternMatcher,
+        results: asyncio.Queue,
+        checkpoint: Optional[CrawlCheckpoint] = None
+    ) -> None:
+        """Fetch one frontier entry and enqueue the links it contains.
+        
+        Everything between the fetch and handing over the result runs
+        without yielding to the event loop, so a checkpoint never holds a
+        page without the links it added to the frontier.
+        
+        URLs disallowed by robots.txt do not count against the domain
+        budget: they are dropped before claiming budget when the host's
+        rules are already known, and their budget is returned when the
+        fetcher had to load the rules first.
+        """
+        if self.config.crawling.respect_robots_txt:
+            rules = self.fetcher.robots.cached_rules(entry.url)
+            if rules is not None and not rules.allowed(entry.url):
+                frontier.release(entry, "robots")
+                return
+        
+        if not frontier.claim(entry):
+            return
+        
+        result = await self.fetcher.fetch_url(entry.url)
+        if result.get("robots_disallowed"):
+            frontier.release(entry, "robots")
+            return
+        result["depth"] = entry.depth
+        result["parent_url"] = entry.parent_url
+        if result.get("success"):
+            self._follow_links(entry, result, frontier, seed_domains, same_domain, url_filters)
+        
+        frontier.finish(entry)
+        if checkpoint is not None:
+            checkpoint.add_page(result)
+        await results.put(result)
+    
+    def _follow_links(
+        self,
+        entry: FrontierEntry,
+        result: Dict[str, Any],
+        frontier: CrawlFrontier,
+        seed_domains: set,
+        same_domain: bool,
+        url_filters: PatternMatcher
+    ) -> None:
+        """Record a fetched page and add its in-scope links to the frontier."""
+        if self.duplicates is not None:
+            self._flag_duplicate(result)
+        if self.seen_store is not None:
+            self.seen_store.add(entry.url)
+            if result.get("url") and result["url"] != entry.url:
+                self.seen_store.add(result["url"])
+        # A duplicate's links lead into the same mirrored content
+        if entry.depth >= frontier.max_depth or "duplicate_of" in result:
+            return
+        
+        # Fragments never identify a different page
+        links = [link.split("#", 1)[0] for link in result.get("extracted_urls", [])]
+        links = [link for link in links if self._in_scope(link, seed_domains, same_domain, url_filters)]
+        if not links:
+            return
+        
+        self._push_links(frontier, links, entry.depth + 1, parent_url=entry.url)
+    
+    def _push_links(
+        self,
+        frontier: CrawlFrontier,
+        links: List[str],
+        depth: int,
+        parent_url: Optional[str] = None
+    ) -> int:
+        """Rank links in one batch and add them to the frontier.
+        
+        Args:
+            frontier: Crawl frontier
+            links: In-scope URLs to enqueue
+            depth: Link depth of the URLs
+            parent_url: URL of the page the links were found on
+        
+        Returns:
+            Number of URLs enqueued
+        """
+        scores = self.url_discovery.score_urls(links, base_domain=urlparse(parent_url or links[0]).netloc)
+        return sum(
+            frontier.push(link, depth=depth, priority=score, parent_url=parent_url)
+            for link, score in zip(links, scores.tolist())
+        )
+    
+    async def _declared_sitemaps(self, origin: str) -> Optional[List[str]]:
+        """Return the sitemaps a site declares in robots.txt, if any."""
+        if not self.config.crawling.respect_robots_txt:
+            return None
+        session = await self.fetcher._get_session()
+        rules = await self.fetcher.robots.get_rules(f"{origin}/", session)
+        return rules.sitemaps or None
+    
+    async def _seed_from_sitemaps(
+        self,
+        frontier: CrawlFrontier,
+        start_urls: List[str],
+        seed_domains: set,
+        same_domain: bool,
+        url_filters: PatternMatcher,
+        counts: Counter
+    ) -> None:
+        """Add the pages listed in each seed site's sitemaps to the frontier.
+        
+        Listed pages are enqueued at depth 1. Pages fetched since their
+        ``lastmod`` (or within the seen-URL TTL when no ``lastmod`` is
+        given) are skipped; changed pages are refetched. At most one
+        domain budget of pages is taken from each site.
+        """
+        batch_size = 500
+        origins = dict.fromkeys(
+            f"{parsed.scheme}://{parsed.netloc}" for parsed in map(urlparse, start_urls)
+        )
+        
+        for origin in origins:
+            try:
+                sitemap_urls = await self._declared_sitemaps(origin)
+                queued = 0
+                batch: List[str] = []
+                async for page in self.url_discovery.iter_sitemap(origin, sitemap_urls):
+                    counts["listed"] += 1
+                    if not self._in_scope(page.url, seed_domains, same_domain, url_filters):
+                        continue
+                    if self.seen_store is not None and self.seen_store.is_unchanged(page.url, page.lastmod):
+                        counts["unchanged"] += 1
+                        continue
+                    batch.append(page.url)
+                    if len(batch) >= batch_size:
+                        queued += self._push_links(frontier, batch, depth=1)
+                        batch = []
+                        if queued >= frontier.max_pages_per_domain:
+                            break
+                if batch:
+                    queued += self._push_links(frontier, batch, depth=1)
+                counts["queued"] += queued
+            except Exception as e:
+                self.logger.warning(f"Sitemap ingestion failed for {origin}", error=str(e))
+    
+    def _flag_duplicate(self, result: Dict[str, Any]) -> None:
+        """Mark a fetched page that duplicates an earlier page."""
+        fingerprint = result.get("fingerprint")
+        match = self.duplicates.check(
+            result["url"],
+            result.get("content", ""),
+            Fingerprint.from_dict(fingerprint) if fingerprint else None
+        )
+        if match is not None:
+            result["duplicate_of"] = match.url
+            result["duplicate_distance"] = match.distance
+            self.logger.info(f"Duplicate content: {result['url']} duplicates {match.url}",
+                           distance=match.distance)
+    
+    async def _worker(self, frontier: CrawlFrontier, *args) -> None:
+        """Consume entries from the frontier until cancelled."""
+        while True:
+            entry = await frontier.get()
+            try:
+                await self._process_entry(entry, frontier, *args)
+            except Exception as e:
+                self.logger.error(f"Crawl worker failed on {entry.url}", error=str(e))
+            finally:
+                frontier.task_done()
+    
+    def _checkpoint(self, job_id: Optional[str]) -> Optional[CrawlCheckpoint]:
+        """Create the checkpoint of a crawl job, unless checkpoints are disabled."""
+        if self.config.crawling.checkpoint_interval_seconds <= 0:
+            if job_id:
+                self.logger.warning(f"Checkpoints are disabled, not resuming job {job_id}")
+            return None
+        return CrawlCheckpoint(self.config.get_cache_directory() / "checkpoints", job_id)
+    
+    async def iter_crawl(
+        self,
+        start_urls: Optional[List[str]] = None,
+        max_depth: Optional[int] = None,
+        max_pages_per_domain: Optional[int] = None,
+        max_pages: Optional[int] = None,
+        same_domain: bool = True,
+        url_filters: Optional[List[str]] = None,
+        stats: Optional[Dict[str, Any]] = None,
+        use_sitemaps: Optional[bool] = None,
+        job_id: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Crawl recursively from seed URLs, yielding pages as they are fetched.
+        
+        Pages are handed over through a bounded queue, so workers pause
+        when the caller falls behind and no page is kept after it has been
+        yielded.
+        
+        Unless checkpoints are disabled, the frontier and completed pages
+        are saved every ``checkpoint_interval_seconds`` and when the crawl
+        is interrupted. Passing the ``job_id`` of an unfinished crawl
+        resumes it with its original parameters: completed pages are
+        streamed back from the checkpoint and yielded again without being
+        fetched (counted in ``pages_resumed`` only), and the crawl continues from
+        the saved frontier. The checkpoint is deleted when the crawl
+        finishes.
+        
+        Args:
+            start_urls: Seed URLs (depth 1); optional when resuming
+            max_depth: Maximum link depth (defaults to config max_crawl_depth)
+            max_pages_per_domain: Per-domain page budget (defaults to config)
+            max_pages: Optional overall page budget
+            same_domain: Only follow links within the seed domains
+            url_filters: Optional regex patterns discovered URLs must match
+            stats: Optional dictionary updated with crawl statistics (and
+                the seed URLs, under ``start_urls``) when the crawl finishes
+            use_sitemaps: Also crawl the pages listed in the seed sites'
+                sitemaps (defaults to config use_sitemaps)
+            job_id: Crawl job to resume, or an ID for a new job
+        
+        Yields:
+            Fetch result for each crawled page, with depth and parent_url
+        
+        Raises:
+            ValueError: If there are no seed URLs and no job to resume
+        """
+        checkpoint = self._checkpoint(job_id)
+        saved = checkpoint.load() if checkpoint is not None else None
+        if saved is not None:
+            params = saved["params"]
+            self.logger.info(f"Resuming crawl job {checkpoint.job_id}", pages_done=saved["pages_count"])
+        elif start_urls:
+            params = {
+                "start_urls": list(start_urls),
+                "max_depth": max_depth or self.config.crawling.max_crawl_depth,
+                "max_pages_per_domain": max_pages_per_domain or self.config.crawling.max_pages_per_domain,
+                "max_pages": max_pages,
+                "same_domain": same_domain,
+                "url_filters": list(url_filters or []),
+                "use_sitemaps": self.config.crawling.use_sitemaps if use_sitemaps is None else use_sitemaps
+            }
+        else:
+            raise ValueError(f"No start URLs given and no checkpoint to resume for job {job_id}")
+        
+        start_urls = params["start_urls"]
+        same_domain = params["same_domain"]
+        frontier = CrawlFrontier(
+            max_depth=params["max_depth"],
+            max_pages_per_domain=params["max_pages_per_domain"],
+            max_pages=params["max_pages"],
+            seen_store=self.seen_store
+        )
+        seed_domains = {CrawlFrontier.domain_of(url) for url in start_urls}
+        
+        self.logger.info(f"Starting crawl from {len(start_urls)} seed URLs",
+                        max_depth=frontier.max_depth,
+                        max_pages_per_domain=frontier.max_pages_per_domain)
+        
+        if saved is not None:
+            frontier.restore(saved["frontier"])
+        else:
+            for url in start_urls:
+                frontier.push(url, depth=1, priority=1.0)
+        
+        # Compile the filters once for the whole crawl
+        filter_matcher = PatternMatcher(params["url_filters"])
+        worker_count = max(1, self.workers)
+        results: asyncio.Queue = asyncio.Queue(maxsize=worker_count * 2)
+        started = time.monotonic()
+        workers = [
+            asyncio.create_task(
+                self._worker(frontier, seed_domains, same_domain, filter_matcher, results, checkpoint)
+            )
+            for _ in range(worker_count)
+        ]
+        
+        # Sitemaps are read while the seeds are already being fetched
+        sitemap_counts: Counter = Counter()
+        use_sitemaps = params["use_sitemaps"]
+        feeder = None
+        if use_sitemaps and not (saved is not None and saved["sitemaps_done"]):
+            feeder = asyncio.create_task(self._seed_from_sitemaps(
+                frontier, start_urls, seed_domains, same_domain, filter_matcher, sitemap_counts
+            ))
+        
+        async def finish() -> None:
+            # Every result is queued before its entry is marked done, and
+            # no entry is added once the sitemaps have been read
+            if feeder is not None:
+                await feeder
+            await frontier.join()
+            await results.put(None)
+        
+        async def save_checkpoint() -> None:
+            # Captured without yielding, so frontier and pages agree
+            if self.seen_store is not None:
+                self.seen_store.flush()
+            await checkpoint.save({
+                "params": params,
+                "frontier": frontier.snapshot(),
+                "sitemaps_done": feeder is None or (feeder.done() and not feeder.cancelled()),
+                "saved_at": time.time()
+            })
+        
+        async def checkpoint_periodically() -> None:
+            while True:
+                await asyncio.sleep(self.config.crawling.checkpoint_interval_seconds)
+                await save_checkpoint()
+        
+        finisher = asyncio.create_task(finish())
+        checkpointer = asyncio.create_task(checkpoint_periodically()) if checkpoint is not None else None
+        succeeded = failed = duplicates = resumed = max_depth_reached = 0
+        wire_bytes = decoded_bytes = 0
+        completed = False
+        
+        try:
+            # Pages completed before an interruption are streamed back from
+            # the checkpoint and only counted as resumed
+            if saved is not None:
+                for page in checkpoint.iter_pages():
+                    resumed += 1
+                    max_depth_reached = max(max_depth_reached, page["depth"])
+                    yield page
+            
+            while (page := await results.get()) is not None:
+                if page.get("success"):
+                    succeeded += 1
+                    if "duplicate_of" in page:
+                        duplicates += 1
+                else:
+                    failed += 1
+                max_depth_reached = max(max_depth_reached, page["depth"])
+                wire_bytes += page.get("wire_bytes", 0)
+                decoded_bytes += page.get("decoded_bytes", 0)
+                yield page
+            completed = True
+        finally:
+            finisher.cancel()
+            pending = [finisher, *workers]
+            if feeder is not None:
+                feeder.cancel()
+                pending.append(feeder)
+            if checkpointer is not None:
+                checkpointer.cancel()
+                pending.append(checkpointer)
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            if self.seen_store is not None:
+                self.seen_store.flush()
+            if checkpoint is not None:
+                # An interrupted crawl keeps its progress for a later resume
+                if completed:
+                    await checkpoint.delete()
+                else:
+                    await save_checkpoint()
+                    self.logger.info(f"Crawl interrupted, resume with job ID {checkpoint.job_id}")
+        
+        crawl_stats = {
+            **frontier.stats(),
+            "job_id": checkpoint.job_id if checkpoint is not None else None,
+            "pages_fetched": succeeded,
+            "pages_failed": failed,
+            "pages_duplicate": duplicates,
+            "pages_resumed": resumed,
+            "max_depth_reached": max_depth_reached,
+            "wire_bytes": wire_bytes,
+            "decoded_bytes": decoded_bytes,
+            "elapsed_seconds": round(time.monotonic() - started, 3)
+        }
+        if use_sitemaps:
+            crawl_stats["sitemap"] = {key: sitemap_counts[key] for key in ("listed", "unchanged", "queued")}
+        self.logger.info(f"Crawl finished: {succeeded} pages fetched", **crawl_stats)
+        if stats is not None:
+            stats.update(crawl_stats, start_urls=start_urls)
+    
+    async def crawl(
+        self,
+        start_urls: Optional[List[str]] = None,
+        max_depth: Optional[int] = None,
+        max_pages_per_domain: Optional[int] = None,
+        max_pages: Optional[int] = None,
+        same_domain: bool = True,
+        url_filters: Optional[List[str]] = None,
+        use_sitemaps: Optional[bool] = None,
+        job_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Crawl recursively from seed URLs.
+        
+        Args:
+            start_urls: Seed URLs (depth 1); optional when resuming
+            max_depth: Maximum link depth (defaults to config max_crawl_depth)
+            max_pages_per_domain: Per-domain page budget (defaults to config)
+            max_pages: Optional overall page budget
+            same_domain: Only follow links within the seed domains
+            url_filters: Optional regex patterns discovered URLs must match
+            use_sitemaps: Also crawl the pages listed in the seed sites'
+                sitemaps (defaults to config use_sitemaps)
+            job_id: Crawl job to resume, or an ID for a new job
+        
+        Returns:
+            Crawl result with fetched pages and statistics
+        """
+        stats: Dict[str, Any] = {}
+        pages = [
+            page async for page in self.iter_crawl(
+                start_urls,
+                max_depth=max_depth,
+                max_pages_per_domain=max_pages_per_domain,
+                max_pages=max_pages,
+                same_domain=same_domain,
+                url_filters=url_filters,
+                stats=stats,
+                use_sitemaps=use_sitemaps,
+                job_id=job_id
+            )
+        ]
+        
+        return {
+            "job_id": stats["job_id"],
+            "start_urls": stats.pop("start_urls"),
+            "pages": pages,
+            "stats": stats,
+            "success": stats["pages_fetched"] > 0
+        }
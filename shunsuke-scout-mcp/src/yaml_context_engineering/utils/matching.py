@@ -0,0 +1,46 @@
+"""Compiled pattern matching for URL triage."""
+
+import re
+from typing import Iterable, List, Pattern, Tuple
+
+
+# Constructs whose meaning changes when patterns are joined into one regex
+_UNCOMBINABLE = re.compile(r"\\[1-9]|\(\?P=|\(\?[aiLmsux]+\)")
+
+
+class PatternMatcher:
+    """Tests text against a set of regular expressions in one search.
+    
+    ``matches(text)`` is equivalent to
+    ``any(re.search(p, text) for p in patterns)``, but the patterns are
+    compiled once and joined into a single alternation so each text is
+    searched once. Patterns that cannot be combined safely (numbered
+    backreferences, inline global flags, duplicate group names) are kept
+    as separately compiled expressions.
+    """
+    
+    def __init__(self, patterns: Iterable[str]):
+        """Compile the patterns.
+        
+        Args:
+            patterns: Regular expressions (re.search semantics)
+        """
+        self.patterns: Tuple[str, ...] = tuple(patterns)
+        self._compiled: List[Pattern] = []
+        
+        combinable = [p for p in self.patterns if not _UNCOMBINABLE.search(p)]
+        separate = [p for p in self.patterns if _UNCOMBINABLE.search(p)]
+        if combinable:
+            try:
+                self._compiled.append(re.compile("|".join(f"(?:{p})" for p in combinable)))
+            except re.error:
+                separate = list(self.patterns)
+        self._compiled.extend(re.compile(p) for p in separate)
+    
+    def matches(self, text: str) -> bool:
+        """Check whether any pattern matches anywhere in the text."""
+        return any(pattern.search(text) for pattern in self._compiled)
+    
+    def __bool__(self) -> bool:
+        """Whether the matcher has any patterns."""
+        return bool(self.patterns)
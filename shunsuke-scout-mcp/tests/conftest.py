@@ -10,13 +10,15 @@ from yaml_context_engineering.config import Config
 
 
 @pytest.fixture
-def test_config() -> Config:
+def test_config(tmp_path) -> Config:
     """Create test configuration."""
     config = Config()
     config.log_level = "DEBUG"
+    config.output.cache_directory = tmp_path / "cache"
     config.crawling.timeout_seconds = 5
     config.crawling.max_crawl_depth = 2
     config.extraction.context_granularity = "L1_L2"
+    config.extraction.parser_workers = 0
     return config
 
 
@@ -136,4 +138,104 @@ def expected_structure() -> list:
             ],
             "line_number": 17
         }
-    ]
\ No newline at end of file
+    ]
+
+class _FakeStream:
+    """Minimal stand-in for an aiohttp ``StreamReader``."""
+    
+    def __init__(self, data: bytes):
+        self.data = data
+        self.bytes_read = 0
+    
+    async def iter_chunked(self, n: int):
+        while self.bytes_read < len(self.data):
+            chunk = self.data[self.bytes_read:self.bytes_read + n]
+            self.bytes_read += len(chunk)
+            yield chunk
+
+
+class FakeResponse:
+    """Minimal stand-in for an aiohttp response."""
+    
+    def __init__(self, url: str, status: int = 200, headers: dict = None, body=""):
+        self.url = url
+        self.status = status
+        self.headers = headers if headers is not None else {"Content-Type": "text/html"}
+        self.body = body
+        raw = body.encode("utf-8") if isinstance(body, str) else body
+        self.content = _FakeStream(raw)
+    
+    @property
+    def charset(self):
+        content_type = self.headers.get("Content-Type", "")
+        if "charset=" in content_type:
+            return content_type.split("charset=", 1)[1].strip()
+        return None
+    
+    async def text(self) -> str:
+        return self.body
+    
+    def raise_for_status(self) -> None:
+        if self.status >= 400:
+            import aiohttp
+            raise aiohttp.ClientResponseError(None, (), status=self.status, message="error")
+
+
+class FakeSession:
+    """Minimal stand-in for an aiohttp session serving canned responses.
+    
+    Routes map a URL to ``(status, headers, body)`` or to a callable taking
+    the request headers and returning that tuple; unknown URLs return an
+    empty HTML page. Every request is recorded, and the number of requests
+    in flight is tracked per host and globally.
+    """
+    
+    def __init__(self, routes: dict = None, latency: float = 0.0):
+        self.routes = routes or {}
+        self.latency = latency
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.host_in_flight = {}
+        self.max_host_in_flight = {}
+        self.closed = False
+    
+    def get(self, url, **kwargs):
+        session = self
+        
+        class _RequestContext:
+            async def __aenter__(self):
+                import asyncio
+                from urllib.parse import urlparse
+                host = urlparse(url).netloc
+                session.requests.append((url, kwargs))
+                session.in_flight += 1
+                session.max_in_flight = max(session.max_in_flight, session.in_flight)
+                session.host_in_flight[host] = session.host_in_flight.get(host, 0) + 1
+                session.max_host_in_flight[host] = max(
+                    session.max_host_in_flight.get(host, 0), session.host_in_flight[host]
+                )
+                self.host = host
+                if session.latency:
+                    await asyncio.sleep(session.latency)
+                route = session.routes.get(url, (200, None, "<html></html>"))
+                if callable(route):
+                    route = route(kwargs.get("headers") or {})
+                status, headers, body = route
+                return FakeResponse(url, status, headers, body)
+            
+            async def __aexit__(self, *exc):
+                session.in_flight -= 1
+                session.host_in_flight[self.host] -= 1
+                return False
+        
+        return _RequestContext()
+    
+    async def close(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture
+def fake_session() -> FakeSession:
+    """Create a fake HTTP session."""
+    return FakeSession()
@@ -99,6 +99,20 @@ class TestConfig:
         with pytest.raises(ValueError, match="max_crawl_depth must be between"):
             config.validate()
     
+    def test_config_validation_invalid_concurrency(self):
+        """Test configuration validation with invalid concurrency limits."""
+        config = Config()
+        config.crawling.max_concurrent_requests = 0
+        
+        with pytest.raises(ValueError, match="max_concurrent_requests must be at least"):
+            config.validate()
+        
+        config = Config()
+        config.crawling.max_concurrent_per_host = 0
+        
+        with pytest.raises(ValueError, match="max_concurrent_per_host must be at least"):
+            config.validate()
+    
     def test_config_validation_invalid_crawl_delay(self):
         """Test configuration validation with invalid crawl delay."""
         config = Config()
@@ -106,6 +120,31 @@ class TestConfig:
         
         with pytest.raises(ValueError, match="crawl_delay_seconds must be at least"):
             config.validate()
+    
+    def test_config_validation_invalid_retry_settings(self):
+        """Test validation of retry and circuit breaker settings."""
+        config = Config()
+        config.crawling.max_retries = -1
+        with pytest.raises(ValueError, match="max_retries must not be negative"):
+            config.validate()
+        
+        config = Config()
+        config.crawling.circuit_failure_threshold = 0
+        with pytest.raises(ValueError, match="circuit_failure_threshold must be at least"):
+            config.validate()
+    
+    def test_url_score_weights_from_env(self, monkeypatch):
+        """Test URL score weights loaded from the environment and validated."""
+        monkeypatch.setenv("MCP_URL_SCORE_WEIGHTS", '{"path_depth": -0.05, "anchor_keyword": 0.1}')
+        
+        config = Config.from_env()
+        
+        assert config.crawling.url_score_weights == {"path_depth": -0.05, "anchor_keyword": 0.1}
+        config.validate()
+        
+        config.crawling.url_score_weights = {"path_depth": "high"}
+        with pytest.raises(ValueError, match="url_score_weights"):
+            config.validate()
 
 
 class TestCrawlingConfig:
@@ -121,6 +160,12 @@ class TestCrawlingConfig:
         assert config.max_pages_per_domain == 100
         assert config.timeout_seconds == 30
         assert config.user_agent == "YAML-Context-Engineering-Agent/1.0"
+        assert config.max_concurrent_requests == 10
+        assert config.max_concurrent_per_host == 4
+        assert config.dns_cache_ttl_seconds == 300
+        assert config.keepalive_timeout_seconds == 30.0
+        assert config.persist_seen_urls is True
+        assert config.seen_urls_ttl_seconds == 86400
 
 
 class TestExtractionConfig:
@@ -135,6 +180,9 @@ class TestExtractionConfig:
         assert config.language_detection is True
         assert config.extract_metadata is True
         assert config.max_content_length == 100000
+        assert config.parser_workers is None
+        assert config.deduplicate_content is True
+        assert config.near_duplicate_threshold == 3
 
 
 class TestOutputConfig:
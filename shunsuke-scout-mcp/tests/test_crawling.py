@@ -0,0 +1,981 @@
+"""Tests for crawling infrastructure."""
+
+import pytest
+import asyncio
+import gzip
+import json
+import random
+import tracemalloc
+import zlib
+
+from yaml_context_engineering.crawling import (
+    CrawlFrontier, HostScheduler, RobotsCache, HTTPCache, ConnectionPool,
+    SeenURLStore, canonicalize_url, DuplicateDetector, Fingerprint,
+    SitemapParser, SitemapReader, HostHealth, CircuitOpenError, CrawlCheckpoint
+)
+from yaml_context_engineering.crawling.compression import (
+    ContentDecoder, ContentDecodingError, UnsupportedEncodingError, _SlicedStage, accept_encoding
+)
+from yaml_context_engineering.crawling.host_health import parse_retry_after, retry_delay
+from yaml_context_engineering.crawling.parsing import process_html
+from yaml_context_engineering.crawling.ranking import FEATURES, URLRankingModel
+from yaml_context_engineering.crawling.sitemap import parse_lastmod
+from yaml_context_engineering.crawling.streaming import is_textual_content_type, read_text
+from yaml_context_engineering.crawling.url_scanner import scan_urls
+
+
+class TestCrawlFrontier:
+    """Test cases for CrawlFrontier."""
+    
+    @pytest.mark.asyncio
+    async def test_priority_order(self):
+        """Test that higher priority URLs are served first."""
+        frontier = CrawlFrontier(max_depth=3, max_pages_per_domain=10)
+        frontier.push("https://example.com/blog", depth=2, priority=0.2)
+        frontier.push("https://example.com/docs", depth=2, priority=0.9)
+        frontier.push("https://example.com/guide", depth=2, priority=0.5)
+        
+        order = [(await frontier.get()).url for _ in range(3)]
+        assert order == [
+            "https://example.com/docs",
+            "https://example.com/guide",
+            "https://example.com/blog"
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_depth_limit_and_dedup(self):
+        """Test depth limits and duplicate suppression."""
+        frontier = CrawlFrontier(max_depth=2, max_pages_per_domain=10)
+        
+        assert frontier.push("https://example.com/a", depth=1) is True
+        assert frontier.push("https://example.com/a", depth=2) is False
+        assert frontier.push("https://example.com/b", depth=3) is False
+        assert len(frontier) == 1
+        assert frontier.stats()["skipped"] == {"seen": 1, "depth": 1}
+    
+    @pytest.mark.asyncio
+    async def test_domain_budget(self):
+        """Test per-domain page budgets are charged on claim."""
+        frontier = CrawlFrontier(max_depth=3, max_pages_per_domain=2)
+        for i in range(3):
+            frontier.push(f"https://example.com/{i}", depth=1)
+        frontier.push("https://other.com/", depth=1)
+        
+        claimed = []
+        for _ in range(4):
+            entry = await frontier.get()
+            if frontier.claim(entry):
+                claimed.append(entry.url)
+        
+        assert len([url for url in claimed if "example.com" in url]) == 2
+        assert "https://other.com/" in claimed
+        assert frontier.pages_per_domain["example.com"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_release_returns_budget(self):
+        """Test a released entry gives its budget back to the domain."""
+        frontier = CrawlFrontier(max_depth=3, max_pages_per_domain=1, max_pages=1)
+        frontier.push("https://example.com/private", depth=1)
+        frontier.push("https://example.com/public", depth=1)
+        
+        entry = await frontier.get()
+        assert frontier.claim(entry)
+        frontier.release(entry, "robots")
+        
+        assert frontier.claim(await frontier.get())
+        assert frontier.pages_per_domain["example.com"] == 1
+        assert frontier.stats()["skipped"] == {"robots": 1}
+    
+    @pytest.mark.asyncio
+    async def test_global_page_budget(self):
+        """Test overall page budget."""
+        frontier = CrawlFrontier(max_depth=3, max_pages_per_domain=10, max_pages=1)
+        frontier.push("https://a.com/", depth=1)
+        frontier.push("https://b.com/", depth=1)
+        
+        results = [frontier.claim(await frontier.get()) for _ in range(2)]
+        assert results.count(True) == 1
+
+    
+    @pytest.mark.asyncio
+    async def test_snapshot_and_restore(self):
+        """Test that a restored frontier refetches unfinished entries only."""
+        frontier = CrawlFrontier(max_depth=3, max_pages_per_domain=2)
+        for path, priority in (("a", 0.9), ("b", 0.5), ("c", 0.1)):
+            frontier.push(f"https://example.com/{path}", depth=1, priority=priority)
+        done = await frontier.get()
+        frontier.claim(done)
+        frontier.finish(done)
+        in_flight = await frontier.get()
+        frontier.claim(in_flight)
+        
+        restored = CrawlFrontier(max_depth=3, max_pages_per_domain=2)
+        restored.restore(json.loads(json.dumps(frontier.snapshot())))
+        
+        # The unfinished entry is queued again and its budget released
+        assert restored.pages_per_domain["example.com"] == 1
+        assert restored.pages_dispatched == 1
+        assert (await restored.get()).url == "https://example.com/b"
+        assert len(restored) == 1
+        assert not restored.push("https://example.com/a", depth=1)
+
+class TestHostScheduler:
+    """Test cases for HostScheduler."""
+    
+    @pytest.mark.asyncio
+    async def test_spaces_requests_to_same_host(self):
+        """Test that requests to one host are spaced by the delay."""
+        scheduler = HostScheduler(default_delay=0.05)
+        
+        waits = [await scheduler.wait("example.com") for _ in range(3)]
+        
+        assert waits[0] == 0
+        assert all(0.03 <= w <= 0.06 for w in waits[1:])
+    
+    @pytest.mark.asyncio
+    async def test_hosts_are_independent(self):
+        """Test that concurrent waits on different hosts do not add up."""
+        scheduler = HostScheduler(default_delay=0.05)
+        loop = asyncio.get_running_loop()
+        
+        started = loop.time()
+        await asyncio.gather(*[
+            scheduler.wait(host)
+            for host in ["a.com", "b.com", "c.com"] * 2
+        ])
+        
+        assert loop.time() - started < 0.09
+    
+    def test_crawl_delay_overrides_default(self):
+        """Test host-specific crawl delays."""
+        scheduler = HostScheduler(default_delay=1.0)
+        scheduler.set_crawl_delay("Slow.example.com", 5)
+        
+        assert scheduler.delay_for("slow.example.com") == 5
+        assert scheduler.delay_for("other.com") == 1.0
+        
+        # Crawl-delay never shortens the configured delay
+        scheduler.set_crawl_delay("fast.example.com", 0.1)
+        assert scheduler.delay_for("fast.example.com") == 1.0
+        
+        scheduler.set_crawl_delay("slow.example.com", None)
+        assert scheduler.delay_for("slow.example.com") == 1.0
+
+
+class TestRobotsCache:
+    """Test cases for RobotsCache."""
+    
+    ROBOTS = "User-agent: *\nDisallow: /admin\n\nUser-agent: BadBot\nDisallow: /\n"
+    
+    @pytest.fixture
+    def robots_session(self, fake_session):
+        """Create a session serving a robots.txt file."""
+        fake_session.routes["https://example.com/robots.txt"] = (200, {}, self.ROBOTS)
+        return fake_session
+    
+    @pytest.mark.asyncio
+    async def test_rules_applied(self, robots_session):
+        """Test allow and disallow decisions."""
+        cache = RobotsCache(user_agent="YAML-Context-Engineering-Agent/1.0")
+        
+        assert await cache.is_allowed("https://example.com/docs", robots_session) is True
+        assert await cache.is_allowed("https://example.com/admin/users", robots_session) is False
+    
+    @pytest.mark.asyncio
+    async def test_fetched_once_for_concurrent_requests(self, robots_session):
+        """Test that robots.txt is downloaded once per origin."""
+        robots_session.latency = 0.01
+        cache = RobotsCache(user_agent="TestAgent")
+        
+        await asyncio.gather(*[
+            cache.is_allowed(f"https://example.com/page{i}", robots_session)
+            for i in range(10)
+        ])
+        
+        assert len(robots_session.requests) == 1
+    
+    @pytest.mark.asyncio
+    async def test_disk_cache_shared_between_instances(self, robots_session, tmp_path):
+        """Test that persisted rules are reused until the TTL expires."""
+        first = RobotsCache(user_agent="TestAgent", cache_dir=tmp_path)
+        await first.is_allowed("https://example.com/", robots_session)
+        
+        second = RobotsCache(user_agent="TestAgent", cache_dir=tmp_path)
+        assert await second.is_allowed("https://example.com/admin", robots_session) is False
+        assert len(robots_session.requests) == 1
+        
+        expired = RobotsCache(user_agent="TestAgent", cache_dir=tmp_path, ttl_seconds=0)
+        await expired.is_allowed("https://example.com/", robots_session)
+        assert len(robots_session.requests) == 2
+    
+    @pytest.mark.asyncio
+    async def test_status_handling(self, fake_session):
+        """Test RFC 9309 handling of error statuses."""
+        fake_session.routes["https://missing.com/robots.txt"] = (404, {}, "")
+        fake_session.routes["https://broken.com/robots.txt"] = (503, {}, "")
+        cache = RobotsCache(user_agent="TestAgent")
+        
+        assert await cache.is_allowed("https://missing.com/page", fake_session) is True
+        assert await cache.is_allowed("https://broken.com/page", fake_session) is False
+
+
+class TestHTTPCache:
+    """Test cases for HTTPCache."""
+    
+    @pytest.mark.asyncio
+    async def test_round_trip(self, tmp_path):
+        """Test storing and loading an entry."""
+        cache = HTTPCache(tmp_path)
+        result = {"url": "https://example.com/", "content": "# Hello", "success": True}
+        
+        await cache.put("https://example.com/", result, etag='"abc"',
+                        last_modified="Wed, 21 Oct 2015 07:28:00 GMT")
+        entry = await cache.get("https://example.com/")
+        
+        assert entry["result"] == result
+        assert HTTPCache.conditional_headers(entry) == {
+            "If-None-Match": '"abc"',
+            "If-Modified-Since": "Wed, 21 Oct 2015 07:28:00 GMT"
+        }
+    
+    @pytest.mark.asyncio
+    async def test_skips_results_without_validators(self, tmp_path):
+        """Test that unvalidatable responses are not cached."""
+        cache = HTTPCache(tmp_path)
+        await cache.put("https://example.com/", {"content": "x"})
+        
+        assert await cache.get("https://example.com/") is None
+        assert HTTPCache.conditional_headers(None) == {}
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_writes_of_one_entry(self, tmp_path):
+        """Test concurrent writers of an entry never share a temporary file."""
+        cache = HTTPCache(tmp_path)
+        results = [{"content": str(i) * 10000} for i in range(10)]
+        
+        await asyncio.gather(*(
+            cache.put("https://example.com/", result, etag=f'"{i}"') for i, result in enumerate(results)
+        ))
+        entry = await cache.get("https://example.com/")
+        
+        assert entry["result"] == results[int(entry["etag"].strip('"'))]
+        assert not list(tmp_path.rglob("*.tmp"))
+    
+    @pytest.mark.asyncio
+    async def test_write_errors_are_not_raised(self, tmp_path):
+        """Test a cache that cannot be written only logs the failure."""
+        blocker = tmp_path / "cache"
+        blocker.write_text("not a directory")
+        cache = HTTPCache(blocker)
+        
+        await cache.put("https://example.com/", {"content": "x"}, etag='"abc"')
+        assert await cache.get("https://example.com/") is None
+
+
+class TestProcessHTML:
+    """Test cases for single-pass HTML processing."""
+    
+    def test_metadata_links_and_markdown(self, sample_html_content):
+        """Test that one pass yields title, description, links and Markdown."""
+        result = process_html(sample_html_content, "https://example.com/docs/", language_detection=False)
+        
+        assert result["title"] == "Test Page"
+        assert result["meta_description"] == "This is a test page"
+        assert "# Main Title" in result["content"]
+        assert "## Section 1" in result["content"]
+        assert result["extracted_urls"] == [
+            "https://example.com/page1",
+            "https://example.com/page2",
+            "https://example.com"
+        ]
+        assert result["language"] == "unknown"
+    
+    def test_links_deduplicated_and_filtered(self):
+        """Test link deduplication and non-HTTP scheme filtering."""
+        html = """
+        <html><head><title>First</title></head><body>
+        <nav><a href="/a">A</a></nav>
+        <p><a href="/a">A again</a> <a href="mailto:x@example.com">Mail</a>
+        <a href="javascript:void(0)">JS</a> <a href="b">B</a></p>
+        <svg><title>Icon</title></svg>
+        </body></html>
+        """
+        result = process_html(html, "https://example.com/dir/page", language_detection=False)
+        
+        assert result["title"] == "First"
+        assert result["extracted_urls"] == [
+            "https://example.com/a",
+            "https://example.com/dir/b"
+        ]
+
+
+class TestStreaming:
+    """Test cases for bounded body reads."""
+    
+    def test_textual_content_types(self):
+        """Test which content types are downloaded."""
+        assert is_textual_content_type("text/html; charset=utf-8")
+        assert is_textual_content_type("application/atom+xml")
+        assert is_textual_content_type("")
+        assert not is_textual_content_type("application/pdf")
+        assert not is_textual_content_type("image/png")
+    
+    @pytest.mark.asyncio
+    async def test_read_text_stops_at_cap(self, fake_session):
+        """Test that reading stops once the byte budget is spent."""
+        fake_session.routes["https://example.com/"] = (200, None, "a" * 10000)
+        
+        async with fake_session.get("https://example.com/") as response:
+            text, truncated = await read_text(response, max_bytes=100, chunk_size=64)
+        
+        assert text == "a" * 100
+        assert truncated is True
+        assert response.content.bytes_read == 128
+    
+    @pytest.mark.asyncio
+    async def test_read_text_decodes_split_characters(self, fake_session):
+        """Test that multi-byte characters split across chunks decode."""
+        body = "日本語のテキスト" * 10
+        fake_session.routes["https://example.com/"] = (
+            200, {"Content-Type": "text/plain; charset=utf-8"}, body
+        )
+        
+        async with fake_session.get("https://example.com/") as response:
+            text, truncated = await read_text(response, max_bytes=10000, chunk_size=5)
+        
+        assert text == body
+        assert truncated is False
+    
+    @pytest.mark.asyncio
+    async def test_read_text_decodes_content_encoding(self, fake_session):
+        """Test that the byte cap applies to the decompressed body."""
+        body = ("x" * 5000).encode()
+        fake_session.routes["https://example.com/"] = (
+            200, {"Content-Type": "text/plain", "Content-Encoding": "gzip"}, gzip.compress(body)
+        )
+        decoder = ContentDecoder("gzip")
+        
+        async with fake_session.get("https://example.com/") as response:
+            text, truncated = await read_text(response, max_bytes=1000, chunk_size=16, decoder=decoder)
+        
+        assert text == "x" * 1000
+        assert truncated
+        assert decoder.decoded_bytes >= 1000
+        assert decoder.wire_bytes < len(body)
+    
+    @pytest.mark.asyncio
+    async def test_read_text_bounds_decompression_bomb(self, fake_session):
+        """Test a tiny gzip body cannot inflate past the byte cap."""
+        bomb = gzip.compress(b"\0" * (64 * 1024 * 1024))
+        fake_session.routes["https://example.com/"] = (
+            200, {"Content-Type": "text/plain", "Content-Encoding": "gzip"}, bomb
+        )
+        decoder = ContentDecoder("gzip")
+        
+        tracemalloc.start()
+        try:
+            async with fake_session.get("https://example.com/") as response:
+                text, truncated = await read_text(response, max_bytes=1000, decoder=decoder)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        
+        assert len(text) == 1000
+        assert truncated
+        assert decoder.decoded_bytes <= 1001
+        assert peak < 4 * len(bomb) + 1024 * 1024
+
+
+class TestContentDecoder:
+    """Test cases for ContentDecoder."""
+    
+    def _decode_in_chunks(self, decoder, data, size=7):
+        parts = [decoder.decode(data[i:i + size]) for i in range(0, len(data), size)]
+        return b"".join(parts) + decoder.flush()
+    
+    def test_gzip_and_deflate(self):
+        """Test gzip, zlib-wrapped deflate and raw deflate bodies."""
+        body = b"<html>" + b"hello world " * 100 + b"</html>"
+        raw = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+        encoded = {
+            "gzip": gzip.compress(body),
+            "deflate": zlib.compress(body),
+            "x-gzip": gzip.compress(body)
+        }
+        for coding, data in encoded.items():
+            decoder = ContentDecoder(coding)
+            assert self._decode_in_chunks(decoder, data) == body
+            assert decoder.wire_bytes == len(data)
+            assert decoder.decoded_bytes == len(body)
+        
+        assert self._decode_in_chunks(ContentDecoder("deflate"), raw.compress(body) + raw.flush()) == body
+    
+    def test_sliced_stage_bounds_output(self):
+        """Test decoders without an output limit are fed slices up to the budget."""
+        body = b"\0" * 1_000_000
+        stage = _SlicedStage(zlib.decompressobj().decompress)
+        
+        first = stage.decompress(zlib.compress(body), 1000)
+        assert 1000 <= len(first) < 100_000
+        parts = [first]
+        while part := stage.flush(1000):
+            parts.append(part)
+        assert b"".join(parts) == body
+    
+    def test_max_length_holds_back_input(self):
+        """Test bounded decoding returns the rest on later calls."""
+        body = b"abcdefghij" * 1000
+        decoder = ContentDecoder("gzip")
+        
+        parts = [decoder.decode(gzip.compress(body), 100)]
+        assert len(parts[0]) == 100
+        while True:
+            part = decoder.flush(100)
+            assert len(part) <= 100
+            if not part:
+                break
+            parts.append(part)
+        assert b"".join(parts) == body
+        assert decoder.decoded_bytes == len(body)
+    
+    def test_identity_and_stacked_codings(self):
+        """Test pass-through bodies and codings applied in sequence."""
+        body = b"plain text"
+        decoder = ContentDecoder(None)
+        assert decoder.decode(body) == body
+        assert decoder.stats() == {"content_encoding": "identity", "wire_bytes": 10, "decoded_bytes": 10}
+        
+        stacked = zlib.compress(gzip.compress(body))
+        assert self._decode_in_chunks(ContentDecoder("gzip, deflate"), stacked) == body
+    
+    def test_unsupported_and_corrupt(self):
+        """Test errors for unknown codings and corrupt bodies."""
+        with pytest.raises(UnsupportedEncodingError):
+            ContentDecoder("compress")
+        with pytest.raises(ContentDecodingError):
+            ContentDecoder("gzip").decode(b"not gzip at all")
+    
+    def test_accept_encoding(self):
+        """Test the advertised codings."""
+        assert accept_encoding().endswith("gzip, deflate")
+        assert accept_encoding(enabled=False) == "identity"
+    
+    def test_optional_codings(self):
+        """Test brotli and zstd bodies when their libraries are installed."""
+        body = b"compressible " * 100
+        if "br" in accept_encoding():
+            brotli = pytest.importorskip("brotli")
+            assert self._decode_in_chunks(ContentDecoder("br"), brotli.compress(body)) == body
+        if "zstd" in accept_encoding():
+            zstandard = pytest.importorskip("zstandard")
+            assert self._decode_in_chunks(ContentDecoder("zstd"), zstandard.ZstdCompressor().compress(body)) == body
+
+
+class TestConnectionPool:
+    """Test cases for the shared connection pool."""
+    
+    @pytest.mark.asyncio
+    async def test_session_reused_until_closed(self, test_config):
+        """Test that one keep-alive session serves every request."""
+        pool = ConnectionPool(test_config.crawling)
+        
+        session = await pool.session()
+        assert await pool.session() is session
+        
+        connector = session.connector
+        assert connector.limit == test_config.crawling.max_concurrent_requests
+        assert connector.limit_per_host == test_config.crawling.max_concurrent_per_host
+        assert connector._keepalive_timeout == test_config.crawling.keepalive_timeout_seconds
+        
+        await pool.close()
+        assert pool.closed
+        assert await pool.session() is not session
+        await pool.close()
+    
+    def test_request_timeout(self, test_config):
+        """Test per-request timeouts with the configured default."""
+        pool = ConnectionPool(test_config.crawling)
+        
+        assert pool.request_timeout().total == test_config.crawling.timeout_seconds
+        assert pool.request_timeout(60).total == 60
+
+
+class TestCanonicalizeURL:
+    """Test cases for URL canonicalization."""
+    
+    def test_variants_collapse(self):
+        """Test that URL variants of one page share a canonical form."""
+        variants = [
+            "https://example.com/docs",
+            "https://example.com/docs/",
+            "HTTPS://Example.COM:443/docs#intro",
+            "https://example.com/docs/index.html",
+            "https://example.com/docs?utm_source=feed&utm_medium=rss",
+        ]
+        
+        assert {canonicalize_url(url) for url in variants} == {"https://example.com/docs"}
+    
+    def test_meaningful_parts_kept(self):
+        """Test that path case, ports and real query parameters are kept."""
+        assert canonicalize_url("https://example.com/Docs") == "https://example.com/Docs"
+        assert canonicalize_url("http://example.com:8080/") == "http://example.com:8080/"
+        assert canonicalize_url("https://example.com/s?b=2&a=1&gclid=x") == "https://example.com/s?a=1&b=2"
+        assert canonicalize_url("mailto:user@example.com") == "mailto:user@example.com"
+
+
+class TestSeenURLStore:
+    """Test cases for the persistent seen-URL store."""
+    
+    def test_persists_across_instances(self, tmp_path):
+        """Test that fetched URLs survive a reopen."""
+        path = tmp_path / "seen.sqlite3"
+        store = SeenURLStore(path)
+        store.add("https://example.com/docs/")
+        store.close()
+        
+        reopened = SeenURLStore(path)
+        assert "https://example.com/docs#top" in reopened
+        assert "https://example.com/other" not in reopened
+        reopened.close()
+    
+    def test_ttl_expiry(self):
+        """Test that URLs older than the TTL count as unseen."""
+        store = SeenURLStore(ttl_seconds=60)
+        store.add("https://example.com/old", fetched_at=0)
+        store.add("https://example.com/new")
+        
+        assert "https://example.com/old" not in store
+        assert "https://example.com/new" in store
+    
+    def test_frontier_skips_previously_fetched(self):
+        """Test that the frontier admits seeds but skips fetched links."""
+        store = SeenURLStore()
+        store.add("https://example.com/")
+        store.add("https://example.com/docs")
+        frontier = CrawlFrontier(max_depth=3, max_pages_per_domain=10, seen_store=store)
+        
+        assert frontier.push("https://example.com/", depth=1) is True
+        assert frontier.push("https://example.com/docs/", depth=2) is False
+        assert frontier.push("https://example.com/blog", depth=2) is True
+        assert frontier.skipped["fetched"] == 1
+    
+    def test_unchanged_since_lastmod(self):
+        """Test that lastmod overrides the TTL when deciding on a refetch."""
+        store = SeenURLStore(ttl_seconds=60)
+        store.add("https://example.com/stable", fetched_at=1000)
+        store.add("https://example.com/edited", fetched_at=1000)
+        
+        assert store.is_unchanged("https://example.com/stable", lastmod=900) is True
+        assert store.is_unchanged("https://example.com/edited", lastmod=2000) is False
+        assert store.is_unchanged("https://example.com/stable", lastmod=None) is False  # TTL expired
+        assert store.is_unchanged("https://example.com/unknown", lastmod=900) is False
+
+
+class TestDuplicateDetector:
+    """Test cases for content fingerprinting."""
+    
+    WORDS = (
+        "the client sends a request and the server returns a response with headers "
+        "body status retry timeout cache token session pool worker queue page link"
+    ).split()
+    TEXT = " ".join(map(random.Random(42).choice, [WORDS] * 300))
+    
+    def test_exact_duplicate_ignores_formatting(self):
+        """Test that whitespace and case changes are exact duplicates."""
+        detector = DuplicateDetector()
+        
+        assert detector.check("https://example.com/v1/page", self.TEXT) is None
+        match = detector.check("https://example.com/v2/page", "  " + self.TEXT.upper())
+        
+        assert match.url == "https://example.com/v1/page"
+        assert match.exact is True
+    
+    def test_near_duplicate(self):
+        """Test that a small edit is detected as a near duplicate."""
+        detector = DuplicateDetector(threshold=3)
+        words = self.TEXT.split()
+        words[150] = "changed"
+        edited = " ".join(words)
+        
+        detector.check("https://example.com/page", self.TEXT)
+        match = detector.check("https://example.com/print/page", edited)
+        
+        assert match is not None
+        assert match.exact is False
+        assert match.distance <= 3
+    
+    def test_unrelated_and_same_url(self):
+        """Test that unrelated pages and rechecks of one URL are unique."""
+        detector = DuplicateDetector()
+        other = " ".join(f"Chapter {i} lists the supported database drivers." for i in range(20))
+        
+        detector.check("https://example.com/page", self.TEXT)
+        
+        assert detector.check("https://example.com/other", other) is None
+        assert detector.check("https://example.com/page/", self.TEXT) is None
+        assert len(detector) == 2
+    
+    def test_refetched_page_replaces_fingerprint(self):
+        """Test a URL added again is compared by its new content only."""
+        detector = DuplicateDetector(threshold=3)
+        vocabulary = "install configure database driver schema migration index backup replica shard".split()
+        other = " ".join(map(random.Random(7).choice, [vocabulary] * 300))
+        words = other.split()
+        words[150] = "changed"
+        
+        detector.check("https://example.com/page", self.TEXT)
+        detector.add("https://example.com/page/", Fingerprint.of(other))
+        
+        assert detector.check("https://example.com/copy", self.TEXT) is None
+        match = detector.check("https://example.com/print", " ".join(words))
+        assert match.url == "https://example.com/page/"
+        assert match.exact is False
+        assert len(detector) == 2
+    
+    def test_fingerprint_round_trip(self):
+        """Test fingerprint serialization."""
+        fingerprint = Fingerprint.of(self.TEXT)
+        
+        assert Fingerprint.from_dict(fingerprint.to_dict()) == fingerprint
+
+
+class TestURLScanner:
+    """Test cases for the single-pass URL scanner."""
+    
+    def test_all_link_forms(self):
+        """Test Markdown links, anchors, bare URLs and plain domains."""
+        text = """
+        See the [guide](https://example.com/guide "Guide") and [setup](/docs/setup).
+        <a href="https://api.example.com/v1">API</a>, <A HREF='/blog'>blog</A>
+        Mirrors: https://mirror.example.org/files/. Or visit www.python.org/downloads
+        """
+        
+        urls = list(scan_urls(text, "https://example.com/docs/"))
+        
+        assert urls == [
+            "https://example.com/guide",
+            "https://example.com/docs/setup",
+            "https://api.example.com/v1",
+            "https://example.com/blog",
+            "https://mirror.example.org/files/",
+            "https://www.python.org/downloads"
+        ]
+    
+    def test_rejects_file_names_and_versions(self):
+        """Test that dotted non-domain tokens are not reported."""
+        text = "Edit setup.py and config.yaml, upgrade to 1.2.3, mail me@example.com, see [top](#top)."
+        
+        assert list(scan_urls(text, "https://example.com/")) == []
+    
+    def test_url_in_markdown_link_matched_once(self):
+        """Test that link syntax and punctuation do not create URL variants."""
+        text = "[Docs](https://example.com/docs). Also https://example.com/api, and (https://example.com/x)."
+        
+        assert list(scan_urls(text)) == [
+            "https://example.com/docs",
+            "https://example.com/api",
+            "https://example.com/x"
+        ]
+
+
+class TestURLRankingModel:
+    """Test cases for URLRankingModel."""
+    
+    def test_feature_matrix(self):
+        """Test that features are extracted column by column."""
+        model = URLRankingModel()
+        urls = ["https://example.com/docs/api/v1", "https://blog.example.com/news?page=2", "https://other.org/"]
+        
+        features = model.features(
+            urls,
+            contexts=["This is required reading", "", ""],
+            anchors=["API reference", "", ""],
+            base_domain="example.com"
+        )
+        
+        assert features.shape == (3, len(FEATURES))
+        row = dict(zip(FEATURES, features[0]))
+        assert row["keyword_high"] == 2  # "docs" and "api"
+        assert row["context_keyword"] == 1
+        assert row["doc_path"] == 1
+        assert row["path_depth"] == 3
+        assert row["relation_internal"] == 1
+        assert row["anchor_keyword"] == 1
+        row = dict(zip(FEATURES, features[1]))
+        assert row["keyword_low"] == 2  # "blog" and "news"
+        assert row["penalty_pattern"] == 1
+        assert row["relation_subdomain"] == 1
+        row = dict(zip(FEATURES, features[2]))
+        assert row["path_depth"] == 0
+        assert row["relation_external"] == 1
+    
+    def test_configured_weights(self):
+        """Test that configured weights override the defaults."""
+        urls = ["https://other.org/a", "https://other.org/a/b/c"]
+        
+        default_scores = URLRankingModel().score(URLRankingModel().features(urls))
+        model = URLRankingModel({"path_depth": -0.1})
+        scores = model.score(model.features(urls))
+        
+        assert default_scores.tolist() == [0.5, 0.5]
+        assert scores.tolist() == pytest.approx([0.4, 0.2])
+        assert model.score(model.features([])).shape == (0,)
+        
+        with pytest.raises(ValueError, match="Unknown URL score feature"):
+            URLRankingModel({"popularity": 1.0})
+
+
+SITEMAP_INDEX = """<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://example.com/sitemap-docs.xml.gz</loc></sitemap>
+  <sitemap><loc>https://example.com/sitemap-blog.xml</loc></sitemap>
+</sitemapindex>"""
+
+SITEMAP_DOCS = """<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://example.com/docs/</loc><lastmod>2024-05-01</lastmod></url>
+  <url><loc> https://example.com/docs/api </loc><lastmod>2024-05-01T12:00:00+09:00</lastmod></url>
+  <url><loc>https://example.com/docs/guide</loc></url>
+</urlset>"""
+
+SITEMAP_BLOG = """<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://example.com/blog/post</loc><lastmod>2024-01-01T00:00:00Z</lastmod></url>
+</urlset>"""
+
+
+class TestSitemap:
+    """Test cases for sitemap parsing and reading."""
+    
+    def test_parse_lastmod(self):
+        """Test W3C datetime parsing."""
+        assert parse_lastmod("2024-01-01T00:00:00Z") == 1704067200
+        assert parse_lastmod("2024-01-01") == 1704067200
+        assert parse_lastmod("2024-01-01T09:00:00+09:00") == 1704067200
+        assert parse_lastmod("yesterday") is None
+        assert parse_lastmod(None) is None
+    
+    def test_incremental_gzip_parsing(self):
+        """Test that entries are reported as compressed chunks arrive."""
+        data = gzip.compress(SITEMAP_DOCS.encode("utf-8"))
+        parser = SitemapParser()
+        
+        items = []
+        for i in range(0, len(data), 7):
+            items.extend(parser.feed(data[i:i + 7]))
+        items.extend(parser.close())
+        
+        assert [(kind, entry.url) for kind, entry in items] == [
+            ("url", "https://example.com/docs/"),
+            ("url", "https://example.com/docs/api"),
+            ("url", "https://example.com/docs/guide")
+        ]
+        assert items[0][1].lastmod == parse_lastmod("2024-05-01")
+        assert items[2][1].lastmod is None
+        assert parser.bytes_parsed == len(SITEMAP_DOCS.encode("utf-8"))
+    
+    def test_size_limit(self):
+        """Test that oversized (or highly compressed) sitemaps are rejected."""
+        data = gzip.compress(SITEMAP_DOCS.encode("utf-8") + b" " * 10000)
+        parser = SitemapParser(max_bytes=1000)
+        
+        with pytest.raises(ValueError, match="exceeds"):
+            parser.feed(data)
+    
+    @pytest.mark.asyncio
+    async def test_reader_follows_index(self, test_config, fake_session):
+        """Test that sitemap indexes are followed and each sitemap read once."""
+        fake_session.routes = {
+            "https://example.com/sitemap.xml": (200, {"Content-Type": "application/xml"}, SITEMAP_INDEX),
+            "https://example.com/sitemap-docs.xml.gz": (
+                200, {"Content-Type": "application/x-gzip"}, gzip.compress(SITEMAP_DOCS.encode("utf-8"))
+            ),
+            "https://example.com/sitemap-blog.xml": (200, {"Content-Type": "application/xml"}, SITEMAP_BLOG),
+            "https://example.com/missing.xml": (404, None, "")
+        }
+        reader = SitemapReader(ConnectionPool(test_config.crawling))
+        reader._session = fake_session
+        
+        entries = [
+            entry async for entry in reader.iter_entries([
+                "https://example.com/sitemap.xml",
+                "https://example.com/missing.xml",
+                "https://example.com/sitemap.xml"
+            ])
+        ]
+        
+        assert [entry.url for entry in entries] == [
+            "https://example.com/docs/",
+            "https://example.com/docs/api",
+            "https://example.com/docs/guide",
+            "https://example.com/blog/post"
+        ]
+        assert len(fake_session.requests) == 4
+
+
+class TestHostHealth:
+    """Test cases for HostHealth."""
+    
+    @pytest.mark.asyncio
+    async def test_adaptive_concurrency(self):
+        """Test that overload halves a host's limit and successes restore it."""
+        health = HostHealth(max_concurrency=4)
+        
+        health.record_failure("a.com", overloaded=True)
+        health.record_failure("a.com", overloaded=True)
+        assert health.stats()["a.com"]["limit"] == 1.0
+        
+        # Only one request at a time while the limit is one
+        async with health.slot("a.com"):
+            waiter = asyncio.ensure_future(health.slot("a.com").__aenter__())
+            await asyncio.sleep(0.01)
+            assert not waiter.done()
+        await asyncio.wait_for(waiter, 1)
+        
+        for _ in range(20):
+            health.record_success("a.com")
+        assert health.stats()["a.com"]["limit"] == 4.0
+        # Other hosts are unaffected
+        assert "b.com" not in health.stats()
+    
+    @pytest.mark.asyncio
+    async def test_circuit_breaker(self):
+        """Test that a failing host fails fast and recovers after a probe."""
+        health = HostHealth(max_concurrency=2, failure_threshold=3, reset_seconds=0.05)
+        for _ in range(3):
+            health.record_failure("down.com")
+        
+        assert health.circuit_state("down.com") == "open"
+        with pytest.raises(CircuitOpenError):
+            async with health.slot("down.com"):
+                pass
+        
+        # After the reset period one probe is let through at a time
+        await asyncio.sleep(0.06)
+        assert health.circuit_state("down.com") == "half_open"
+        async with health.slot("down.com"):
+            with pytest.raises(CircuitOpenError):
+                health.check("down.com")
+            health.record_success("down.com")
+        assert health.circuit_state("down.com") == "closed"
+    
+    @pytest.mark.asyncio
+    async def test_failed_probe_reopens_circuit(self):
+        """Test that a failed probe keeps the circuit open."""
+        health = HostHealth(max_concurrency=2, failure_threshold=1, reset_seconds=0.05)
+        health.record_failure("down.com")
+        await asyncio.sleep(0.06)
+        
+        async with health.slot("down.com"):
+            health.record_failure("down.com")
+        assert health.circuit_state("down.com") == "open"
+    
+    @pytest.mark.asyncio
+    async def test_unrecorded_probe_reopens_circuit(self):
+        """Test that a probe ending in an unexpected error does not wedge the circuit."""
+        health = HostHealth(max_concurrency=2, failure_threshold=1, reset_seconds=0.05)
+        health.record_failure("down.com")
+        await asyncio.sleep(0.06)
+        
+        with pytest.raises(RuntimeError):
+            async with health.slot("down.com"):
+                raise RuntimeError("too many redirects")
+        assert health.circuit_state("down.com") == "open"
+        
+        # The next reset period lets another probe through
+        await asyncio.sleep(0.06)
+        async with health.slot("down.com"):
+            health.record_success("down.com")
+        assert health.circuit_state("down.com") == "closed"
+    
+    def test_retry_after_and_backoff(self):
+        """Test Retry-After parsing and the retry delay policy."""
+        assert parse_retry_after("5") == 5.0
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after(None) is None
+        
+        assert retry_delay(0, retry_after=3) == 3
+        assert retry_delay(0, retry_after=120, max_retry_after=60) is None
+        assert 0.25 <= retry_delay(0) <= 0.5
+        assert 5.0 <= retry_delay(10) <= 10.0
+
+
+class TestCrawlCheckpoint:
+    """Test cases for CrawlCheckpoint."""
+    
+    @pytest.mark.asyncio
+    async def test_save_and_load(self, tmp_path):
+        """Test that each save appends its pages and replaces the state."""
+        checkpoint = CrawlCheckpoint(tmp_path, "job-1")
+        checkpoint.add_page({"url": "https://example.com/a"})
+        await checkpoint.save({"params": {"max_depth": 2}})
+        checkpoint.add_page({"url": "https://example.com/b", "content": "日本語"})
+        await checkpoint.save({"params": {"max_depth": 3}})
+        
+        loaded = CrawlCheckpoint(tmp_path, "job-1")
+        state = loaded.load()
+        pages = list(loaded.iter_pages())
+        
+        assert state["params"] == {"max_depth": 3}
+        assert state["pages_count"] == 2
+        assert [page["url"] for page in pages] == ["https://example.com/a", "https://example.com/b"]
+        assert pages[1]["content"] == "日本語"
+        assert CrawlCheckpoint(tmp_path, "other").load() is None
+    
+    @pytest.mark.asyncio
+    async def test_uncommitted_pages_ignored(self, tmp_path):
+        """Test that pages written after the last state are discarded."""
+        checkpoint = CrawlCheckpoint(tmp_path, "job-1")
+        checkpoint.add_page({"url": "a"})
+        await checkpoint.save({})
+        
+        # A crash after appending pages but before replacing the state
+        with open(checkpoint.pages_path, "ab") as f:
+            f.write(gzip.compress(b'{"url": "b"}\n'))
+        
+        resumed = CrawlCheckpoint(tmp_path, "job-1")
+        resumed.load()
+        assert [page["url"] for page in resumed.iter_pages()] == ["a"]
+        resumed.add_page({"url": "c"})
+        await resumed.save({})
+        
+        reloaded = CrawlCheckpoint(tmp_path, "job-1")
+        assert reloaded.load()["pages_count"] == 2
+        assert [page["url"] for page in reloaded.iter_pages()] == ["a", "c"]
+        
+        await resumed.delete()
+        assert not list(tmp_path.iterdir())
+    
+    @pytest.mark.asyncio
+    async def test_pages_streamed_across_members(self, tmp_path):
+        """Test saved pages are replayed across many gzip members and read blocks."""
+        checkpoint = CrawlCheckpoint(tmp_path, "job-1")
+        for save in range(20):
+            for i in range(50):
+                checkpoint.add_page({"url": f"https://example.com/{save}/{i}", "content": random.randbytes(200).hex()})
+            await checkpoint.save({})
+        
+        loaded = CrawlCheckpoint(tmp_path, "job-1")
+        assert loaded.load()["pages_count"] == 1000
+        assert loaded.pages_path.stat().st_size > 65536 * 2
+        urls = [page["url"] for page in loaded.iter_pages()]
+        assert len(urls) == 1000
+        assert urls[-1] == "https://example.com/19/49"
+        
+        # A damaged pages file ends the replay instead of failing the crawl
+        with open(loaded.pages_path, "r+b") as f:
+            f.seek(loaded.pages_path.stat().st_size // 2)
+            f.write(b"\0" * 64)
+        damaged = CrawlCheckpoint(tmp_path, "job-1")
+        assert damaged.load() is not None
+        assert 0 < len(list(damaged.iter_pages())) < 1000
+    
+    def test_invalid_checkpoints(self, tmp_path):
+        """Test rejected job IDs and unreadable state files."""
+        with pytest.raises(ValueError, match="Invalid job ID"):
+            CrawlCheckpoint(tmp_path, "../escape")
+        
+        checkpoint = CrawlCheckpoint(tmp_path)
+        assert len(checkpoint.job_id) == 12
+        checkpoint.state_path.write_bytes(b"not gzip")
+        assert checkpoint.load() is None
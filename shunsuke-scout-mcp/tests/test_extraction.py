@@ -0,0 +1,364 @@
+"""Tests for structure extraction building blocks."""
+
+import pytest
+
+from yaml_context_engineering.extraction import (
+    ExtractorRegistry, Heading, StructureStateStore, default_registry, diff_sections,
+    extract_asciidoc_headings, extract_rst_headings, scan_markdown, sniff_format, split_sections
+)
+from yaml_context_engineering.plugins import ExtractorPlugin, PluginMetadata, PluginType
+from yaml_context_engineering.extraction import sniffing
+from yaml_context_engineering.extraction.sniffing import PREFIX_SIZE, SAMPLE_WINDOWS, WINDOW_SIZE, _windows
+
+
+class TestScanMarkdown:
+    """Test cases for scan_markdown."""
+    
+    def test_headings_with_line_numbers_and_offsets(self):
+        """Test headings carry their level, line and line offsets."""
+        content = "# Title\n\nIntro\n\n## Usage ##\nRun it"
+        scan = scan_markdown(content)
+        
+        assert [(h.level, h.text, h.line_number) for h in scan.headings] == [
+            (1, "Title", 1), (2, "Usage", 5)
+        ]
+        usage = scan.headings[1]
+        assert content[usage.start:usage.end] == "## Usage ##\n"
+        assert scan.line_count == 6
+    
+    def test_heading_rules(self):
+        """Test which lines count as ATX headings."""
+        content = "#hashtag\n####### seven\n    # indented code\n   ### Three spaces\n# C# #\n#\n"
+        scan = scan_markdown(content)
+        
+        assert [(h.level, h.text) for h in scan.headings] == [(3, "Three spaces"), (1, "C#")]
+    
+    def test_comments_in_fences_are_not_headings(self):
+        """Test heading-like lines inside fenced code blocks are skipped."""
+        content = (
+            "# Install\n"
+            "```bash\n"
+            "# install dependencies\n"
+            "pip install .\n"
+            "```\n"
+            "~~~~\n"
+            "## not a heading\n"
+            "~~~\n"
+            "still code\n"
+            "~~~~\n"
+            "## Configure\n"
+        )
+        scan = scan_markdown(content)
+        
+        assert [h.text for h in scan.headings] == ["Install", "Configure"]
+        assert [(f.info, f.line_number, f.end_line) for f in scan.fences] == [("bash", 2, 5), ("", 6, 10)]
+        first = scan.fences[0]
+        assert content[first.start:first.end].endswith("```\n")
+    
+    def test_fence_closing_rules(self):
+        """Test a fence only closes on a bare fence of its kind."""
+        content = "````md\n```\n~~~~\n```` trailing\n# hidden\n````\n# Shown\n"
+        scan = scan_markdown(content)
+        
+        assert [h.text for h in scan.headings] == ["Shown"]
+        assert [(f.line_number, f.end_line) for f in scan.fences] == [(1, 6)]
+    
+    def test_unclosed_fence_runs_to_end(self):
+        """Test an unclosed fence hides the rest of the document."""
+        content = "# Before\n```\n# inside\n"
+        scan = scan_markdown(content)
+        
+        assert [h.text for h in scan.headings] == ["Before"]
+        fence = scan.fences[0]
+        assert (fence.end_line, fence.end) == (scan.line_count, len(content))
+    
+    def test_inline_backticks_do_not_open_fence(self):
+        """Test a backtick line with backticks in its info is not a fence."""
+        scan = scan_markdown("``` a ` b\n# Real\n")
+        
+        assert [h.text for h in scan.headings] == ["Real"]
+        assert scan.fences == []
+
+
+class TestSniffFormat:
+    """Test cases for sniff_format."""
+    
+    def test_single_formats(self, sample_markdown_content, sample_html_content):
+        """Test each format is detected with full confidence."""
+        assert sniff_format(sample_markdown_content).format == "markdown"
+        assert sniff_format(sample_html_content).confidence["html"] == 1.0
+        assert sniff_format("Title\n=====\n\n.. note:: Read me\n").format == "rst"
+        assert sniff_format("= Guide\n\n== Install\n[source,bash]\n").format == "asciidoc"
+    
+    def test_plain_text_defaults_to_markdown(self):
+        """Test text without markup is Markdown with no confidence."""
+        sniff = sniff_format("just some words")
+        
+        assert sniff.format == "markdown"
+        assert sniff.formats == []
+        assert sum(sniff.confidence.values()) == 0
+    
+    def test_fence_is_not_rst_underline(self):
+        """Test a closing fence under a code line is not an RST title."""
+        sniff = sniff_format("# Usage\n```\nrun_it\n```\n")
+        
+        assert sniff.confidence["rst"] == 0
+    
+    def test_markup_in_fences_is_ignored(self):
+        """Test HTML in a fenced snippet is not evidence of HTML."""
+        sniff = sniff_format("# Usage\n\n```html\n<h1>Title</h1>\n<div>Body</div>\n```\n")
+        
+        assert sniff.confidence["html"] == 0
+        assert not sniff.mixed
+    
+    def test_rst_table_is_not_asciidoc(self):
+        """Test the rules of an RST simple table are not AsciiDoc titles."""
+        content = (
+            "Options\n=======\n\n"
+            "=====  =====\nName   Value\n=====  =====\nretry  3\n=====  =====\n\n"
+            ".. note:: Defaults apply\n"
+        )
+        sniff = sniff_format(content)
+        
+        assert sniff.format == "rst"
+        assert sniff.confidence["asciidoc"] == 0
+    
+    def test_mixed_document(self):
+        """Test Markdown with embedded HTML headings is reported as mixed."""
+        sniff = sniff_format("# Intro\n\n<h2>Legacy</h2>\n<p>Old text</p>\n\n## Usage\n")
+        
+        assert sniff.mixed
+        assert sniff.format == "markdown"
+        assert sniff.formats == ["markdown", "html"]
+    
+    def test_sample_is_bounded(self, monkeypatch):
+        """Test large documents are only sampled, fences included."""
+        content = "# Title\n" + "Some prose line.\n" * 1_000_000
+        spans = _windows(content)
+        
+        assert sum(end - start for start, end in spans) <= PREFIX_SIZE + SAMPLE_WINDOWS * WINDOW_SIZE
+        assert spans[-1][0] > len(content) // 2
+        assert all(content[start - 1] == "\n" for start, _ in spans[1:])
+        
+        scanned = []
+        
+        def counting_scan(text):
+            scanned.append(len(text))
+            return scan_markdown(text)
+        
+        monkeypatch.setattr(sniffing, "scan_markdown", counting_scan)
+        assert sniff_format(content).format == "markdown"
+        assert sum(scanned) <= PREFIX_SIZE + 2 * SAMPLE_WINDOWS * WINDOW_SIZE
+    
+    def test_fences_in_sampled_windows_are_ignored(self):
+        """Test HTML in a fence far from the start of the document is not evidence."""
+        snippet = "```html\n" + "<h2>Example</h2>\n<div>Demo</div>\n" * 100 + "```\n"
+        inside = 0
+        # Around these positions the second window starts before, at or
+        # inside the fence
+        for before in range(13360, 13375):
+            content = "# Title\n" + "Some prose line.\n" * before + snippet + "Some prose line.\n" * (100_000 - before)
+            fence = content.index("```html")
+            inside += fence < _windows(content)[1][0] < fence + len(snippet)
+            
+            assert sniff_format(content).confidence["html"] == 0
+        assert inside
+
+
+class TestRstHeadings:
+    """Test cases for extract_rst_headings."""
+    
+    def test_levels_follow_adornment_styles(self):
+        """Test each adornment style gets a level in order of appearance."""
+        content = (
+            "=======\n Guide\n=======\n\n"
+            "Install\n=======\n\n"
+            "From source\n-----------\n\n"
+            "Usage\n=====\n"
+        )
+        headings = extract_rst_headings(content)
+        
+        assert [(h.level, h.text, h.line_number) for h in headings] == [
+            (1, "Guide", 2), (2, "Install", 5), (3, "From source", 8), (2, "Usage", 11)
+        ]
+        assert content[headings[0].start:headings[0].end] == "=======\n Guide\n=======\n"
+    
+    def test_non_titles_are_skipped(self):
+        """Test literal blocks, transitions and short underlines are ignored."""
+        content = (
+            "Title\n=====\n\n"
+            "Example::\n\n    code\n    ====\n\n"
+            "----\n\n"
+            "Too short\n---\n\n"
+            "=====\n=====\n"
+        )
+        
+        assert [h.text for h in extract_rst_headings(content)] == ["Title"]
+
+
+class TestAsciidocHeadings:
+    """Test cases for extract_asciidoc_headings."""
+    
+    def test_titles_and_levels(self):
+        """Test section titles map their marker count to the level."""
+        headings = extract_asciidoc_headings("= Guide\n\n== Install ==\n\n=== Details\n")
+        
+        assert [(h.level, h.text, h.line_number) for h in headings] == [
+            (1, "Guide", 1), (2, "Install", 3), (3, "Details", 5)
+        ]
+    
+    def test_delimited_blocks_are_skipped(self):
+        """Test title-like lines inside delimited blocks are ignored."""
+        content = (
+            "== Install\n[source,asciidoc]\n----\n== in listing\n----\n"
+            "====\n== in example\n====\n"
+            "== Usage\n"
+            "////\n== unclosed comment\n"
+        )
+        headings = extract_asciidoc_headings(content)
+        
+        assert [(h.text, h.line_number) for h in headings] == [("Install", 1), ("Usage", 9)]
+
+
+class WikiPlugin(ExtractorPlugin):
+    """Plugin adding a wiki format with "== Title ==" headings."""
+    
+    @property
+    def metadata(self) -> PluginMetadata:
+        return PluginMetadata(
+            name="wiki", version="1.0", type=PluginType.EXTRACTOR, description="Wiki markup",
+            author="tests", enabled=self.config.get("enabled", True)
+        )
+    
+    async def initialize(self) -> None:
+        pass
+    
+    async def shutdown(self) -> None:
+        pass
+    
+    async def can_extract(self, source: str) -> bool:
+        return source.endswith(".wiki")
+    
+    async def extract(self, source: str, **kwargs):
+        return {}
+    
+    def heading_extractors(self):
+        def extract_wiki(content):
+            headings = []
+            offset = 0
+            for number, line in enumerate(content.splitlines(keepends=True), 1):
+                stripped = line.strip()
+                if stripped.startswith("=") and stripped.endswith("="):
+                    level = len(stripped) - len(stripped.lstrip("="))
+                    headings.append(Heading(level, stripped.strip("= "), number, offset, offset + len(line)))
+                offset += len(line)
+            return headings
+        
+        return {"wiki": extract_wiki}
+
+
+class TestExtractorRegistry:
+    """Test cases for ExtractorRegistry."""
+    
+    def test_default_formats(self):
+        """Test the built-in formats are registered."""
+        assert default_registry().formats() == ["markdown", "html", "rst", "asciidoc"]
+    
+    def test_register_and_fallback(self):
+        """Test registration rules and the fallback for unknown formats."""
+        registry = default_registry()
+        
+        with pytest.raises(ValueError):
+            registry.register("rst", lambda content: [])
+        registry.register("rst", lambda content: [], replace=True)
+        assert registry.extract("Title\n=====\n", "rst") == []
+        
+        # Formats without an extractor are read as Markdown
+        assert [h.text for h in registry.extract("# Title", "textile")] == ["Title"]
+    
+    def test_reuses_markdown_scan(self):
+        """Test a precomputed scan is only used by the built-in Markdown extractor."""
+        registry = default_registry()
+        scan = scan_markdown("# Title\n")
+        
+        assert registry.extract("ignored", "markdown", scan) is scan.headings
+        registry.register("markdown", lambda content: [], replace=True)
+        assert registry.extract("# Title\n", "markdown", scan) == []
+    
+    def test_register_plugin(self):
+        """Test extractor plugins add formats unless disabled."""
+        registry = ExtractorRegistry()
+        
+        assert registry.register_plugin(WikiPlugin({"enabled": False})) == []
+        assert registry.register_plugin(WikiPlugin()) == ["wiki"]
+        headings = registry.extract("== Intro ==\ntext\n=== Part ===\n", "wiki")
+        assert [(h.level, h.text, h.line_number) for h in headings] == [(2, "Intro", 1), (3, "Part", 3)]
+
+
+def _sections(content):
+    """Split Markdown into sections."""
+    return split_sections(content, scan_markdown(content).headings)
+
+
+def _records(sections):
+    """Turn sections into stored state records."""
+    return [
+        {"key": s.key, "parent": s.parent, "hash": s.digest, "line_number": s.line_number, "entities": {}}
+        for s in sections
+    ]
+
+
+class TestIncrementalSections:
+    """Test cases for section hashing and structure diffs."""
+    
+    def test_split_sections(self):
+        """Test sections carry keys, parents and span the document."""
+        content = "Preface\n# A\n## Example\nx\n# B\n## Example\ny\n"
+        sections = _sections(content)
+        
+        assert [s.key for s in sections] == [
+            None, (1, "A", 0), (2, "Example", 0), (1, "B", 0), (2, "Example", 1)
+        ]
+        assert sections[4].parent == (1, "B", 0)
+        assert "".join(content[s.start:s.end] for s in sections) == content
+        assert sections[2].digest != sections[4].digest
+    
+    def test_edit_changes_one_hash(self):
+        """Test an edit only changes the hash of its own section."""
+        before = _sections("# A\na\n# B\nb\n# C\nc\n")
+        after = _sections("# A\na\n# B\nb, edited\n# C\nc\n")
+        
+        assert [x.digest == y.digest for x, y in zip(before, after)] == [True, False, True]
+    
+    def test_diff(self):
+        """Test added, removed, modified and moved sections are reported."""
+        old = _records(_sections("# A\n## A1\n## A2\n# B\n## B1\nb\n# Gone\n"))
+        new = _sections("# A\n## A2\n## New\n# B\n## B1\nb2\n## A1\n")
+        diff = diff_sections(old, new)
+        
+        assert [d["text"] for d in diff["added"]] == ["New"]
+        assert [d["text"] for d in diff["removed"]] == ["Gone"]
+        assert [d["text"] for d in diff["modified"]] == ["B1"]
+        assert [d["text"] for d in diff["moved"]] == ["A1"]
+        assert diff["unchanged"] == 3
+    
+    def test_insertion_does_not_move_later_sections(self):
+        """Test sections after an insertion keep their order."""
+        old = _records(_sections("".join(f"# S{i}\n" for i in range(50))))
+        new = _sections("# First\n" + "".join(f"# S{i}\n" for i in range(50)))
+        diff = diff_sections(old, new)
+        
+        assert diff["moved"] == []
+        assert diff["unchanged"] == 50
+    
+    @pytest.mark.asyncio
+    async def test_state_store_round_trip(self, tmp_path):
+        """Test section state is stored per document."""
+        store = StructureStateStore(tmp_path)
+        records = _records(_sections("# A\ntext\n"))
+        
+        assert await store.get("docs/manual") is None
+        await store.put("docs/manual", records)
+        state = await store.get("docs/manual")
+        assert state["sections"][0]["hash"] == records[0]["hash"]
+        assert await store.get("docs/other") is None
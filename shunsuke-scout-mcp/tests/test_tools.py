@@ -2,17 +2,24 @@
 
 import pytest
 import asyncio
+import gzip
 import json
+import aiohttp
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from unittest.mock import Mock, AsyncMock, patch, MagicMock
 from pathlib import Path
 
 from yaml_context_engineering.tools import (
     WebContentFetcher,
+    WebCrawler,
     LLMStructureExtractor,
     URLDiscoveryEngine,
     FileSystemManager
 )
 from yaml_context_engineering.config import Config
+from yaml_context_engineering.extraction import registry, scan_markdown, sniffing
+from yaml_context_engineering.tools import llm_structure_extractor
+from yaml_context_engineering.crawling import ConnectionPool, DuplicateDetector, SeenURLStore
 
 
 class TestWebContentFetcher:
@@ -90,6 +97,305 @@ class TestWebContentFetcher:
         assert "https://example.com/page2" in urls
         assert "https://example.com" in urls
     
+    @pytest.mark.asyncio
+    async def test_concurrency_limits(self, test_config, fake_session):
+        """Test global and per-host concurrency caps."""
+        test_config.crawling.max_concurrent_requests = 4
+        test_config.crawling.max_concurrent_per_host = 2
+        test_config.crawling.crawl_delay_seconds = 0
+        fetcher = WebContentFetcher(test_config)
+        fake_session.latency = 0.01
+        fetcher._session = fake_session
+        
+        urls = [f"https://host{i % 3}.example.com/page{i}" for i in range(30)]
+        results = await fetcher.fetch(urls)
+        
+        assert all(r["success"] for r in results)
+        page_requests = [url for url, _ in fake_session.requests if not url.endswith("/robots.txt")]
+        assert len(page_requests) == 30
+        assert fake_session.max_in_flight <= 4
+        assert max(fake_session.max_host_in_flight.values()) <= 2
+    
+    @pytest.mark.asyncio
+    async def test_retries_follow_status_codes(self, test_config, fake_session):
+        """Test that transient statuses are retried and client errors are not."""
+        test_config.crawling.crawl_delay_seconds = 0
+        test_config.crawling.respect_robots_txt = False
+        fetcher = WebContentFetcher(test_config)
+        fetcher._session = fake_session
+        
+        responses = iter([(503, {"Retry-After": "0"}, ""), (200, None, "<html>ok</html>")])
+        fake_session.routes = {
+            "https://example.com/flaky": lambda headers: next(responses),
+            "https://example.com/missing": (404, None, "")
+        }
+        
+        flaky, missing = await fetcher.fetch(["https://example.com/flaky", "https://example.com/missing"])
+        
+        assert flaky["success"]
+        assert not missing["success"]
+        assert missing["status_code"] == 404
+        requested = [url for url, _ in fake_session.requests]
+        assert requested.count("https://example.com/flaky") == 2
+        assert requested.count("https://example.com/missing") == 1
+    
+    @pytest.mark.asyncio
+    async def test_failing_host_does_not_hold_up_batch(self, test_config, fake_session):
+        """Test that a dead host's circuit opens while other hosts proceed."""
+        test_config.crawling.crawl_delay_seconds = 0
+        test_config.crawling.respect_robots_txt = False
+        test_config.crawling.circuit_failure_threshold = 2
+        fetcher = WebContentFetcher(test_config)
+        fetcher._session = fake_session
+        
+        def refuse(headers):
+            raise aiohttp.ClientConnectionError("Connection refused")
+        
+        dead = [f"https://dead.example.com/page{i}" for i in range(10)]
+        fake_session.routes = {url: refuse for url in dead}
+        healthy = [f"https://live.example.com/page{i}" for i in range(5)]
+        
+        results = await fetcher.fetch(dead + healthy)
+        
+        assert all(r["success"] for r in results[10:])
+        assert not any(r["success"] for r in results[:10])
+        assert any(r.get("circuit_open") for r in results[:10])
+        dead_requests = [url for url, _ in fake_session.requests if "dead." in url]
+        # Only the requests in flight when the circuit opened reached the host
+        assert len(dead_requests) <= test_config.crawling.max_concurrent_per_host
+        assert fetcher.health.circuit_state("dead.example.com") == "open"
+    
+    @pytest.mark.asyncio
+    async def test_politeness_delay_per_host(self, test_config, fake_session):
+        """Test that requests are spaced per host but hosts run in parallel."""
+        test_config.crawling.crawl_delay_seconds = 0.1
+        fetcher = WebContentFetcher(test_config)
+        fetcher._session = fake_session
+        
+        urls = [f"https://host{i % 3}.example.com/page{i}" for i in range(9)]
+        started = asyncio.get_running_loop().time()
+        results = await fetcher.fetch(urls)
+        elapsed = asyncio.get_running_loop().time() - started
+        
+        assert all(r["success"] for r in results)
+        # Three requests per host need two delays; hosts do not add up
+        assert 0.18 <= elapsed < 0.5
+    
+    @pytest.mark.asyncio
+    async def test_robots_txt_enforced(self, test_config, fake_session):
+        """Test that disallowed URLs are dropped without being requested."""
+        test_config.crawling.crawl_delay_seconds = 0
+        fetcher = WebContentFetcher(test_config)
+        fake_session.routes["https://example.com/robots.txt"] = (
+            200, {"Content-Type": "text/plain"}, "User-agent: *\nDisallow: /private\nCrawl-delay: 3\n"
+        )
+        fetcher._session = fake_session
+        
+        results = await fetcher.fetch([
+            "https://example.com/private/page",
+            "https://example.com/public"
+        ])
+        
+        assert results[0]["success"] is False
+        assert "robots.txt" in results[0]["error"]
+        assert results[1]["success"] is True
+        requested = [url for url, _ in fake_session.requests]
+        assert "https://example.com/private/page" not in requested
+        assert requested.count("https://example.com/robots.txt") == 1
+        assert fetcher.scheduler.delay_for("example.com") == 3
+    
+    @pytest.mark.asyncio
+    async def test_conditional_request_cache(self, test_config, fake_session):
+        """Test that a 304 response reuses the cached conversion."""
+        test_config.crawling.crawl_delay_seconds = 0
+        fetcher = WebContentFetcher(test_config)
+        fetcher._session = fake_session
+        
+        def page(headers):
+            if headers.get("If-None-Match") == '"v1"':
+                return (304, {}, "")
+            return (200, {"Content-Type": "text/html", "ETag": '"v1"'},
+                    "<html><head><title>Cached</title></head><body><h1>Docs</h1></body></html>")
+        
+        fake_session.routes["https://example.com/docs"] = page
+        
+        first = (await fetcher.fetch(["https://example.com/docs"]))[0]
+        assert first["success"] is True
+        assert "from_cache" not in first
+        
+        fetcher._run_cpu = Mock(side_effect=AssertionError("converted twice"))
+        second = (await fetcher.fetch(["https://example.com/docs"]))[0]
+        
+        assert second["from_cache"] is True
+        assert second["status_code"] == 304
+        assert second["content"] == first["content"]
+        assert second["title"] == "Cached"
+        assert fake_session.requests[-1][1]["headers"]["If-None-Match"] == '"v1"'
+        assert second["wire_bytes"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_parsing_in_process_pool(self, test_config, fake_session):
+        """Test HTML parsing in the default process pool."""
+        test_config.crawling.crawl_delay_seconds = 0
+        test_config.extraction.parser_workers = 2
+        fetcher = WebContentFetcher(test_config)
+        fetcher._session = fake_session
+        fake_session.routes["https://example.com/"] = (
+            200, {"Content-Type": "text/html"},
+            '<html><head><title>Pool</title></head><body><h1>Hello</h1><a href="/next">Next</a></body></html>'
+        )
+        
+        try:
+            result = (await fetcher.fetch(["https://example.com/"]))[0]
+            assert isinstance(fetcher._executor, ProcessPoolExecutor)
+        finally:
+            await fetcher.close()
+        
+        assert result["title"] == "Pool"
+        assert "# Hello" in result["content"]
+        assert result["extracted_urls"] == ["https://example.com/next"]
+        assert fetcher._executor is None
+    
+    @pytest.mark.asyncio
+    async def test_custom_executor(self, test_config, fake_session):
+        """Test plugging in a caller-owned executor."""
+        test_config.crawling.crawl_delay_seconds = 0
+        executor = ThreadPoolExecutor(max_workers=1)
+        fetcher = WebContentFetcher(test_config, executor=executor)
+        fetcher._session = fake_session
+        
+        result = (await fetcher.fetch(["https://example.com/"]))[0]
+        await fetcher.close()
+        
+        assert result["success"] is True
+        # Caller-owned executors are left running
+        assert fetcher._executor is executor
+        executor.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_body_capped_and_binary_skipped(self, test_config, fake_session):
+        """Test byte caps on text bodies and skipping of binary assets."""
+        test_config.crawling.crawl_delay_seconds = 0
+        test_config.extraction.max_content_length = 1000
+        big_body = "<html><body>" + "<p>x</p>" * 5000 + "</body></html>"
+        fake_session.routes.update({
+            "https://example.com/big": (200, {"Content-Type": "text/html"}, big_body),
+            "https://example.com/small.txt": (200, {"Content-Type": "text/plain; charset=utf-8"}, "short"),
+            "https://example.com/file.pdf": (200, {"Content-Type": "application/pdf"}, b"%PDF" * 1000),
+            "https://example.com/declared": (
+                200, {"Content-Type": "text/html", "Content-Length": str(len(big_body))}, big_body
+            ),
+        })
+        fetcher = WebContentFetcher(test_config)
+        fetcher._session = fake_session
+        
+        big, small, pdf, declared = await fetcher.fetch([
+            "https://example.com/big",
+            "https://example.com/small.txt",
+            "https://example.com/file.pdf",
+            "https://example.com/declared"
+        ])
+        
+        assert big["success"] is True
+        assert big["truncated"] is True
+        assert small["truncated"] is False
+        assert small["content"] == "short"
+        
+        assert pdf["success"] is False
+        assert "Unsupported content type" in pdf["error"]
+        
+        # A declared oversized body fails without being read
+        assert declared["success"] is False
+        assert "exceeds the 1000 byte limit" in declared["error"]
+        assert declared["content_length"] == len(big_body)
+        assert declared["wire_bytes"] == 0
+        
+        await fetcher.close()
+    
+    @pytest.mark.asyncio
+    async def test_compressed_transfer(self, test_config, fake_session):
+        """Test that compressed bodies are decoded and their bytes counted."""
+        test_config.crawling.crawl_delay_seconds = 0
+        fetcher = WebContentFetcher(test_config)
+        fetcher._session = fake_session
+        
+        html = "<html><body><h1>Docs</h1>" + "<p>Repeated text.</p>" * 200 + "</body></html>"
+        compressed = gzip.compress(html.encode())
+        fake_session.routes = {
+            "https://example.com/docs": (200, {"Content-Type": "text/html", "Content-Encoding": "gzip"}, compressed),
+            "https://example.com/raw": (200, {"Content-Type": "text/html", "Content-Encoding": "compress"}, b"...")
+        }
+        
+        page, unsupported = await fetcher.fetch(["https://example.com/docs", "https://example.com/raw"])
+        
+        assert page["success"]
+        assert "Repeated text." in page["content"]
+        assert page["content_encoding"] == "gzip"
+        assert page["wire_bytes"] == len(compressed)
+        assert page["decoded_bytes"] == len(html.encode())
+        assert "Unsupported content encoding" in unsupported["error"]
+        
+        url, kwargs = fake_session.requests[-1]
+        assert "gzip" in kwargs["headers"]["Accept-Encoding"]
+        assert kwargs["auto_decompress"] is False
+    
+    @pytest.mark.asyncio
+    async def test_per_request_timeout(self, test_config, fake_session):
+        """Test that timeouts are passed per request, not written to config."""
+        test_config.crawling.crawl_delay_seconds = 0
+        fetcher = WebContentFetcher(test_config)
+        fetcher._session = fake_session
+        
+        await fetcher.fetch(["https://example.com/a"], timeout=12)
+        await fetcher.fetch(["https://example.com/b"])
+        
+        timeouts = [
+            kwargs["timeout"].total for url, kwargs in fake_session.requests
+            if not url.endswith("/robots.txt")
+        ]
+        assert timeouts == [12, test_config.crawling.timeout_seconds]
+        assert test_config.crawling.timeout_seconds == 5
+    
+    @pytest.mark.asyncio
+    async def test_shared_pool_outlives_fetcher(self, test_config):
+        """Test that a shared connection pool is left open by the fetcher."""
+        pool = ConnectionPool(test_config.crawling)
+        fetcher = WebContentFetcher(test_config, pool=pool)
+        
+        session = await fetcher._get_session()
+        assert await pool.session() is session
+        
+        await fetcher.close()
+        assert not pool.closed
+        
+        await pool.close()
+        assert session.closed
+    
+    @pytest.mark.asyncio
+    async def test_iter_fetch_streams_results(self, test_config, fake_session):
+        """Test that iter_fetch yields results before consuming every URL."""
+        test_config.crawling.crawl_delay_seconds = 0
+        test_config.crawling.max_concurrent_requests = 1
+        fetcher = WebContentFetcher(test_config)
+        fetcher._session = fake_session
+        
+        requested = []
+        
+        def urls():
+            for i in range(10):
+                requested.append(i)
+                yield f"https://example.com/{i}"
+        
+        results = []
+        async for result in fetcher.iter_fetch(urls()):
+            if not results:
+                # Only the scheduling window has been pulled so far
+                assert len(requested) == 2
+            results.append(result)
+        
+        assert len(results) == 10
+        assert {result["url"] for result in results} == {f"https://example.com/{i}" for i in range(10)}
+    
     @pytest.mark.asyncio
     async def test_cleanup(self, fetcher):
         """Test session cleanup."""
@@ -102,6 +408,225 @@ class TestWebContentFetcher:
         assert fetcher._session.closed
 
 
+class TestWebCrawler:
+    """Test recursive web crawler."""
+    
+    SITE = {
+        "https://example.com/": ["https://example.com/docs", "https://example.com/blog", "https://other.com/"],
+        "https://example.com/docs": ["https://example.com/docs/api", "https://example.com/#top"],
+        "https://example.com/blog": ["https://example.com/blog/post"],
+        "https://example.com/docs/api": ["https://example.com/docs/api/deep"],
+    }
+    
+    @pytest.fixture
+    def crawler(self, test_config):
+        """Create crawler instance with a fake fetcher."""
+        fetcher = WebContentFetcher(test_config)
+        
+        async def fake_fetch_url(url):
+            return {
+                "url": url,
+                "content": f"# {url}",
+                "extracted_urls": self.SITE.get(url, []),
+                "success": True
+            }
+        
+        fetcher.fetch_url = AsyncMock(side_effect=fake_fetch_url)
+        return WebCrawler(test_config, fetcher, URLDiscoveryEngine(test_config))
+    
+    @pytest.mark.asyncio
+    async def test_crawl_respects_depth(self, crawler):
+        """Test that the crawl stops at max depth."""
+        result = await crawler.crawl(["https://example.com/"], max_depth=2)
+        
+        urls = {page["url"] for page in result["pages"]}
+        assert urls == {
+            "https://example.com/",
+            "https://example.com/docs",
+            "https://example.com/blog"
+        }
+        assert result["success"] is True
+        assert result["stats"]["max_depth_reached"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_crawl_domain_budget(self, crawler):
+        """Test per-domain page budget and same-domain scope."""
+        result = await crawler.crawl(
+            ["https://example.com/"],
+            max_depth=4,
+            max_pages_per_domain=3
+        )
+        
+        urls = [page["url"] for page in result["pages"]]
+        assert len(urls) == 3
+        assert "https://other.com/" not in urls
+        # Documentation links outrank blog links
+        assert "https://example.com/docs" in urls
+    
+    @pytest.mark.asyncio
+    async def test_crawl_follows_all_in_scope_links(self, crawler):
+        """Test full crawl with fragment links collapsed."""
+        result = await crawler.crawl(["https://example.com/"], max_depth=4)
+        
+        urls = sorted(page["url"] for page in result["pages"])
+        assert len(urls) == len(set(urls)) == 6
+        depths = {page["url"]: page["depth"] for page in result["pages"]}
+        assert depths["https://example.com/docs/api/deep"] == 4
+    
+    @pytest.mark.asyncio
+    async def test_recrawl_skips_fetched_pages(self, crawler):
+        """Test that a second crawl only refetches the seed."""
+        crawler.seen_store = SeenURLStore()
+        
+        first = await crawler.crawl(["https://example.com/"], max_depth=2)
+        second = await crawler.crawl(["https://example.com/"], max_depth=2)
+        
+        assert len(first["pages"]) == 3
+        assert [page["url"] for page in second["pages"]] == ["https://example.com/"]
+        assert second["stats"]["skipped"]["fetched"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_resume_from_checkpoint(self, crawler):
+        """Test that an interrupted crawl resumes without refetching pages."""
+        crawler.workers = 1
+        pages = crawler.iter_crawl(["https://example.com/"], max_depth=4, job_id="job-1")
+        first = [await pages.__anext__() for _ in range(2)]
+        await pages.aclose()
+        
+        fetched_before = crawler.fetcher.fetch_url.await_count
+        result = await crawler.crawl(job_id="job-1")
+        
+        urls = [page["url"] for page in result["pages"]]
+        assert urls[:2] == [page["url"] for page in first]
+        assert len(urls) == len(set(urls)) == 6
+        assert result["job_id"] == "job-1"
+        assert result["start_urls"] == ["https://example.com/"]
+        # Only pages missing from the checkpoint are fetched again
+        resumed = result["stats"]["pages_resumed"]
+        assert resumed >= 2
+        assert crawler.fetcher.fetch_url.await_count - fetched_before == 6 - resumed
+        assert result["stats"]["pages_fetched"] == 6 - resumed
+        # A finished job leaves no checkpoint behind
+        assert not list((crawler.config.get_cache_directory() / "checkpoints").glob("job-1.*"))
+    
+    @pytest.mark.asyncio
+    async def test_resume_requires_checkpoint(self, crawler):
+        """Test that a job ID without start URLs must name a saved crawl."""
+        with pytest.raises(ValueError, match="no checkpoint"):
+            await crawler.crawl(job_id="missing")
+    
+    @pytest.mark.asyncio
+    async def test_duplicate_pages_flagged(self, crawler):
+        """Test that duplicate pages are flagged and not expanded."""
+        async def mirrored_fetch_url(url):
+            links = self.SITE.get(url, [])
+            return {
+                "url": url,
+                "content": "same body" if url != "https://example.com/" else "home",
+                "extracted_urls": links,
+                "success": True
+            }
+        
+        crawler.fetcher.fetch_url = AsyncMock(side_effect=mirrored_fetch_url)
+        crawler.duplicates = DuplicateDetector()
+        
+        result = await crawler.crawl(["https://example.com/"], max_depth=3)
+        
+        duplicates = [page for page in result["pages"] if "duplicate_of" in page]
+        assert len(duplicates) == 2
+        assert result["stats"]["pages_duplicate"] == 2
+        # Only the first copy's links are followed
+        urls = {page["url"] for page in result["pages"]}
+        assert len(urls & {"https://example.com/docs/api", "https://example.com/blog/post"}) == 1
+    
+    @pytest.mark.asyncio
+    async def test_sitemap_pages_crawled_unless_unchanged(self, crawler, fake_session):
+        """Test that sitemap pages are crawled and unchanged ones skipped."""
+        sitemap = """<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+          <url><loc>https://example.com/docs/</loc><lastmod>2024-05-01</lastmod></url>
+          <url><loc>https://example.com/docs/api</loc><lastmod>2024-05-01</lastmod></url>
+          <url><loc>https://example.com/docs/guide</loc></url>
+          <url><loc>https://other.com/page</loc></url>
+        </urlset>"""
+        fake_session.routes = {
+            "https://example.com/robots.txt": (200, {"Content-Type": "text/plain"},
+                                               "Sitemap: https://example.com/sitemap-main.xml"),
+            "https://example.com/sitemap-main.xml": (200, {"Content-Type": "application/xml"}, sitemap)
+        }
+        crawler.fetcher._session = fake_session
+        crawler.url_discovery.sitemaps._session = fake_session
+        crawler.seen_store = SeenURLStore()
+        crawler.seen_store.add("https://example.com/docs/api", fetched_at=0)  # Modified since
+        crawler.seen_store.add("https://example.com/docs/guide")  # No lastmod, still fresh
+        
+        result = await crawler.crawl(["https://example.com/"], max_depth=1, use_sitemaps=True)
+        
+        urls = {page["url"] for page in result["pages"]}
+        assert urls == {"https://example.com/", "https://example.com/docs/", "https://example.com/docs/api"}
+        assert result["stats"]["sitemap"] == {"listed": 4, "unchanged": 1, "queued": 2}
+    
+    @pytest.mark.asyncio
+    async def test_robots_disallowed_links_keep_budget(self, test_config, fake_session):
+        """Test URLs disallowed by robots.txt do not use up the domain budget."""
+        test_config.crawling.crawl_delay_seconds = 0
+        fetcher = WebContentFetcher(test_config)
+        fetcher._session = fake_session
+        links = ["/private/a", "/private/b", "/private/c", "/public"]
+        anchors = "".join(f'<a href="{link}">{link}</a>' for link in links)
+        fake_session.routes.update({
+            "https://example.com/robots.txt": (200, {"Content-Type": "text/plain"},
+                                               "User-agent: *\nDisallow: /private\n"),
+            "https://example.com/": (200, {"Content-Type": "text/html"}, f"<html><body>{anchors}</body></html>")
+        })
+        crawler = WebCrawler(test_config, fetcher, URLDiscoveryEngine(test_config))
+        
+        result = await crawler.crawl(["https://example.com/"], max_depth=2, max_pages_per_domain=2)
+        await fetcher.close()
+        
+        assert [page["url"] for page in result["pages"]] == ["https://example.com/", "https://example.com/public"]
+        assert result["stats"]["skipped"]["robots"] == 3
+        assert result["stats"]["pages_per_domain"] == {"example.com": 2}
+    
+    @pytest.mark.asyncio
+    async def test_crawl_with_parser_pool(self, test_config, fake_session):
+        """Test a crawl parsing pages in the process pool started without fork."""
+        test_config.crawling.crawl_delay_seconds = 0
+        test_config.extraction.parser_workers = 2
+        fetcher = WebContentFetcher(test_config)
+        fetcher._session = fake_session
+        for url, links in self.SITE.items():
+            anchors = "".join(f'<a href="{link}">{link}</a>' for link in links)
+            fake_session.routes[url] = (
+                200, {"Content-Type": "text/html"},
+                f"<html><head><title>{url}</title></head><body><h1>Page</h1>{anchors}</body></html>"
+            )
+        crawler = WebCrawler(test_config, fetcher, URLDiscoveryEngine(test_config))
+        
+        try:
+            result = await crawler.crawl(["https://example.com/"], max_depth=2)
+            assert fetcher._executor._mp_context.get_start_method() != "fork"
+        finally:
+            await fetcher.close()
+        
+        # Links are extracted by the workers and followed
+        urls = {page["url"] for page in result["pages"]}
+        assert urls == {"https://example.com/", "https://example.com/docs", "https://example.com/blog"}
+        assert all("# Page" in page["content"] for page in result["pages"])
+    
+    @pytest.mark.asyncio
+    async def test_iter_crawl_yields_pages(self, crawler):
+        """Test streaming crawl with statistics reported at the end."""
+        stats = {}
+        urls = []
+        async for page in crawler.iter_crawl(["https://example.com/"], max_depth=2, stats=stats):
+            urls.append(page["url"])
+        
+        assert urls[0] == "https://example.com/"
+        assert len(urls) == 3
+        assert stats["pages_fetched"] == 3
+        assert stats["max_depth_reached"] == 2
+
+
 class TestLLMStructureExtractor:
     """Test LLM structure extractor tool."""
     
@@ -155,6 +680,146 @@ class TestLLMStructureExtractor:
         max_level = max(h["level"] for h in self._flatten_headings(result["structured_headings"]))
         assert max_level <= 2
     
+    @pytest.mark.asyncio
+    async def test_code_fence_comments_are_not_headings(self, extractor):
+        """Test shell comments in code blocks stay in section content."""
+        content = "# Setup\n\n```bash\n# install\npip install .\n```\n\n## Run\nStart it."
+        result = await extractor.extract(content)
+        
+        headings = self._flatten_headings(result["structured_headings"])
+        assert [h["text"] for h in headings] == ["Setup", "Run"]
+        assert "# install" in headings[0]["content"]
+        assert headings[1]["content"] == "Start it."
+    
+    @pytest.mark.asyncio
+    async def test_mixed_markdown_and_html(self, extractor):
+        """Test headings of mixed documents are merged in document order."""
+        content = "# Guide\n\nIntro.\n\n<h2>Legacy API</h2>\n<p>Old.</p>\n\n## Usage\nNew."
+        result = await extractor.extract(content)
+        
+        assert result["format_detected"] == "markdown"
+        assert result["format_confidence"]["html"] > 0
+        headings = self._flatten_headings(result["structured_headings"])
+        assert [h["text"] for h in headings] == ["Guide", "Legacy API", "Usage"]
+        assert headings[0]["content"] == "Intro."
+    
+    @pytest.mark.asyncio
+    async def test_document_scanned_once(self, extractor, monkeypatch):
+        """Test sniffing and heading extraction share one Markdown scan."""
+        content = "# Guide\n\n```bash\n# install\n```\n\n<h2>Legacy</h2>\n<p>Old.</p>\n\n## Usage\n" * 1000
+        full_scans = []
+        
+        def counting_scan(text):
+            if len(text) == len(content):
+                full_scans.append(text)
+            return scan_markdown(text)
+        
+        for module in (llm_structure_extractor, registry, sniffing):
+            monkeypatch.setattr(module, "scan_markdown", counting_scan)
+        
+        result = await extractor.extract(content)
+        
+        assert result["format_confidence"]["html"] > 0
+        assert result["total_headings"] == 3000
+        assert len(full_scans) == 1
+    
+    @pytest.mark.asyncio
+    async def test_html_in_code_fence_is_not_a_heading(self, extractor):
+        """Test HTML headings inside a fenced snippet are left out of mixed documents."""
+        fenced = "# Guide\n\n```html\n<h1>Not a heading</h1>\n<div>Demo</div>\n```\n\n## Usage\nNew."
+        result = await extractor.extract(fenced)
+        
+        assert result["format_confidence"]["html"] == 0
+        assert [h["text"] for h in self._flatten_headings(result["structured_headings"])] == ["Guide", "Usage"]
+        
+        # Real HTML elsewhere still makes the document mixed
+        result = await extractor.extract(fenced + "\n\n<h2>Legacy API</h2>\n<p>Old.</p>\n")
+        headings = self._flatten_headings(result["structured_headings"])
+        assert [h["text"] for h in headings] == ["Guide", "Usage", "Legacy API"]
+    
+    @pytest.mark.asyncio
+    async def test_extract_rst_structure(self, extractor):
+        """Test reStructuredText titles are extracted by adornment level."""
+        content = "=====\nGuide\n=====\n\nIntro.\n\nInstall\n-------\n\nRun pip.\n"
+        result = await extractor.extract(content)
+        
+        assert result["format_detected"] == "rst"
+        guide = result["structured_headings"][0]
+        assert (guide["text"], guide["content"]) == ("Guide", "Intro.")
+        assert guide["children"][0]["text"] == "Install"
+        assert guide["children"][0]["content"] == "Run pip."
+    
+    @pytest.mark.asyncio
+    async def test_headings_without_content(self, extractor, sample_markdown_content):
+        """Test headings can carry section offsets instead of copied text."""
+        full = await extractor.extract(sample_markdown_content)
+        result = await extractor.extract(sample_markdown_content, extraction_config={"include_content": False})
+        
+        headings = self._flatten_headings(result["structured_headings"])
+        assert all("content" not in h for h in headings)
+        expected = [h["content"] for h in self._flatten_headings(full["structured_headings"])]
+        assert [sample_markdown_content[h["start"]:h["end"]].strip() for h in headings] == expected
+    
+    @pytest.mark.asyncio
+    async def test_format_override(self, extractor):
+        """Test the format can be given instead of detected."""
+        content = "= Guide\n\n== Install\n"
+        result = await extractor.extract(content, extraction_config={"format": "asciidoc"})
+        assert result["format_detected"] == "asciidoc"
+        assert result["total_headings"] == 2
+        
+        with pytest.raises(ValueError):
+            await extractor.extract(content, extraction_config={"format": "textile"})
+    
+    @pytest.mark.asyncio
+    async def test_incremental_extraction(self, extractor):
+        """Test re-extraction only recomputes changed sections."""
+        sections = [f"## Part {i}\nSee https://example.com/{i}\n" for i in range(20)]
+        config = {"incremental": True, "document_id": "manual"}
+        
+        first = await extractor.extract("# Manual\n" + "".join(sections), extraction_config=config)
+        assert first["structure_diff"]["recomputed"] == 21
+        assert len(first["structure_diff"]["added"]) == 21
+        
+        sections[7] = "## Part 7\nSee https://example.com/seven\n"
+        second = await extractor.extract("# Manual\n" + "".join(sections), extraction_config=config)
+        diff = second["structure_diff"]
+        assert diff["recomputed"] == 1
+        assert [d["text"] for d in diff["modified"]] == ["Part 7"]
+        assert diff["unchanged"] == 20
+        assert "https://example.com/seven" in second["extracted_entities"]["urls"]
+        assert "https://example.com/7" not in second["extracted_entities"]["urls"]
+        assert len(second["extracted_entities"]["urls"]) == 20
+        
+        with pytest.raises(ValueError):
+            await extractor.extract("# Manual", extraction_config={"incremental": True})
+    
+    def test_hierarchy_nodes_slice_source(self, extractor):
+        """Test nodes keep offsets into the document instead of copies."""
+        content = "# A\n\nAlpha text.\n\n## B\nBeta text.\n### C\nGamma."
+        roots = extractor._build_hierarchy(extractor._extract_markdown_headings(content), content)
+        
+        a = roots[0]
+        b = a.children[0]
+        assert a.source is content and b.source is content
+        assert a.content == "Alpha text."
+        assert content[b.start:b.end] == "Beta text.\n"
+        assert b.children[0].content == "Gamma."
+        assert not hasattr(a, "__dict__")
+    
+    def test_granularity_filter_is_view(self, extractor):
+        """Test filtering wraps the original nodes without rebuilding them."""
+        content = "# A\ntext\n## B\n### C\n# D"
+        roots = extractor._build_hierarchy(extractor._extract_markdown_headings(content), content)
+        
+        views = extractor._filter_by_granularity(roots, "L1_L2")
+        assert [view.node for view in views] == roots
+        assert [child.text for child in views[0].children] == ["B"]
+        assert views[0].children[0].children == []
+        assert views[0].to_dict()["children"][0]["children"] == []
+        # The underlying tree is untouched
+        assert roots[0].children[0].children[0].text == "C"
+    
     def _flatten_headings(self, headings):
         """Flatten hierarchical headings for testing."""
         flat = []
@@ -265,6 +930,66 @@ class TestURLDiscoveryEngine:
         assert relations["https://api.example.com/endpoint"] == "subdomain"
         assert relations["https://external.com/resource"] == "external"
     
+    @pytest.mark.asyncio
+    async def test_occurrences_and_context(self, discovery):
+        """Test that every occurrence is recorded and context uses its offsets."""
+        content = (
+            "Start with the [setup guide](/docs/setup).\n"
+            "Important: read https://example.com/docs/setup again before upgrading."
+        )
+        
+        results = await discovery.discover(content, "example.com")
+        
+        assert len(results) == 1
+        result = results[0]
+        assert result["url"] == "https://example.com/docs/setup"
+        assert [content[o["start"]:o["end"]] for o in result["occurrences"]] == [
+            "/docs/setup",
+            "https://example.com/docs/setup"
+        ]
+        assert "setup guide" in result["context_snippet"]
+    
+    @pytest.mark.asyncio
+    async def test_batch_scoring(self, discovery):
+        """Test batch scoring against the single-URL score and anchor text."""
+        urls = [
+            "https://example.com/docs/guide",
+            "https://example.com/blog/login",
+            "https://example.com/page"
+        ]
+        contexts = ["Important setup step", "", ""]
+        
+        scores = discovery.score_urls(urls, "example.com", contexts)
+        
+        assert scores.tolist() == pytest.approx([
+            discovery._calculate_priority_score(url, context) for url, context in zip(urls, contexts)
+        ])
+        
+        content = 'Read the [API guide](https://example.com/a) or <a href="https://example.com/b">Tutorial</a>.'
+        results = await discovery.discover(content, "example.com")
+        anchors = {r["url"]: r["anchor_text"] for r in results}
+        assert anchors == {"https://example.com/a": "API guide", "https://example.com/b": "Tutorial"}
+    
+    @pytest.mark.asyncio
+    async def test_include_sitemap(self, discovery, fake_session):
+        """Test that sitemap pages are merged with the URLs found in content."""
+        fake_session.routes = {
+            "https://example.com/sitemap.xml": (200, {"Content-Type": "application/xml"}, """
+                <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+                  <url><loc>https://example.com/docs/</loc></url>
+                  <url><loc>https://example.com/guide</loc><lastmod>2024-05-01</lastmod></url>
+                </urlset>""")
+        }
+        discovery.sitemaps._session = fake_session
+        
+        results = await discovery.discover("See https://example.com/docs", "example.com", include_sitemap=True)
+        
+        sources = {r["url"]: r["source"] for r in results}
+        assert sources == {"https://example.com/docs": "content", "https://example.com/guide": "sitemap"}
+        guide = next(r for r in results if r["source"] == "sitemap")
+        assert guide["lastmod"] == "2024-05-01T00:00:00+00:00"
+        assert guide["already_fetched"] is False
+    
     @pytest.mark.asyncio
     async def test_content_value_estimation(self, discovery):
         """Test content value estimation."""
@@ -272,6 +997,33 @@ class TestURLDiscoveryEngine:
         assert discovery._estimate_content_value("https://example.com/examples") == "medium"
         assert discovery._estimate_content_value("https://example.com/blog") == "low"
         assert discovery._estimate_content_value("https://example.com/random") == "unknown"
+    
+    @pytest.mark.asyncio
+    async def test_filter_and_domain_patterns(self, discovery):
+        """Test combined filters, including patterns that cannot be joined."""
+        content = """
+        https://example.com/docs/a
+        https://example.com/guide/b
+        https://example.com/blog/c
+        https://other.com/docs/d
+        """
+        discovery.config.crawling.target_domain_patterns = [r"example\.com"]
+        
+        results = await discovery.discover(
+            content,
+            "example.com",
+            filters=[r"/docs/", r"(?i)/GUIDE/", r"(b)\1"]
+        )
+        
+        assert sorted(r["url"] for r in results) == [
+            "https://example.com/docs/a",
+            "https://example.com/guide/b"
+        ]
+        
+        matcher = discovery.domain_matcher()
+        assert discovery.domain_matcher() is matcher
+        discovery.config.crawling.target_domain_patterns = [r"other\.com"]
+        assert discovery.domain_matcher().matches("https://other.com/docs/d")
 
 
 class TestFileSystemManager:
@@ -386,4 +1138,22 @@ class TestFileSystemManager:
         assert Path(result["path"]).exists()
         assert (Path(result["path"]) / "docs" / "api").exists()
         assert (Path(result["path"]) / "docs" / "guides").exists()
-        assert (Path(result["path"]) / "examples").exists()
\ No newline at end of file
+        assert (Path(result["path"]) / "examples").exists()
+    
+    @pytest.mark.asyncio
+    async def test_duplicate_context_file_skipped(self, file_manager):
+        """Test that a context file duplicating another is not written."""
+        file_manager.duplicates = DuplicateDetector()
+        body = "# Install\n\nRun the installer and follow the prompts."
+        
+        first = await file_manager.execute(
+            "write_file", "v1/install.md", {"source_url": "https://example.com/v1/install", "body": body}
+        )
+        second = await file_manager.execute(
+            "write_file", "v2/install.md", {"source_url": "https://example.com/v2/install", "body": body}
+        )
+        
+        assert Path(first["path"]).exists()
+        assert second["skipped"] is True
+        assert second["duplicate_of"] == "https://example.com/v1/install"
+        assert not Path(second["path"]).exists()